@@ -21,6 +21,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     'core',
     'django_extensions',
     'rest_framework',
@@ -63,6 +64,7 @@ SPECTACULAR_SETTINGS = {
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.db_routing.ReplicaRoutingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",  # Add CORS middleware
     "django.middleware.common.CommonMiddleware",
@@ -92,6 +94,25 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "app.wsgi.application"
 
+# psycopg3 connection pool, one per worker process (core/db_pool.py reports
+# its stats). Each worker holds up to DATABASE_POOL_MAX_SIZE connections, so
+# Postgres needs max_connections >= WEB_CONCURRENCY × DATABASE_POOL_MAX_SIZE
+# plus headroom for cron and migrations. A gthread worker thread holds at most
+# one connection, hence the default of one per gunicorn thread there; ASGI
+# workers (the async process group, see gunicorn.conf.py) have no thread
+# count and serve many requests at once, so they default to 10.
+DATABASE_POOL = os.getenv("DATABASE_POOL", "false").lower() in ("1", "true", "yes")
+_ASGI_WORKERS = os.getenv("GUNICORN_WORKER_CLASS", "gthread") not in ("sync", "gthread")
+DATABASE_POOL_OPTIONS = {
+    "min_size": int(os.getenv("DATABASE_POOL_MIN_SIZE", "2")),
+    "max_size": int(os.getenv("DATABASE_POOL_MAX_SIZE", "10" if _ASGI_WORKERS else os.getenv("GUNICORN_THREADS", "4"))),
+    # Seconds a request waits for a free connection before failing
+    "timeout": float(os.getenv("DATABASE_POOL_TIMEOUT", "10")),
+    # Close connections idle for this long, down to min_size
+    "max_idle": float(os.getenv("DATABASE_POOL_MAX_IDLE", "300")),
+    "max_lifetime": float(os.getenv("DATABASE_POOL_MAX_LIFETIME", "3600")),
+}
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -101,11 +122,48 @@ DATABASES = {
         "HOST": os.getenv("DATABASE_HOST"),
         "PORT": os.getenv("DATABASE_PORT", "5432"),
         "OPTIONS": {
-            "options": "-c search_path=public"
+            "options": "-c search_path=public",
+            **({"pool": DATABASE_POOL_OPTIONS} if DATABASE_POOL else {}),
         },
+        # Pooled connections are returned to the pool after each request, so
+        # persistent connections only apply when pooling is off
+        "CONN_MAX_AGE": 0 if DATABASE_POOL else int(os.getenv("DATABASE_CONN_MAX_AGE", "0")),
+        # With the pool this pings every connection on checkout, so broken ones
+        # are replaced instead of handed to a request
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+
+def replica_databases(primary, hosts):
+    """One alias per "host[:port]" replica, with the primary's name and credentials."""
+    replicas = {}
+    for index, host in enumerate(filter(None, hosts), 1):
+        name, _, port = host.partition(":")
+        replicas[f"replica_{index}"] = {
+            **primary,
+            "HOST": name,
+            "PORT": port or primary["PORT"],
+            # Tests read replicas through the primary's test database
+            "TEST": {"MIRROR": "default"},
+        }
+    return replicas
+
+
+# Read replicas (core/db_routing.py). Safe-method requests, the analytics
+# helpers and exports read from a replica whose replication lag is within
+# DATABASE_REPLICA_MAX_LAG_SECONDS; writes, and later reads in the same
+# request, use the primary, and the writer stays pinned to the primary for
+# DATABASE_PRIMARY_PIN_SECONDS. Pins and recently-written markers live in the
+# "routing" cache, which every worker must share: with replicas,
+# DATABASE_ROUTING_CACHE_URL (or RESPONSE_CACHE_URL) must name a Redis.
+DATABASES.update(replica_databases(DATABASES["default"], os.getenv("DATABASE_REPLICA_HOSTS", "").split(",")))
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith("replica_")]
+DATABASE_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DATABASE_REPLICA_MAX_LAG_SECONDS", "5"))
+DATABASE_REPLICA_LAG_CHECK_SECONDS = float(os.getenv("DATABASE_REPLICA_LAG_CHECK_SECONDS", "5"))
+DATABASE_PRIMARY_PIN_SECONDS = int(os.getenv("DATABASE_PRIMARY_PIN_SECONDS", "5"))
+DATABASE_ROUTERS = ["core.db_routing.PrimaryReplicaRouter"]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -140,3 +198,87 @@ AUTH_USER_MODEL = 'core.User'
 CORS_ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "http://localhost:3000,http://127.0.0.1:3000").split(",")
 CORS_ALLOW_CREDENTIALS = True
 CSRF_TRUSTED_ORIGINS = os.getenv("CSRF_TRUSTED_ORIGINS", "http://localhost:3000,http://127.0.0.1:3000").split(",")
+
+# Per-organization dashboard aggregates (core/aggregate_cache.py). Only
+# cached when AGGREGATE_CACHE_URL=redis://host:6379/1 is set (needs the redis
+# package): an in-process cache would keep serving aggregates that another
+# worker's writes invalidated.
+AGGREGATE_CACHE_URL = os.getenv("AGGREGATE_CACHE_URL", "")
+AGGREGATE_CACHE = {
+    "BACKEND": (
+        "core.aggregate_cache.RedisAggregateBackend"
+        if AGGREGATE_CACHE_URL
+        else "core.aggregate_cache.DummyAggregateBackend"
+    ),
+    "LOCATION": AGGREGATE_CACHE_URL,
+    "TIMEOUT": int(os.getenv("AGGREGATE_CACHE_TIMEOUT", "300")),
+}
+
+# Versioned list/detail response cache (core/response_cache.py). Pages are
+# only cached when RESPONSE_CACHE_URL=redis://host:6379/2 is set: generation
+# bumps in an in-process cache never reach the other workers, which would go
+# on serving their stale pages.
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "")
+RESPONSE_CACHE_ENABLED = bool(RESPONSE_CACHE_URL)
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", "300"))
+DATABASE_ROUTING_CACHE_URL = os.getenv("DATABASE_ROUTING_CACHE_URL", RESPONSE_CACHE_URL)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "responses": (
+        {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": RESPONSE_CACHE_URL}
+        if RESPONSE_CACHE_URL
+        else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "responses"}
+    ),
+    "routing": (
+        {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": DATABASE_ROUTING_CACHE_URL}
+        if DATABASE_ROUTING_CACHE_URL
+        else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "routing"}
+    ),
+}
+
+# Delta-sync change feed (core/changes.py). Caught-up cursors are rewound by
+# the overlap so rows committed late with an earlier updated_at are re-sent;
+# delete tombstones older than the retention are pruned and cursors that
+# predate it get 410 Gone (run prune_tombstones from cron).
+CHANGE_FEED_PAGE_SIZE = int(os.getenv("CHANGE_FEED_PAGE_SIZE", "200"))
+CHANGE_FEED_OVERLAP_SECONDS = int(os.getenv("CHANGE_FEED_OVERLAP_SECONDS", "10"))
+CHANGE_FEED_TOMBSTONE_DAYS = int(os.getenv("CHANGE_FEED_TOMBSTONE_DAYS", "30"))
+
+# Server-Sent Events activity stream (core/activity_stream.py), served over
+# ASGI. "postgres" fans writes out to every worker with LISTEN/NOTIFY;
+# "local" only reaches streams held by the writing process.
+ACTIVITY_STREAM_BACKEND = os.getenv("ACTIVITY_STREAM_BACKEND", "postgres")
+ACTIVITY_STREAM_HEARTBEAT_SECONDS = int(os.getenv("ACTIVITY_STREAM_HEARTBEAT_SECONDS", "15"))
+ACTIVITY_STREAM_QUEUE_SIZE = int(os.getenv("ACTIVITY_STREAM_QUEUE_SIZE", "100"))
+ACTIVITY_STREAM_REPLAY_LIMIT = int(os.getenv("ACTIVITY_STREAM_REPLAY_LIMIT", "100"))
+ACTIVITY_STREAM_RETRY_MS = int(os.getenv("ACTIVITY_STREAM_RETRY_MS", "3000"))
+# Lifetime of the ?ticket= that opens a stream (EventSource cannot send headers)
+ACTIVITY_STREAM_TICKET_SECONDS = int(os.getenv("ACTIVITY_STREAM_TICKET_SECONDS", "60"))
+
+# Monthly InteractionLog partitions (core/partitions.py). Run
+# interaction_partitions daily from cron: it creates the next
+# INTERACTION_LOG_PARTITIONS_AHEAD months and detaches months older than
+# INTERACTION_LOG_RETAIN_MONTHS (0 keeps everything) as standalone tables.
+INTERACTION_LOG_PARTITIONS_AHEAD = int(os.getenv("INTERACTION_LOG_PARTITIONS_AHEAD", "3"))
+INTERACTION_LOG_RETAIN_MONTHS = int(os.getenv("INTERACTION_LOG_RETAIN_MONTHS", "0"))
+
+# Cold storage of old interaction logs (core/archive.py). Run
+# archive_interactions from cron: rows older than the organization's
+# interaction_retention_days (else INTERACTION_LOG_ARCHIVE_AFTER_DAYS; 0 keeps
+# everything) move to zstd-compressed JSONL files under
+# INTERACTION_LOG_ARCHIVE_DIR, which must be persistent storage.
+INTERACTION_LOG_ARCHIVE_DIR = os.getenv("INTERACTION_LOG_ARCHIVE_DIR", str(BASE_DIR / "archive" / "interactions"))
+INTERACTION_LOG_ARCHIVE_AFTER_DAYS = int(os.getenv("INTERACTION_LOG_ARCHIVE_AFTER_DAYS", "365"))
+INTERACTION_LOG_ARCHIVE_BATCH_SIZE = int(os.getenv("INTERACTION_LOG_ARCHIVE_BATCH_SIZE", "5000"))
+INTERACTION_LOG_ARCHIVE_DELETE_CHUNK = int(os.getenv("INTERACTION_LOG_ARCHIVE_DELETE_CHUNK", "1000"))
+
+# Lead import (core/lead_import.py). Uploads above LEAD_IMPORT_SYNC_MAX_BYTES
+# are stored in LEAD_IMPORT_UPLOAD_DIR and imported by run_lead_imports
+# (run it from cron or a loop) instead of within the request's worker timeout.
+# A running job that commits no batch for LEAD_IMPORT_JOB_TIMEOUT_SECONDS is
+# taken to have lost its runner and is claimed again.
+LEAD_IMPORT_SYNC_MAX_BYTES = int(os.getenv("LEAD_IMPORT_SYNC_MAX_BYTES", str(1024 * 1024)))
+LEAD_IMPORT_UPLOAD_DIR = os.getenv("LEAD_IMPORT_UPLOAD_DIR", str(BASE_DIR / "uploads" / "lead_imports"))
+LEAD_IMPORT_JOB_TIMEOUT_SECONDS = int(os.getenv("LEAD_IMPORT_JOB_TIMEOUT_SECONDS", "900"))
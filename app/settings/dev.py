@@ -1,3 +1,5 @@
+import os
+
 from .base import *
 
 
@@ -5,6 +7,13 @@ DEBUG = True
 ALLOWED_HOSTS = ["*"]
 INTERNAL_IPS = ["127.0.0.1"]
 
+# Without real replicas (DATABASE_REPLICA_HOSTS unset), a second alias on the
+# local database stands in for one in the router tests, which route to it
+# with DATABASE_REPLICAS=["replica"]. To try routing locally, set
+# DATABASE_REPLICA_HOSTS=localhost and DATABASE_ROUTING_CACHE_URL instead.
+if not os.getenv("DATABASE_REPLICA_HOSTS"):
+    DATABASES["replica"] = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+
 # CORS/CSRF for local frontend
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
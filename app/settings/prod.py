@@ -11,8 +11,13 @@ DATABASES = {
         "PASSWORD": os.environ.get("POSTGRES_PASSWORD"),
         "HOST": os.environ.get("POSTGRES_HOST", "localhost"),
         "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+        "OPTIONS": {"pool": DATABASE_POOL_OPTIONS} if DATABASE_POOL else {},
+        "CONN_MAX_AGE": 0 if DATABASE_POOL else int(os.getenv("DATABASE_CONN_MAX_AGE", "0")),
+        "CONN_HEALTH_CHECKS": True,
     }
 }
+DATABASES.update(replica_databases(DATABASES["default"], os.getenv("DATABASE_REPLICA_HOSTS", "").split(",")))
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith("replica_")]
 
 SECURE_HSTS_SECONDS = 31536000
 SECURE_HSTS_INCLUDE_SUBDOMAINS = True
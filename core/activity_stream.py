@@ -0,0 +1,251 @@
+"""
+Live activity feed over Server-Sent Events.
+
+The dashboard used to poll ``/api/v1/interactions/`` for new activity, paying
+for an ordered, counted page on every poll. ``stream_activity`` instead keeps
+one idle ``text/event-stream`` response open per client and pushes each
+``InteractionLog`` of the client's organization as it is committed.
+
+Every write announces its log ids with ``announce_activity``. With the
+``postgres`` backend that is a ``pg_notify`` in the writing transaction, so
+Postgres delivers it only on commit and to every worker; each worker holds
+one ``LISTEN`` connection feeding its ``ActivityBroker``. The ``local``
+backend hands the ids to this process's broker on commit instead, which is
+enough for a single worker. Either way the broker loads each announced row
+once (one query per batch, and only for organizations with subscribers in
+this worker) and fans it out to the subscribers' queues, so idle
+connections cost a queue and a suspended coroutine, not database polling.
+
+Django only closes a request's database connection once the response ends,
+which for a stream is when the client leaves. ``stream_activity`` therefore
+releases it (back to the pool, or closed) after authentication and the
+replay, and the broker does the same after each delivery, so an idle stream
+holds no Postgres connection.
+
+The stream needs an ASGI server; under WSGI every open stream holds a thread.
+
+``EventSource`` cannot send an Authorization header, so browsers first POST
+to ``activity/stream/ticket/`` for a ticket (``issue_stream_ticket``) and
+open ``activity/stream/?ticket=``. A ticket is signed for this stream only
+and expires after ``ACTIVITY_STREAM_TICKET_SECONDS``, so the URL that ends up
+in logs and browser history is not a credential for the API.
+"""
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+
+import psycopg
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+
+from .models import InteractionLog
+from .utils import DASHBOARD_ACTIVITY_FIELDS, format_activity_for_dashboard
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_CHANNEL = 'interaction_log'
+LISTEN_RETRY_SECONDS = 5
+STREAM_TICKET_SALT = 'core.activity_stream.ticket'
+
+# Sent to a subscriber whose queue overflowed: the stream ends and the
+# browser reconnects with Last-Event-ID, replaying what it missed
+_CLOSE = None
+
+
+def release_connections():
+    """
+    Close this thread's database connections, returning pooled ones to the
+    pool. Connections inside a transaction (such as a test's) are left open.
+    """
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+def announce_activity(logs, using=DEFAULT_DB_ALIAS):
+    """Announce saved InteractionLog rows to live streams once their transaction commits."""
+    payloads = [f'{log.organization_id}:{log.pk}' for log in logs if log.organization_id and log.pk]
+    if not payloads:
+        return
+    if settings.ACTIVITY_STREAM_BACKEND == 'postgres':
+        # NOTIFY is transactional: rolled back writes are never announced
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload',
+                [ACTIVITY_CHANNEL, payloads],
+            )
+    else:
+        transaction.on_commit(lambda: get_broker().announce(payloads), using=using)
+
+
+def _parse(payload):
+    organization_id, log_id = payload.split(':')
+    return int(organization_id), int(log_id)
+
+
+def _offer(queue, event):
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        # Too slow to keep up: drop the backlog and end the stream
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(_CLOSE)
+
+
+class ActivityBroker:
+    """
+    Per-process fan-out of activity events to SSE subscribers.
+
+    ``subscribe``/``unsubscribe`` run on the event loop. ``announce`` may be
+    called from any thread, such as a sync view's ``on_commit`` callback.
+    """
+
+    def __init__(self, queue_size=None):
+        self.queue_size = queue_size or settings.ACTIVITY_STREAM_QUEUE_SIZE
+        self.subscribers = defaultdict(set)
+        self.loop = None
+        self.listener = None
+        self.listening = asyncio.Event()
+
+    def subscribe(self, organization_id):
+        self.loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers[organization_id].add(queue)
+        if settings.ACTIVITY_STREAM_BACKEND == 'postgres' and (
+            self.listener is None or self.listener.done() or self.listener.get_loop() is not self.loop
+        ):
+            self.listener = self.loop.create_task(self.listen())
+        return queue
+
+    def unsubscribe(self, organization_id, queue):
+        queues = self.subscribers.get(organization_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[organization_id]
+
+    def subscriber_count(self):
+        return sum(len(queues) for queues in self.subscribers.values())
+
+    def announce(self, payloads):
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return
+        ids = [log_id for organization_id, log_id in map(_parse, payloads) if organization_id in self.subscribers]
+        if ids:
+            asyncio.run_coroutine_threadsafe(self.deliver(ids), loop)
+
+    async def deliver(self, ids):
+        # Nobody awaits this coroutine's future, so errors are logged here
+        try:
+            events = await _load_events(InteractionLog.objects.filter(id__in=ids).order_by('id'))
+        except DatabaseError:
+            logger.warning('Could not load announced activity logs %s', ids, exc_info=True)
+            return
+        finally:
+            await sync_to_async(release_connections)()
+        for organization_id, event in events:
+            for queue in list(self.subscribers.get(organization_id, ())):
+                _offer(queue, event)
+
+    async def listen(self):
+        """Relay NOTIFYs on ACTIVITY_CHANNEL to ``deliver`` until the loop stops."""
+        params = connections[DEFAULT_DB_ALIAS].get_connection_params()
+        # Django's sync cursor class and adapters do not apply to this connection
+        params.pop('cursor_factory', None)
+        params.pop('context', None)
+        while True:
+            try:
+                connection = await psycopg.AsyncConnection.connect(**params, autocommit=True)
+                async with connection:
+                    await connection.execute(f'LISTEN {ACTIVITY_CHANNEL}')
+                    self.listening.set()
+                    async for notify in connection.notifies():
+                        self.announce([notify.payload])
+            except psycopg.Error:
+                self.listening.clear()
+                logger.warning('Activity stream listener lost its connection; retrying', exc_info=True)
+                await asyncio.sleep(LISTEN_RETRY_SECONDS)
+
+
+async def _load_events(queryset):
+    """Return ``(organization_id, dashboard event)`` for each row of ``queryset``."""
+    fields = ('organization_id',) + DASHBOARD_ACTIVITY_FIELDS
+    return [
+        (row['organization_id'], format_activity_for_dashboard(row))
+        async for row in queryset.values(*fields)
+    ]
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = ActivityBroker()
+    return _broker
+
+
+def issue_stream_ticket(user):
+    """Return a ticket that opens ``user``'s activity stream for ``ACTIVITY_STREAM_TICKET_SECONDS``."""
+    return signing.TimestampSigner(salt=STREAM_TICKET_SALT).sign(str(user.pk))
+
+
+async def stream_ticket_user(ticket):
+    """Return the active user ``ticket`` was issued to, or None if it is forged or expired."""
+    try:
+        user_id = signing.TimestampSigner(salt=STREAM_TICKET_SALT).unsign(
+            ticket, max_age=settings.ACTIVITY_STREAM_TICKET_SECONDS
+        )
+    except signing.BadSignature:
+        return None
+    return await get_user_model().objects.filter(pk=user_id, is_active=True).afirst()
+
+
+def format_event(event):
+    data = json.dumps(event, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return f"id: {event['id']}\nevent: activity\ndata: {data}\n\n"
+
+
+async def stream_activity(organization_id, last_event_id=None):
+    """
+    Yield SSE messages for ``organization_id``: a replay of the rows after
+    ``last_event_id`` (a reconnecting browser's Last-Event-ID), then live
+    events, with a comment line as heartbeat while idle.
+    """
+    broker = get_broker()
+    queue = broker.subscribe(organization_id)
+    try:
+        yield f'retry: {settings.ACTIVITY_STREAM_RETRY_MS}\n\n'
+        last_sent = 0
+        if last_event_id is not None:
+            missed = InteractionLog.objects.filter(organization_id=organization_id, id__gt=last_event_id)
+            events = await _load_events(missed.order_by('-id')[:settings.ACTIVITY_STREAM_REPLAY_LIMIT])
+            for _, event in reversed(events):
+                last_sent = event['id']
+                yield format_event(event)
+
+        # Authentication and the replay ran in this request's thread; do not
+        # keep their connection checked out while the stream idles
+        await sync_to_async(release_connections)()
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), settings.ACTIVITY_STREAM_HEARTBEAT_SECONDS)
+            except TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            if event is _CLOSE:
+                return
+            # Rows committed during the replay arrive both ways
+            if event['id'] > last_sent:
+                yield format_event(event)
+    finally:
+        broker.unsubscribe(organization_id, queue)
@@ -107,6 +107,11 @@ class QuoteAdmin(admin.ModelAdmin):
     readonly_fields = ('created_at', 'total_price')
     inlines = [QuoteLineItemInline]
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Inline edits bypass the API's delta updates, so recompute once
+        form.instance.update_total_price()
+
 
 @admin.register(QuoteLineItem)
 class QuoteLineItemAdmin(admin.ModelAdmin):
@@ -0,0 +1,276 @@
+"""
+Per-organization cache for dashboard aggregates.
+
+Pipeline totals, lead status counts, overdue task counts and activity
+summaries are read on every dashboard load but only change when a lead,
+opportunity, task or interaction of that organization changes. Aggregates
+are stored under one key per organization, group (``AGGREGATE_GROUPS``) and
+generation; the receivers in ``core/signals.py`` bump a group's generation
+once a save or delete in it commits, and the bulk paths that bypass signals
+invalidate explicitly. A reader stores what it computed under the generation
+it read before computing, so a value computed from rows a concurrent write
+has since replaced lands in an abandoned group and is never served.
+
+``settings.AGGREGATE_CACHE`` picks the backend: ``RedisAggregateBackend``
+shares aggregates between workers, ``DummyAggregateBackend`` (the default
+without ``AGGREGATE_CACHE_URL``) caches nothing. ``LocMemAggregateBackend``
+keeps them in the worker process, which is only safe with a single worker:
+invalidations do not reach other processes. Hit and miss counters are kept
+per process.
+"""
+
+import pickle
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .response_cache import fill_reads
+
+# Group each model's aggregates are invalidated under
+AGGREGATE_GROUPS = {
+    'core.lead': 'leads',
+    'core.opportunity': 'pipeline',
+    'core.task': 'tasks',
+    'core.interactionlog': 'activity',
+}
+
+
+class DummyAggregateBackend:
+    """Caches nothing: every read is a miss and aggregates are computed per request."""
+
+    def __init__(self, location='', options=None):
+        pass
+
+    def get_generation(self, key):
+        return 0
+
+    def incr_generation(self, key):
+        pass
+
+    def get(self, key, field):
+        return None
+
+    def set(self, key, field, value, timeout):
+        pass
+
+    def delete(self, key):
+        pass
+
+
+class LocMemAggregateBackend:
+    """Groups held in a dictionary of this process."""
+
+    def __init__(self, location='', options=None):
+        self._groups = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get_generation(self, key):
+        with self._lock:
+            return self._generations.setdefault(key, time.time_ns())
+
+    def incr_generation(self, key):
+        with self._lock:
+            self._generations[key] = self._generations.get(key, time.time_ns()) + 1
+
+    def get(self, key, field):
+        with self._lock:
+            return self._groups.get(key, {}).get(field)
+
+    def set(self, key, field, value, timeout):
+        with self._lock:
+            self._groups.setdefault(key, {})[field] = value
+
+    def delete(self, key):
+        with self._lock:
+            self._groups.pop(key, None)
+
+
+class RedisAggregateBackend:
+    """
+    Groups stored as Redis hashes, so that dropping a group is one ``DEL``,
+    and generations as counters bumped with ``INCR``.
+
+    ``OPTIONS['CLIENT_CLASS']`` is the dotted path of a class with a
+    ``from_url`` constructor and the ``get``/``set``/``incr`` and
+    ``hget``/``hset``/``expire``/``delete`` commands; it defaults to
+    ``redis.Redis``.
+    """
+
+    def __init__(self, location='', options=None):
+        client_class = (options or {}).get('CLIENT_CLASS', 'redis.Redis')
+        try:
+            client_class = import_string(client_class)
+        except ImportError as exc:
+            raise ImproperlyConfigured(
+                f'AGGREGATE_CACHE needs {client_class} for the Redis backend; install the redis package'
+            ) from exc
+        self.client = client_class.from_url(location)
+
+    def get_generation(self, key):
+        generation = self.client.get(key)
+        if generation is None:
+            # Start from the clock rather than 0, so a counter evicted from
+            # Redis never comes back at a value an old group was stored under
+            self.client.set(key, time.time_ns(), nx=True)
+            generation = self.client.get(key)
+        return int(generation)
+
+    def incr_generation(self, key):
+        self.client.incr(key)
+
+    def get(self, key, field):
+        return self.client.hget(key, field)
+
+    def set(self, key, field, value, timeout):
+        self.client.hset(key, field, value)
+        self.client.expire(key, timeout)
+
+    def delete(self, key):
+        self.client.delete(key)
+
+
+class AggregateCache:
+    """
+    Compute-on-miss cache of organization aggregates.
+
+    Values are pickled together with their expiry, so a variant written late
+    into a group never outlives ``timeout`` even though the backend only
+    expires whole groups.
+    """
+
+    def __init__(self, backend, timeout=300, key_prefix='aggregates'):
+        self.backend = backend
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def generation_key(self, organization_id, group):
+        return f'{self.key_prefix}:{organization_id}:{group}:generation'
+
+    def make_key(self, organization_id, group, generation=None):
+        """Key of the group's hash at ``generation`` (the current one when None)."""
+        if generation is None:
+            generation = self.backend.get_generation(self.generation_key(organization_id, group))
+        return f'{self.key_prefix}:{organization_id}:{group}:{generation}'
+
+    def _lookup(self, organization_id, group, field):
+        """
+        Return ``(key, found, value)`` for a cached field, counting the hit or
+        miss. ``key`` is where a value computed now must be stored.
+        """
+        key = self.make_key(organization_id, group)
+        raw = self.backend.get(key, field)
+        if raw is not None:
+            expires_at, value = pickle.loads(raw)
+            if expires_at > time.time():
+                self.hits[group] += 1
+                return key, True, value
+
+        self.misses[group] += 1
+        return key, False, None
+
+    def _store(self, key, field, value):
+        self.backend.set(key, field, pickle.dumps((time.time() + self.timeout, value)), self.timeout)
+
+    def get_or_compute(self, organization_id, group, variant, compute):
+        """
+        Return the cached ``variant`` of ``group`` for the organization, or
+        call ``compute`` and cache its result.
+        """
+        if organization_id is None:
+            return compute()
+
+        key, found, value = self._lookup(organization_id, group, str(variant))
+        if found:
+            return value
+
+        with fill_reads(organization_id):
+            value = compute()
+        self._store(key, str(variant), value)
+        return value
+
+    async def aget_or_compute(self, organization_id, group, variant, compute):
+        """
+        ``get_or_compute`` for async views: ``compute`` is a coroutine
+        function, and backend calls run off the event loop.
+        """
+        if organization_id is None:
+            return await compute()
+
+        key, found, value = await sync_to_async(self._lookup)(organization_id, group, str(variant))
+        if found:
+            return value
+
+        with await sync_to_async(fill_reads)(organization_id):
+            value = await compute()
+        await sync_to_async(self._store)(key, str(variant), value)
+        return value
+
+    def invalidate(self, organization_id, *groups):
+        """Move the groups to a new generation and drop their current hashes."""
+        if organization_id is None:
+            return
+        for group in groups:
+            key = self.make_key(organization_id, group)
+            self.backend.incr_generation(self.generation_key(organization_id, group))
+            self.backend.delete(key)
+
+    def stats(self):
+        groups = sorted(set(self.hits) | set(self.misses))
+        return {
+            group: {
+                'hits': self.hits[group],
+                'misses': self.misses[group],
+                'hit_ratio': round(self.hits[group] / (self.hits[group] + self.misses[group]), 3),
+            }
+            for group in groups
+        }
+
+    def reset_stats(self):
+        self.hits.clear()
+        self.misses.clear()
+
+
+_aggregate_cache = None
+
+
+def get_aggregate_cache():
+    """Return the process-wide ``AggregateCache`` built from ``settings.AGGREGATE_CACHE``."""
+    global _aggregate_cache
+    if _aggregate_cache is None:
+        config = settings.AGGREGATE_CACHE
+        backend_class = import_string(config['BACKEND'])
+        _aggregate_cache = AggregateCache(
+            backend_class(config.get('LOCATION', ''), config.get('OPTIONS')),
+            timeout=config.get('TIMEOUT', 300),
+            key_prefix=config.get('KEY_PREFIX', 'aggregates'),
+        )
+    return _aggregate_cache
+
+
+def invalidate_aggregates(organization_id, model):
+    """
+    Drop the organization's cached aggregates that depend on ``model`` once
+    the current transaction commits, so readers never re-cache rows that
+    are about to be rolled back.
+    """
+    group = AGGREGATE_GROUPS.get(model._meta.label_lower)
+    if group and organization_id is not None:
+        transaction.on_commit(lambda: get_aggregate_cache().invalidate(organization_id, group))
+
+
+@receiver(setting_changed)
+def reset_aggregate_cache(setting, **kwargs):
+    global _aggregate_cache
+    if setting == 'AGGREGATE_CACHE':
+        _aggregate_cache = None
@@ -0,0 +1,226 @@
+"""
+Cold storage for old interaction logs.
+
+``archive_organization`` moves an organization's ``InteractionLog`` rows older
+than its retention window (``Organization.interaction_retention_days``, else
+``INTERACTION_LOG_ARCHIVE_AFTER_DAYS``) into zstd-compressed JSON Lines files
+under ``INTERACTION_LOG_ARCHIVE_DIR``::
+
+    org_<organization id>/<YYYY-MM>/<first id>-<last id>.jsonl.zst
+
+Each month directory also holds a ``manifest.json`` recording, per file, its
+id range and how many rows it has for each (lead, contact, opportunity), so
+the endpoint counts archived history without decompressing it.
+
+Rows are taken oldest first in batches of ``INTERACTION_LOG_ARCHIVE_BATCH_SIZE``
+and stored as the API renders them. Each file is written under a temporary
+name, flushed to disk and renamed before the batch's rows are deleted in
+chunks of ``INTERACTION_LOG_ARCHIVE_DELETE_CHUNK``, each its own short
+transaction. A crash in between leaves rows in both places; the next run
+archives them again and readers keep one copy per id.
+
+``ArchivedInteractions`` reads the files back for the ``interactions/archived/``
+endpoint, so timelines reach into archived history without restoring rows.
+"""
+
+import io
+import json
+import os
+from collections import defaultdict
+from datetime import timedelta
+from itertools import pairwise
+from pathlib import Path
+
+import zstandard
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .aggregate_cache import invalidate_aggregates
+from .eager_loading import eager_load
+from .models import InteractionLog
+from .response_cache import bump_generations
+from .serializers import InteractionLogSerializer
+
+ARCHIVE_SUFFIX = '.jsonl.zst'
+MANIFEST_NAME = 'manifest.json'
+# Serialized fields the archived endpoint filters on; the manifest counts rows per combination
+ARCHIVE_FILTER_FIELDS = ('lead', 'contact', 'opportunity')
+# Archives are written once and read rarely, so favour ratio over speed
+ZSTD_LEVEL = 10
+
+# The timestamp bound lets Postgres skip the partitions of recent months
+DELETE_SQL = f'DELETE FROM {InteractionLog._meta.db_table} WHERE id = ANY(%s) AND "timestamp" < %s'
+
+
+def archive_root():
+    return Path(settings.INTERACTION_LOG_ARCHIVE_DIR)
+
+
+def retention_days(organization):
+    """Days of interaction logs ``organization`` keeps in the table; 0 keeps everything."""
+    if organization.interaction_retention_days is None:
+        return settings.INTERACTION_LOG_ARCHIVE_AFTER_DAYS
+    return organization.interaction_retention_days
+
+
+def _replace_file(path, data):
+    # Written under a temporary name and renamed, so readers never see a partial file
+    partial = path.with_name(f'.{path.name}.partial')
+    with open(partial, 'wb') as output:
+        output.write(data)
+        output.flush()
+        os.fsync(output.fileno())
+    os.replace(partial, path)
+
+
+def write_archive(path, rows):
+    """Write ``rows`` to a new compressed file, atomically."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = ''.join(json.dumps(row, cls=DjangoJSONEncoder) + '\n' for row in rows).encode()
+    _replace_file(path, zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data))
+
+
+def read_manifest(month):
+    """Return ``{file name: entry}`` for a month directory; empty if it has no manifest."""
+    try:
+        return json.loads((month / MANIFEST_NAME).read_bytes())
+    except FileNotFoundError:
+        return {}
+
+
+def record_archive(path, rows):
+    """Add ``path``'s id range and row counts per filter combination to its month's manifest."""
+    combinations = defaultdict(int)
+    for row in rows:
+        combinations[tuple(row.get(field) for field in ARCHIVE_FILTER_FIELDS)] += 1
+    manifest = read_manifest(path.parent)
+    manifest[path.name] = {
+        'first_id': min(row['id'] for row in rows),
+        'last_id': max(row['id'] for row in rows),
+        'rows': len(rows),
+        'counts': [[*values, count] for values, count in combinations.items()],
+    }
+    _replace_file(path.parent / MANIFEST_NAME, json.dumps(manifest).encode())
+
+
+def read_archive(path):
+    """Yield the rows of one archive file."""
+    with open(path, 'rb') as archive, zstandard.ZstdDecompressor().stream_reader(archive) as reader:
+        for line in io.TextIOWrapper(reader, encoding='utf-8'):
+            yield json.loads(line)
+
+
+def _delete_rows(ids, cutoff, chunk_size):
+    for start in range(0, len(ids), chunk_size):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(DELETE_SQL, [ids[start:start + chunk_size], cutoff])
+
+
+def archive_organization(organization, now=None, batch_size=None, delete_chunk=None, dry_run=False):
+    """
+    Archive ``organization``'s interaction logs older than its retention window.
+
+    Returns how many rows were archived (or, with ``dry_run``, would be).
+    """
+    days = retention_days(organization)
+    if not days:
+        return 0
+    batch_size = batch_size or settings.INTERACTION_LOG_ARCHIVE_BATCH_SIZE
+    delete_chunk = delete_chunk or settings.INTERACTION_LOG_ARCHIVE_DELETE_CHUNK
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    expired = InteractionLog.objects.filter(organization=organization, timestamp__lt=cutoff)
+    if dry_run:
+        return expired.count()
+
+    serializer = InteractionLogSerializer()
+    expired = eager_load(expired, InteractionLogSerializer).order_by('timestamp', 'id')
+    archived = 0
+    while batch := list(expired[:batch_size]):
+        months = defaultdict(list)
+        for interaction in batch:
+            months[f'{interaction.timestamp:%Y-%m}'].append(interaction)
+        for month, interactions in months.items():
+            name = f'{interactions[0].pk}-{interactions[-1].pk}{ARCHIVE_SUFFIX}'
+            path = archive_root() / f'org_{organization.pk}' / month / name
+            rows = [serializer.to_representation(interaction) for interaction in interactions]
+            write_archive(path, rows)
+            record_archive(path, rows)
+        _delete_rows([interaction.pk for interaction in batch], cutoff, delete_chunk)
+        archived += len(batch)
+
+    if archived:
+        # Raw deletes skip the signals that invalidate caches
+        invalidate_aggregates(organization.pk, InteractionLog)
+        bump_generations([organization.pk], InteractionLog)
+    return archived
+
+
+class ArchivedInteractions:
+    """
+    An organization's archived interaction logs, newest first, as a sequence
+    Django's paginator can count and slice.
+
+    ``filters`` maps serialized fields (``lead``, ``contact``, ``opportunity``)
+    to the value rows must have. Counts come from the month manifests; a
+    slice then loads and sorts only the months it covers, so memory stays
+    bounded by one month of the organization's history.
+    """
+
+    def __init__(self, organization_id, filters=None):
+        self.directory = archive_root() / f'org_{organization_id}'
+        self.filters = {field: str(value) for field, value in (filters or {}).items()}
+        self._counts = None
+
+    def months(self):
+        if not self.directory.is_dir():
+            return []
+        return sorted((path for path in self.directory.iterdir() if path.is_dir()), reverse=True)
+
+    def month_rows(self, month):
+        rows = {}
+        for path in month.glob(f'*{ARCHIVE_SUFFIX}'):
+            for row in read_archive(path):
+                if all(str(row.get(field)) == value for field, value in self.filters.items()):
+                    rows[row['id']] = row
+        return sorted(rows.values(), key=lambda row: (parse_datetime(row['timestamp']), row['id']), reverse=True)
+
+    def month_count(self, month):
+        files = sorted(path.name for path in month.glob(f'*{ARCHIVE_SUFFIX}'))
+        manifest = read_manifest(month)
+        entries = sorted((manifest[name] for name in files if name in manifest), key=lambda entry: entry['first_id'])
+        # A file missing from the manifest, or overlapping ids, means a run
+        # crashed part way; reading the month keeps one copy per id
+        overlapping = any(entry['first_id'] <= previous['last_id'] for previous, entry in pairwise(entries))
+        if len(entries) < len(files) or overlapping:
+            return len(self.month_rows(month))
+        return sum(
+            combination[-1]
+            for entry in entries
+            for combination in entry['counts']
+            if all(str(combination[ARCHIVE_FILTER_FIELDS.index(field)]) == value for field, value in self.filters.items())
+        )
+
+    def counts(self):
+        if self._counts is None:
+            self._counts = [(month, self.month_count(month)) for month in self.months()]
+        return self._counts
+
+    def __len__(self):
+        return sum(count for _month, count in self.counts())
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop, _step = index.indices(len(self))
+        rows = []
+        offset = 0
+        for month, count in self.counts():
+            if offset >= stop:
+                break
+            if count and offset + count > start:
+                rows.extend(self.month_rows(month)[max(start - offset, 0):stop - offset])
+            offset += count
+        return rows
@@ -0,0 +1,226 @@
+"""
+Async views: the SSE activity stream and async-native read endpoints.
+
+Under ASGI every sync DRF view occupies a thread for as long as it waits on
+Postgres. The endpoints here serve the hottest reads (the lead, opportunity
+and interaction lists, ``pipeline_value``, ``tasks/overdue`` and the
+dashboard) with the async ORM instead, under ``/api/v1/async/``, returning
+the same JSON as their DRF counterparts. Lists support the same filters
+and page-number pagination, but not ``search``/``ordering`` or the cursor
+mode.
+
+DRF views cannot be async, so these are plain Django views. They
+authenticate with the API's authentication classes, and
+``organization_required`` applies ``HasOrganizationAccess``; every
+queryset is scoped to the caller's organization.
+"""
+
+from datetime import date
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .activity_stream import stream_activity, stream_ticket_user
+from .aggregate_cache import get_aggregate_cache
+from .dashboard import (
+    dashboard_aggregates,
+    dashboard_filters,
+    parse_dashboard_params,
+    pipeline_cache_variant,
+    resolve_user_filter,
+)
+from .eager_loading import eager_load
+from .models import InteractionLog, Lead, Opportunity, Task
+from .serializers import (
+    InteractionLogSerializer,
+    LeadSerializer,
+    OpportunitySerializer,
+    TaskSerializer,
+)
+from .utils import aget_dashboard_activity_feed, aget_pipeline_summary
+
+
+def authenticate_request(request):
+    """Return the user the API's authentication classes accept for ``request``, or None."""
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            result = authentication_class().authenticate(request)
+        except AuthenticationFailed:
+            return None
+        if result is not None:
+            return result[0]
+    return None
+
+
+def organization_required(view):
+    """Authenticate an async GET view and require an organization, like HasOrganizationAccess."""
+    @require_GET
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await sync_to_async(authenticate_request)(request)
+        if user is None:
+            return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+        if user.organization_id is None:
+            return JsonResponse({'detail': 'You do not have permission to perform this action.'}, status=403)
+        request.user = user
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def render(data, status=200):
+    # DRF's renderer, so decimals and dates come out as in the sync API
+    return HttpResponse(JSONRenderer().render(data), content_type='application/json', status=status)
+
+
+async def paginate(request, queryset, serializer_class):
+    """Serialize one page of ``queryset`` in PageNumberPagination's format, or None for a bad page."""
+    page_size = api_settings.PAGE_SIZE
+    try:
+        page = int(request.GET.get('page', 1))
+    except ValueError:
+        return None
+    count = await queryset.acount()
+    last_page = max(1, -(-count // page_size))
+    if not 1 <= page <= last_page:
+        return None
+
+    offset = (page - 1) * page_size
+    rows = [obj async for obj in eager_load(queryset, serializer_class)[offset:offset + page_size]]
+    url = request.build_absolute_uri()
+    previous = None
+    if page > 1:
+        previous = remove_query_param(url, 'page') if page == 2 else replace_query_param(url, 'page', page - 1)
+    return {
+        'count': count,
+        'next': replace_query_param(url, 'page', page + 1) if page < last_page else None,
+        'previous': previous,
+        'results': serializer_class(rows, many=True, context={'request': request}).data,
+    }
+
+
+async def list_response(request, queryset, serializer_class):
+    data = await paginate(request, queryset, serializer_class)
+    if data is None:
+        return render({'detail': 'Invalid page.'}, status=404)
+    return render(data)
+
+
+def _filter_params(queryset, request, **params):
+    """Apply ``?param=`` filters mapped to lookups, skipping empty values."""
+    for param, lookup in params.items():
+        value = request.GET.get(param)
+        if value:
+            queryset = queryset.filter(**{lookup: value})
+    return queryset
+
+
+@organization_required
+async def lead_list(request):
+    """Async ``GET /leads/``"""
+    queryset = Lead.objects.filter(organization_id=request.user.organization_id).order_by('-created_at')
+    queryset = _filter_params(queryset, request, status='status')
+    return await list_response(request, queryset, LeadSerializer)
+
+
+def _opportunities(request):
+    queryset = Opportunity.objects.filter(organization_id=request.user.organization_id).order_by('-created_at')
+    return _filter_params(queryset, request, stage='stage')
+
+
+@organization_required
+async def opportunity_list(request):
+    """Async ``GET /opportunities/``"""
+    return await list_response(request, _opportunities(request), OpportunitySerializer)
+
+
+@organization_required
+async def pipeline_value(request):
+    """Async ``GET /opportunities/pipeline_value/``, sharing the sync endpoint's cache entries"""
+    stage = request.GET.get('stage') or ''
+    queryset = _opportunities(request)
+    return render(await get_aggregate_cache().aget_or_compute(
+        request.user.organization_id, 'pipeline', pipeline_cache_variant(stage),
+        lambda: aget_pipeline_summary(queryset)
+    ))
+
+
+@organization_required
+async def interaction_list(request):
+    """Async ``GET /interactions/``"""
+    queryset = InteractionLog.objects.filter(organization_id=request.user.organization_id).order_by('-timestamp')
+    queryset = _filter_params(queryset, request, lead='lead_id', contact='contact_id', opportunity='opportunity_id')
+    return await list_response(request, queryset, InteractionLogSerializer)
+
+
+@organization_required
+async def overdue_tasks(request):
+    """Async ``GET /tasks/overdue/``"""
+    queryset = Task.objects.filter(organization_id=request.user.organization_id).order_by('due_date')
+    queryset = _filter_params(queryset, request, status='status')
+    queryset = eager_load(queryset.filter(due_date__lt=date.today(), status='pending'), TaskSerializer)
+    return render(TaskSerializer([task async for task in queryset], many=True).data)
+
+
+@organization_required
+async def dashboard_activity(request):
+    """Async ``GET /dashboard/activity/``"""
+    organization_id = request.user.organization_id
+    days, limit, user_filter = parse_dashboard_params(request.GET)
+
+    # Apply user filter; only admins and managers can look at someone else
+    user, lookup = resolve_user_filter(request.user, user_filter)
+    if lookup is not None:
+        user = await lookup.afirst()
+        if user is None:
+            return render({'error': 'User not found'}, status=404)
+
+    # Aggregates come from the per-organization cache; the feed is always live
+    cache = get_aggregate_cache()
+    data = {
+        'activities': await aget_dashboard_activity_feed(
+            user=user, days=days, limit=limit, organization=organization_id
+        ),
+    }
+    for name, (group, variant, _compute, acompute) in dashboard_aggregates(
+        organization_id, user, days, date.today()
+    ).items():
+        data[name] = await cache.aget_or_compute(organization_id, group, variant, acompute)
+    data['filters'] = dashboard_filters(days, limit, user)
+    return render(data)
+
+
+@require_GET
+async def activity_stream(request):
+    """
+    Server-Sent Events stream of new activity in the caller's organization.
+    Reconnecting clients send Last-Event-ID to replay what they missed.
+    Browsers authenticate with ``?ticket=`` from ``activity/stream/ticket/``.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'The activity stream needs an ASGI server'}, status=501)
+    ticket = request.GET.get('ticket')
+    if ticket:
+        user = await stream_ticket_user(ticket)
+    else:
+        user = await sync_to_async(authenticate_request)(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    if user.organization_id is None:
+        return JsonResponse({'error': 'User must belong to an organization'}, status=403)
+
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    response = StreamingHttpResponse(
+        stream_activity(user.organization_id, int(last_event_id) if last_event_id.isdigit() else None),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,162 @@
+"""
+Set-based bulk updates for the tenant viewsets.
+
+Re-staging or reassigning records one PATCH at a time costs a SELECT, an
+UPDATE and an InteractionLog INSERT per record (see ``core/signals.py``).
+``BulkUpdateMixin`` adds ``PATCH <prefix>/bulk/``, which locks and reads the
+selected rows once, applies the change with a single UPDATE, and writes the
+interaction logs the per-row signals would have written in one multi-row
+INSERT.
+"""
+
+from django.db import models, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .activity_stream import announce_activity
+from .aggregate_cache import invalidate_aggregates
+from .models import InteractionLog
+from .response_cache import bump_generations
+
+BULK_UPDATE_MAX_ROWS = 1000
+
+# List query parameters that shape the response rather than select rows
+NON_FILTER_PARAMS = ('format', 'page', 'page_size', 'cursor', 'ordering')
+
+
+def _raw_value(value):
+    return value.pk if isinstance(value, models.Model) else value
+
+
+class BulkUpdateMixin:
+    """
+    Viewset mixin adding ``PATCH <prefix>/bulk/``.
+
+    The body is ``{"ids": [...], "changes": {...}}``. Without ``ids`` the rows
+    are selected by the list filters in ``bulk_filter_params``
+    (``?status=new&search=acme``): at least one must have a value, and any
+    other parameter except ``NON_FILTER_PARAMS`` is rejected, so a typo cannot
+    widen the update to the whole organization. Only ``bulk_update_fields``
+    may be changed; values are validated by the viewset's serializer.
+    Subclasses override ``build_bulk_logs`` to return the unsaved logs for a
+    changed row.
+    """
+    bulk_update_fields = ()
+    bulk_filter_params = ('search',)
+    bulk_select_related = ()
+
+    def build_bulk_logs(self, obj, old_values):
+        return []
+
+    def validate_bulk_request(self, request):
+        """Return ``(ids, values, errors)``; ``errors`` is the 400 body when the request is invalid."""
+        ids = request.data.get('ids')
+        changes = request.data.get('changes')
+
+        if not isinstance(changes, dict) or not changes:
+            return None, None, {'error': 'changes must be a non-empty object'}
+        unknown = sorted(set(changes) - set(self.bulk_update_fields))
+        if unknown:
+            return None, None, {
+                'error': f"Only these fields can be bulk updated: {', '.join(self.bulk_update_fields)}"
+            }
+        if ids is not None:
+            if not isinstance(ids, list) or not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids):
+                return None, None, {'error': 'ids must be a list of integers'}
+        else:
+            unknown = sorted(set(request.query_params) - set(self.bulk_filter_params) - set(NON_FILTER_PARAMS))
+            if unknown:
+                return None, None, {
+                    'error': f"Unknown filters: {', '.join(unknown)}. "
+                             f"Rows can be selected by: {', '.join(self.bulk_filter_params)}"
+                }
+            if not any(request.query_params.get(name) for name in self.bulk_filter_params):
+                return None, None, {'error': 'Provide ids or list filters to select the rows to update'}
+
+        serializer = self.get_serializer(data=changes, partial=True)
+        serializer.is_valid(raise_exception=True)
+        values = {name: serializer.validated_data[name] for name in changes}
+
+        for name, value in values.items():
+            if isinstance(value, models.Model) and getattr(value, 'organization_id', None) != request.user.organization_id:
+                return None, None, {name: ['Must belong to your organization.']}
+        return ids, values, None
+
+    def diff_bulk_rows(self, rows, values, model):
+        """Return the per-row results and the ``(obj, old_values)`` of the rows ``values`` would change."""
+        results, changed = [], []
+        for obj in rows:
+            old_values = {name: getattr(obj, model._meta.get_field(name).attname) for name in values}
+            diff = {
+                name: [old_values[name], _raw_value(value)]
+                for name, value in values.items() if old_values[name] != _raw_value(value)
+            }
+            if diff:
+                changed.append((obj, old_values))
+                results.append({'id': obj.pk, 'status': 'updated', 'changes': diff})
+            else:
+                results.append({'id': obj.pk, 'status': 'unchanged'})
+        return results, changed
+
+    def apply_bulk_changes(self, request, model, values, changed):
+        """Write ``values`` to the changed rows with one UPDATE, then their interaction logs."""
+        # update() skips auto_now, so stamp those fields explicitly
+        update = dict(values)
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False):
+                update[field.name] = timezone.now()
+        model._base_manager.filter(pk__in=[obj.pk for obj, _ in changed]).update(**update)
+
+        logs = []
+        for obj, old_values in changed:
+            for name, value in update.items():
+                setattr(obj, name, value)
+            logs.extend(self.build_bulk_logs(obj, old_values))
+        InteractionLog.objects.bulk_create(logs)
+        announce_activity(logs)
+
+        # update() and bulk_create() skip the signals that invalidate caches.
+        # Like those signals, aggregates are dropped (and generations bumped
+        # again) on commit, so a read racing this transaction cannot leave
+        # the pre-commit rows cached.
+        invalidate_aggregates(request.user.organization_id, model)
+        bump_generations([request.user.organization_id], model)
+        if logs:
+            invalidate_aggregates(request.user.organization_id, InteractionLog)
+            bump_generations([request.user.organization_id], InteractionLog)
+
+    @action(detail=False, methods=['patch'], url_path='bulk')
+    def bulk_update(self, request):
+        """Apply the same change to many rows and report the outcome per row"""
+        ids, values, errors = self.validate_bulk_request(request)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if ids is not None:
+            queryset = queryset.filter(pk__in=ids)
+        model = queryset.model
+
+        with transaction.atomic():
+            rows = list(
+                queryset.select_related(*self.bulk_select_related)
+                .select_for_update(of=('self',))
+                .order_by('pk')[:BULK_UPDATE_MAX_ROWS + 1]
+            )
+            if len(rows) > BULK_UPDATE_MAX_ROWS:
+                transaction.set_rollback(True)
+                return Response(
+                    {'error': f'Bulk updates are limited to {BULK_UPDATE_MAX_ROWS} rows; narrow the selection'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            results, changed = self.diff_bulk_rows(rows, values, model)
+            if changed:
+                self.apply_bulk_changes(request, model, values, changed)
+
+        if ids is not None:
+            found = {obj.pk for obj in rows}
+            results.extend({'id': pk, 'status': 'not_found'} for pk in dict.fromkeys(ids) if pk not in found)
+        return Response({'updated': len(changed), 'results': results})
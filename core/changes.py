@@ -0,0 +1,174 @@
+"""
+Per-organization change feed for client-side sync.
+
+The web UI refetches whole lists after every mutation. ``get_changes`` lets
+it keep a local store warm instead: given the cursor from its previous call,
+it returns the rows of each synced model created or updated since then, plus
+the ids deleted since then, and a new cursor.
+
+Each model is a separate stream read in ``(updated_at, id)`` order with
+``keyset_filter``, so the ``(organization, updated_at)`` indexes answer every
+page. Deletes leave no row to read, so a ``post_delete`` receiver records a
+``DeletedRecord`` tombstone that forms one more stream.
+
+A row committed a moment after a later row was already served can carry an
+earlier ``updated_at`` than the cursor. When a stream is caught up its
+position is therefore rewound to ``now - CHANGE_FEED_OVERLAP_SECONDS``, and
+the next call re-sends anything in that window; clients apply changes as
+upserts, so repeats are harmless. Tombstones are pruned after
+``CHANGE_FEED_TOMBSTONE_DAYS``; a cursor older than that could miss deletes
+and is answered with 410 Gone so the client starts over.
+"""
+
+import base64
+import binascii
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound
+
+from .eager_loading import eager_load
+from .models import (
+    Account,
+    Contact,
+    DeletedRecord,
+    Lead,
+    Opportunity,
+    Product,
+    Quote,
+    Task,
+)
+from .pagination import keyset_filter
+from .serializers import (
+    AccountSerializer,
+    ContactSerializer,
+    LeadSerializer,
+    OpportunitySerializer,
+    ProductSerializer,
+    QuoteSerializer,
+    TaskSerializer,
+)
+
+# Synced models by the type name used in payloads and tombstones
+CHANGE_FEED_TYPES = {
+    'account': (Account, AccountSerializer),
+    'contact': (Contact, ContactSerializer),
+    'lead': (Lead, LeadSerializer),
+    'opportunity': (Opportunity, OpportunitySerializer),
+    'task': (Task, TaskSerializer),
+    'quote': (Quote, QuoteSerializer),
+    'product': (Product, ProductSerializer),
+}
+
+UPDATED_ORDERING = ('updated_at', 'id')
+DELETED_ORDERING = ('deleted_at', 'id')
+DELETED_STREAM = 'deleted'
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = 'Cursor is older than the tombstone retention; sync again without a cursor.'
+    default_code = 'cursor_expired'
+
+
+def encode_cursor(positions):
+    payload = {
+        name: [position[0].isoformat(), position[1]]
+        for name, position in positions.items()
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode()
+
+
+def decode_cursor(token):
+    """Return ``{stream: [datetime, id]}`` from a cursor, raising NotFound when malformed."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+        positions = {
+            name: [parse_datetime(position[0]), int(position[1])]
+            for name, position in payload.items()
+            if name in CHANGE_FEED_TYPES or name == DELETED_STREAM
+        }
+    except (TypeError, ValueError, KeyError, IndexError, AttributeError, binascii.Error):
+        raise NotFound('Invalid cursor') from None
+    if any(position[0] is None or timezone.is_naive(position[0]) for position in positions.values()):
+        raise NotFound('Invalid cursor')
+    return positions
+
+
+def _read_stream(queryset, ordering, position, page_size, horizon):
+    """
+    Read up to ``page_size`` rows after ``position``.
+
+    Returns ``(rows, next_position, has_more)``. A caught-up stream never
+    moves past ``horizon`` so the overlap window is read again next time.
+    """
+    rows = list(keyset_filter(queryset, ordering, position)[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if rows:
+        position = [getattr(rows[-1], field) for field in ordering]
+    if not has_more and (position is None or position[0] > horizon):
+        position = [horizon, 0]
+    return rows, position, has_more
+
+
+def get_changes(organization, cursor=None, page_size=None, serializer_context=None):
+    """
+    Return the organization's changes since ``cursor`` (everything when None)::
+
+        {'cursor': ..., 'has_more': bool,
+         'updated': {type: [serialized rows]}, 'deleted': {type: [ids]}}
+
+    While ``has_more`` is true the client should call again straight away.
+    """
+    page_size = page_size or settings.CHANGE_FEED_PAGE_SIZE
+    now = timezone.now()
+    horizon = now - timedelta(seconds=settings.CHANGE_FEED_OVERLAP_SECONDS)
+    positions = decode_cursor(cursor) if cursor else {}
+
+    deleted_position = positions.get(DELETED_STREAM)
+    retention = timedelta(days=settings.CHANGE_FEED_TOMBSTONE_DAYS)
+    if deleted_position is not None and deleted_position[0] < now - retention:
+        raise CursorExpired()
+
+    has_more = False
+    updated = {}
+    for name, (model, serializer_class) in CHANGE_FEED_TYPES.items():
+        queryset = eager_load(model.objects.filter(organization=organization), serializer_class)
+        rows, positions[name], more = _read_stream(
+            queryset, UPDATED_ORDERING, positions.get(name), page_size, horizon
+        )
+        updated[name] = serializer_class(rows, many=True, context=serializer_context or {}).data
+        has_more = has_more or more
+
+    deleted = {name: [] for name in CHANGE_FEED_TYPES}
+    if cursor:
+        tombstones, positions[DELETED_STREAM], more = _read_stream(
+            DeletedRecord.objects.filter(organization=organization),
+            DELETED_ORDERING, deleted_position, page_size, horizon
+        )
+        for tombstone in tombstones:
+            deleted[tombstone.model].append(tombstone.object_id)
+        has_more = has_more or more
+    else:
+        # A full sync has nothing to delete; only later tombstones matter
+        positions[DELETED_STREAM] = [horizon, 0]
+
+    return {
+        'cursor': encode_cursor(positions),
+        'has_more': has_more,
+        'updated': updated,
+        'deleted': deleted,
+    }
+
+
+def prune_tombstones(days=None):
+    """Delete tombstones past the retention window; returns how many were removed."""
+    days = settings.CHANGE_FEED_TOMBSTONE_DAYS if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = DeletedRecord.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,96 @@
+"""
+Conditional GET support for the tenant viewsets.
+
+Clients polling a list or record re-download the full payload even when
+nothing changed. ``ConditionalGetMixin`` answers ``list`` and ``retrieve``
+with an ``ETag`` derived from the rows' ``updated_at``, and returns
+``304 Not Modified`` to a matching ``If-None-Match`` before anything is
+serialized. The check is a single query: ``MAX(updated_at), COUNT(*)`` over
+the filtered list, or the record's ``updated_at`` for a detail.
+
+Detail responses also carry ``Last-Modified`` and honour
+``If-Modified-Since``. Lists do not: deleting a row lowers the count without
+moving ``MAX(updated_at)``, so only the ETag notices it. Validators follow the
+viewset's own rows; a change to a related row shown in the payload (such as
+an owner's name) does not move them. The ETags are therefore weak (``W/"..."``):
+they promise an equivalent representation of the same rows, not identical
+bytes, and ``If-None-Match`` uses the weak comparison RFC 9110 prescribes.
+"""
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def _opaque_tag(etag):
+    # Weak comparison ignores the W/ prefix on either side
+    return etag.removeprefix('W/')
+
+
+class ConditionalGetMixin:
+    """
+    Viewset mixin adding ETag/Last-Modified validators to ``list`` and
+    ``retrieve``. The model must have the ``conditional_get_field``
+    timestamp, kept current on every write (``auto_now`` does this for
+    ``save()``; ``update()`` callers must set it themselves).
+    """
+    conditional_get_field = 'updated_at'
+
+    def get_list_version(self):
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        version = queryset.aggregate(last_modified=Max(self.conditional_get_field), count=Count('pk'))
+        return version['last_modified'], version['count']
+
+    def get_detail_version(self):
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.get_queryset().filter(**{self.lookup_field: self.kwargs[lookup]})
+        return queryset.values_list(self.conditional_get_field, flat=True).first()
+
+    def make_etag(self, request, *version):
+        """Weak ETag for ``version``: related rows in the payload are not covered."""
+        parts = [
+            request.get_full_path(),
+            request.accepted_renderer.format,
+            str(request.user.organization_id),
+            request.user.role,
+            *(value.isoformat() if hasattr(value, 'isoformat') else str(value) for value in version),
+        ]
+        return 'W/' + quote_etag(hashlib.sha256('|'.join(parts).encode()).hexdigest())
+
+    def conditional_response(self, handler, request, etag, last_modified, *args, **kwargs):
+        headers = {'ETag': etag}
+        if last_modified is not None:
+            headers['Last-Modified'] = http_date(last_modified.timestamp())
+
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match is not None:
+            not_modified = if_none_match.strip() == '*' or _opaque_tag(etag) in {
+                _opaque_tag(tag) for tag in parse_etags(if_none_match)
+            }
+        else:
+            since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+            not_modified = last_modified is not None and since is not None and int(last_modified.timestamp()) <= since
+        if not_modified:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            for name, value in headers.items():
+                response[name] = value
+        return response
+
+    def list(self, request, *args, **kwargs):
+        last_modified, count = self.get_list_version()
+        etag = self.make_etag(request, last_modified, count)
+        return self.conditional_response(super().list, request, etag, None, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        last_modified = self.get_detail_version()
+        if last_modified is None:
+            # Missing or foreign record: let the normal path answer 404
+            return super().retrieve(request, *args, **kwargs)
+        etag = self.make_etag(request, last_modified)
+        return self.conditional_response(super().retrieve, request, etag, last_modified, *args, **kwargs)
@@ -0,0 +1,106 @@
+"""
+Request handling shared by the sync and async dashboard endpoints.
+
+``DashboardActivityView`` and ``async_views.dashboard_activity`` return the
+same JSON from the same cache entries; only how they query differs. Parsing
+the parameters, resolving ``?user=`` and the aggregate cache keys live here
+so the two cannot drift apart.
+"""
+
+from functools import partial
+
+from django.contrib.auth import get_user_model
+
+from .models import Lead, Opportunity, Task
+from .utils import (
+    aget_activity_summary,
+    aget_lead_status_counts,
+    aget_overdue_task_count,
+    aget_pipeline_summary,
+    aget_top_active_entities,
+    get_activity_summary,
+    get_lead_status_counts,
+    get_overdue_task_count,
+    get_pipeline_summary,
+    get_top_active_entities,
+)
+
+User = get_user_model()
+
+# Roles that may look at another user's activity
+USER_FILTER_ROLES = ('admin', 'manager')
+
+
+def int_param(params, name, default, maximum):
+    """``params[name]`` as an int between 1 and ``maximum``; ``default`` when missing or invalid."""
+    try:
+        value = int(params.get(name, default))
+    except ValueError:
+        value = default
+    return max(1, min(value, maximum))
+
+
+def parse_dashboard_params(params):
+    """Return ``(days, limit, user filter)`` from the query parameters."""
+    return int_param(params, 'days', 7, 365), int_param(params, 'limit', 20, 100), params.get('user')
+
+
+def resolve_user_filter(request_user, user_filter):
+    """
+    Interpret ``?user=`` as ``(user, lookup)``.
+
+    ``lookup`` is None when ``user`` is final (no filter, ``me``, or a role
+    that may not filter); otherwise the caller evaluates the queryset with
+    ``first()``/``afirst()`` and answers 404 when it finds nobody.
+    """
+    if user_filter == 'me':
+        return request_user, None
+    if not user_filter or request_user.role not in USER_FILTER_ROLES:
+        return None, None
+    if not user_filter.isdigit():
+        return None, User.objects.none()
+    return None, User.objects.filter(id=user_filter, organization_id=request_user.organization_id)
+
+
+def pipeline_cache_variant(stage):
+    return f'stage:{stage}'
+
+
+def dashboard_aggregates(organization_id, user, days, today):
+    """
+    ``{response key: (group, variant, compute, acompute)}`` for the cached
+    dashboard aggregates, in response order. ``compute`` and ``acompute``
+    take no arguments, for ``get_or_compute`` and ``aget_or_compute``.
+    """
+    opportunities = Opportunity.objects.filter(organization_id=organization_id)
+    leads = Lead.objects.filter(organization_id=organization_id)
+    tasks = Task.objects.filter(organization_id=organization_id)
+    summary = {'organization': organization_id, 'user': user, 'days': days}
+    top = {'days': days, 'limit': 10, 'organization': organization_id}
+    return {
+        'summary': (
+            'activity', f"summary:{user.id if user else 'all'}:{days}",
+            partial(get_activity_summary, **summary), partial(aget_activity_summary, **summary),
+        ),
+        'top_entities': (
+            'activity', f'top:{days}',
+            partial(get_top_active_entities, **top), partial(aget_top_active_entities, **top),
+        ),
+        'pipeline': (
+            'pipeline', pipeline_cache_variant(''),
+            partial(get_pipeline_summary, opportunities), partial(aget_pipeline_summary, opportunities),
+        ),
+        'leads_by_status': (
+            'leads', 'status',
+            partial(get_lead_status_counts, leads), partial(aget_lead_status_counts, leads),
+        ),
+        'overdue_tasks': (
+            'tasks', f'overdue:{today.isoformat()}',
+            partial(get_overdue_task_count, tasks, today), partial(aget_overdue_task_count, tasks, today),
+        ),
+    }
+
+
+def dashboard_filters(days, limit, user):
+    """The ``filters`` block echoed in the response."""
+    return {'days': days, 'limit': limit, 'user': user.id if user else None}
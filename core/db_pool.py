@@ -0,0 +1,48 @@
+"""
+Statistics of the psycopg connection pool (``DATABASE_POOL=true``).
+
+Django keeps one pool per database alias in each worker process, so the
+numbers describe the worker that serves the request. Counters accumulate
+from the moment the pool opened.
+"""
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def get_pool(alias=DEFAULT_DB_ALIAS):
+    """Return the alias' ``ConnectionPool``, or None when pooling is off."""
+    return getattr(connections[alias], 'pool', None)
+
+
+def pool_stats(alias=DEFAULT_DB_ALIAS):
+    """Return sizing, saturation and wait-time figures for the alias' pool, or None."""
+    pool = get_pool(alias)
+    if pool is None:
+        return None
+    stats = pool.get_stats()
+    size = stats.get('pool_size', 0)
+    in_use = size - stats.get('pool_available', 0)
+    requests = stats.get('requests_num', 0)
+    return {
+        'min_size': pool.min_size,
+        'max_size': pool.max_size,
+        'size': size,
+        'in_use': in_use,
+        # Share of max_size checked out (including this request's); at 1.0 new requests queue
+        'saturation': round(in_use / pool.max_size, 3),
+        'requests_waiting': stats.get('requests_waiting', 0),
+        'requests': requests,
+        'requests_queued': stats.get('requests_queued', 0),
+        'mean_wait_ms': round(stats.get('requests_wait_ms', 0) / requests, 2) if requests else 0,
+        'timeouts': stats.get('requests_errors', 0),
+        'connections_opened': stats.get('connections_num', 0),
+        'connections_lost': stats.get('connections_lost', 0),
+        'returns_bad': stats.get('returns_bad', 0),
+    }
+
+
+def close_pools():
+    """Close the pools of initialized connections, e.g. before gunicorn forks workers."""
+    for connection in connections.all(initialized_only=True):
+        if getattr(connection, 'pool', None) is not None:
+            connection.close_pool()
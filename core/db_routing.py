@@ -0,0 +1,289 @@
+"""
+Primary/replica database routing.
+
+``ReplicaRoutingMiddleware`` lets GET, HEAD and OPTIONS requests read from a
+replica in ``settings.DATABASE_REPLICAS``; the analytics helpers in
+``core/utils.py`` do the same wherever they run via ``reads_from_replica``.
+Every write goes to the primary and pins the rest of the request, and the
+writer's next requests, to it, so callers always read their own writes. The
+pin is kept per user in the ``routing`` cache, which every worker shares:
+cross-origin API clients such as the web UI do not send cookies back. A
+short-lived cookie also pins same-origin session clients such as the admin,
+whose lazily loaded user the middleware does not resolve.
+
+Replicas whose replication lag exceeds ``DATABASE_REPLICA_MAX_LAG_SECONDS``,
+or that cannot be reached, are skipped until the next check; with none left,
+reads fall back to the primary.
+"""
+
+import logging
+import math
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils.functional import LazyObject
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PRIMARY_PIN_COOKIE = 'db_primary_pin'
+
+# Cache alias shared by every worker for writer pins and the response and
+# aggregate caches' recently-written markers (core/response_cache.py)
+ROUTING_CACHE_ALIAS = 'routing'
+
+# Seconds the replica is behind; 0 on a primary and on a caught-up replica,
+# whose last replayed transaction may be old simply because nothing was written
+REPLICATION_LAG_SQL = '''
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+'''
+
+
+def _pin_key(user_id):
+    return f'primary_pin:user:{user_id}'
+
+
+def request_user_id(request):
+    """
+    Return the id of the user ``request`` has been authenticated as so far,
+    or None. Never triggers authentication: DRF and the async views replace
+    ``request.user`` with the user they authenticate, while the session
+    middleware's lazy user is left unresolved.
+    """
+    user = vars(request).get('user')
+    if user is None or isinstance(user, LazyObject) or not user.is_authenticated:
+        return None
+    return user.pk
+
+
+class RoutingState:
+    """Where the current request or block may read from."""
+
+    def __init__(self, replica_reads=False, pinned=False, request=None):
+        self.replica_reads = replica_reads
+        # Set inside primary_reads(); wins over replica_reads()
+        self.primary_only = False
+        # Set by a pin cookie or the user's pin from an earlier write
+        self.pinned = pinned
+        # Set by the first write of this request
+        self.wrote = False
+        self.request = request
+        self.user_pin_checked = False
+
+    @property
+    def use_primary(self):
+        return self.primary_only or self.wrote or not self.replica_reads or self.is_pinned()
+
+    def is_pinned(self):
+        """Look up the user's pin once the request is authenticated (reads before that may use a replica)."""
+        if not self.pinned and not self.user_pin_checked and self.request is not None:
+            user_id = request_user_id(self.request)
+            if user_id is not None:
+                self.user_pin_checked = True
+                self.pinned = bool(caches[ROUTING_CACHE_ALIAS].get(_pin_key(user_id)))
+        return self.pinned
+
+
+_routing_state = ContextVar('db_routing_state', default=None)
+
+# alias -> (monotonic time checked, lag in seconds), per process
+_replica_lag = {}
+
+
+def measure_replica_lag(alias):
+    """Return the replication lag of ``alias`` in seconds, ``inf`` when it is unreachable."""
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(REPLICATION_LAG_SQL)
+            return float(cursor.fetchone()[0])
+    except DatabaseError:
+        logger.warning('Replica %s is unreachable; reading from the primary', alias, exc_info=True)
+        return math.inf
+
+
+def get_replica_lag(alias):
+    """Return the lag of ``alias``, measured at most every DATABASE_REPLICA_LAG_CHECK_SECONDS."""
+    now = time.monotonic()
+    checked_at, lag = _replica_lag.get(alias, (None, None))
+    if checked_at is None or now - checked_at >= settings.DATABASE_REPLICA_LAG_CHECK_SECONDS:
+        lag = measure_replica_lag(alias)
+        _replica_lag[alias] = (now, lag)
+        if lag > settings.DATABASE_REPLICA_MAX_LAG_SECONDS and math.isfinite(lag):
+            logger.warning('Replica %s is %.1fs behind; reading from the primary', alias, lag)
+    return lag
+
+
+def get_replica():
+    """Pick a replica within the lag limit, or None."""
+    replicas = [
+        alias for alias in settings.DATABASE_REPLICAS
+        if get_replica_lag(alias) <= settings.DATABASE_REPLICA_MAX_LAG_SECONDS
+    ]
+    return random.choice(replicas) if replicas else None
+
+
+def get_read_alias():
+    """Return the alias reads would use right now, for querysets evaluated later."""
+    state = _routing_state.get()
+    if state is None or state.use_primary or not settings.DATABASE_REPLICAS:
+        return DEFAULT_DB_ALIAS
+    return get_replica() or DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def _flagged(flag):
+    state = _routing_state.get()
+    if state is None:
+        state = RoutingState()
+        setattr(state, flag, True)
+        token = _routing_state.set(state)
+        try:
+            yield
+        finally:
+            _routing_state.reset(token)
+        return
+    previous = getattr(state, flag)
+    setattr(state, flag, True)
+    try:
+        yield
+    finally:
+        setattr(state, flag, previous)
+
+
+def replica_reads():
+    """Let reads in the block use a replica, unless the request already wrote."""
+    return _flagged('replica_reads')
+
+
+def primary_reads():
+    """Send reads in the block to the primary, even inside ``replica_reads()``."""
+    return _flagged('primary_only')
+
+
+def reads_from_replica(func):
+    """Decorate a (sync or async) report helper so its queries may run on a replica."""
+    if iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with replica_reads():
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with replica_reads():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    """Reads go to a replica where the routing state allows it; writes always go to the primary."""
+
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state is None:
+            # Outside requests and report helpers, Django's defaults apply
+            return None
+        if state.use_primary or not settings.DATABASE_REPLICAS:
+            return DEFAULT_DB_ALIAS
+        # Keep related lookups of a replica-loaded object on the same replica
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db in settings.DATABASE_REPLICAS:
+            return instance._state.db
+        return get_replica() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the primary's rows
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication
+        if settings.DATABASES[db].get('TEST', {}).get('MIRROR'):
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Route safe-method requests to replicas and pin writers to the primary.
+
+    A request that writes pins its user (and sets ``db_primary_pin``) for
+    ``DATABASE_PRIMARY_PIN_SECONDS``, long enough for replicas within the lag
+    limit to catch up, so the writer's next GETs still see the write.
+    """
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        if settings.DATABASE_REPLICAS and isinstance(caches[ROUTING_CACHE_ALIAS], LocMemCache):
+            raise ImproperlyConfigured(
+                'Read replicas need a routing cache shared by every worker; '
+                'set DATABASE_ROUTING_CACHE_URL (or RESPONSE_CACHE_URL) to a Redis URL'
+            )
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RoutingState(
+            replica_reads=request.method in SAFE_METHODS,
+            pinned=PRIMARY_PIN_COOKIE in request.COOKIES,
+            request=request,
+        )
+        token = _routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+        return self.pin_writer(request, response, state)
+
+    async def __acall__(self, request):
+        state = RoutingState(
+            replica_reads=request.method in SAFE_METHODS,
+            pinned=PRIMARY_PIN_COOKIE in request.COOKIES,
+            request=request,
+        )
+        token = _routing_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing_state.reset(token)
+        return self.pin_writer(request, response, state)
+
+    def pin_writer(self, request, response, state):
+        if state.wrote and settings.DATABASE_REPLICAS and settings.DATABASE_PRIMARY_PIN_SECONDS:
+            user_id = request_user_id(request)
+            if user_id is not None:
+                caches[ROUTING_CACHE_ALIAS].set(_pin_key(user_id), True, timeout=settings.DATABASE_PRIMARY_PIN_SECONDS)
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE, '1',
+                max_age=settings.DATABASE_PRIMARY_PIN_SECONDS,
+                secure=request.is_secure(),
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -0,0 +1,144 @@
+"""
+Serializer-driven eager loading for the tenant viewsets.
+
+Serializers in this app expose related data through dotted ``source`` paths
+(``owner.get_full_name``, ``account.name``) and nested serializers
+(``QuoteSerializer.line_items``). Each of those is one query per row unless
+the queryset joins or prefetches the relation up front. This module inspects
+a serializer class once, derives the ``select_related``/``prefetch_related``
+lookups it needs, and applies them to any queryset.
+"""
+
+from functools import cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+def _get_relation(model, name):
+    """Return the relation field called ``name`` on ``model``, or None."""
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    return field if field.is_relation else None
+
+
+def _follow(field, model, prefix, attrs, prefetch):
+    """
+    Follow ``attrs`` from ``model`` through single-valued relations.
+
+    The first multi-valued relation ends the walk and is recorded in
+    ``prefetch``, with the nested serializer's own plan when ``field`` is
+    nested at that point. Returns the model reached, the join path and the
+    number of relations followed.
+    """
+    nested = isinstance(field, serializers.BaseSerializer)
+    current, path, followed = model, list(prefix), 0
+    for name in attrs:
+        relation = _get_relation(current, name)
+        if relation is None:
+            break
+        if relation.one_to_many or relation.many_to_many:
+            child_plan = ((), ())
+            if nested and followed == len(attrs) - 1:
+                child = field.child if isinstance(field, serializers.ListSerializer) else field
+                child_plan = _build_plan(child, relation.related_model)
+            prefetch.setdefault('__'.join(path + [name]), (relation.related_model, child_plan))
+            break
+        path.append(name)
+        current = relation.related_model
+        followed += 1
+    return current, path, followed
+
+
+def _collect_field(field, model, prefix, select, prefetch):
+    """Record the relations one readable serializer field touches."""
+    nested = isinstance(field, serializers.BaseSerializer)
+    if field.source == '*':
+        if nested:
+            _collect(field, model, prefix, select, prefetch)
+        return
+
+    # A plain field only needs the relations leading up to its final
+    # attribute; primary-key related fields read ``<name>_id`` directly.
+    # Nested serializers and many-related fields need the whole path.
+    follows_all = nested or isinstance(field, serializers.ManyRelatedField)
+    attrs = field.source_attrs if follows_all else field.source_attrs[:-1]
+
+    current, path, followed = _follow(field, model, prefix, attrs, prefetch)
+    if len(path) > len(prefix):
+        select.add('__'.join(path))
+    if nested and attrs and followed == len(attrs):
+        _collect(field, current, path, select, prefetch)
+
+
+def _collect(serializer, model, prefix, select, prefetch):
+    """
+    Walk ``serializer``'s readable fields and record the relations they touch.
+
+    Forward single-valued relations go into ``select`` as ``__``-joined paths.
+    The first multi-valued relation on a path ends the join chain and goes
+    into ``prefetch`` together with the plan of the nested serializer, if any.
+    """
+    for field in serializer.fields.values():
+        if not field.write_only:
+            _collect_field(field, model, prefix, select, prefetch)
+
+
+def _build_plan(serializer, model):
+    select, prefetch = set(), {}
+    _collect(serializer, model, [], select, prefetch)
+    return (
+        tuple(sorted(select)),
+        tuple((path, related, plan) for path, (related, plan) in sorted(prefetch.items())),
+    )
+
+
+@cache
+def get_eager_loading_plan(serializer_class):
+    """
+    Return the cached ``(select_related, prefetch)`` plan for a serializer.
+
+    ``prefetch`` entries are ``(lookup, related_model, nested_plan)`` tuples so
+    that prefetched rows get their own relations joined as well.
+    """
+    serializer = serializer_class()
+    return _build_plan(serializer, serializer.Meta.model)
+
+
+def _apply_plan(queryset, plan):
+    select, prefetch = plan
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*[
+            Prefetch(lookup, queryset=_apply_plan(related._default_manager.all(), nested))
+            for lookup, related, nested in prefetch
+        ])
+    return queryset
+
+
+def eager_load(queryset, serializer_class):
+    """Join and prefetch everything ``serializer_class`` reads from ``queryset``."""
+    return _apply_plan(queryset, get_eager_loading_plan(serializer_class))
+
+
+class EagerLoadingMixin:
+    """
+    Viewset mixin that eager-loads the serializer's relations.
+
+    Hooks into ``filter_queryset`` so list and retrieve share the same plan
+    without each ``get_queryset()`` having to repeat it. Other actions reach
+    ``filter_queryset`` through ``get_object()`` as well, but respond with
+    something else (or write first), so they are left alone; custom actions
+    should call ``eager_load`` with the serializer they respond with.
+    """
+    eager_load_actions = ('list', 'retrieve')
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action not in self.eager_load_actions:
+            return queryset
+        return eager_load(queryset, self.get_serializer_class())
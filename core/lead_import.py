@@ -0,0 +1,289 @@
+"""
+Bulk lead import from CSV or JSONL.
+
+Creating leads one by one through ``LeadViewSet.create`` costs an INSERT for
+the lead plus one for its "New lead created" log (``log_lead_creation``). The
+importer instead streams the file, validates rows with
+``LeadImportRowSerializer`` and writes each batch with two multi-row INSERTs:
+one for the leads and one for their creation logs. Only the current batch is
+held in memory, and each batch commits on its own, so a bad row never costs
+the rows around it.
+
+Uploads larger than ``LEAD_IMPORT_SYNC_MAX_BYTES`` would outlast the worker
+timeout, so the endpoint stores them with ``queue_import`` and returns a
+``LeadImportJob`` instead; the ``run_lead_imports`` command imports them.
+A job records its result with every committed batch, so a job whose runner
+died is claimed again after ``LEAD_IMPORT_JOB_TIMEOUT_SECONDS`` and resumes
+after the rows it already imported.
+"""
+
+import csv
+import json
+import logging
+import uuid
+from datetime import timedelta
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+from rest_framework import serializers
+
+from .activity_stream import announce_activity
+from .aggregate_cache import invalidate_aggregates
+from .models import InteractionLog, Lead, LeadImportJob
+from .response_cache import bump_generations
+from .serializers import LeadImportRowSerializer
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = 1000
+IMPORT_FORMATS = ('csv', 'jsonl')
+# Only the first errors are kept for the report; the rest are just counted
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportFileError(ValueError):
+    """The file itself is unreadable from ``line_number`` on, so the import stops there."""
+
+    def __init__(self, line_number, message):
+        super().__init__(f'Line {line_number}: {message}')
+        self.line_number = line_number
+        self.message = message
+
+
+def guess_import_format(filename):
+    """Return ``'jsonl'`` for ``.jsonl``/``.ndjson`` files and ``'csv'`` otherwise."""
+    return 'jsonl' if filename.lower().endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def iter_import_rows(stream, file_format):
+    """
+    Yield ``(line_number, row, error)`` for every record in a binary ``stream``.
+
+    ``row`` is a dict with lower-cased keys and blank values dropped, so that
+    empty CSV cells fall back to the serializer defaults. Raises
+    ``ImportFileError`` on bytes that are not UTF-8 or malformed CSV.
+    """
+    text = _decode_lines(stream)
+    if file_format == 'csv':
+        reader = csv.DictReader(text)
+        try:
+            for row in reader:
+                yield reader.line_num, _clean_row(row), None
+        except csv.Error as exc:
+            # line_num only counts the lines the reader got through
+            raise ImportFileError(reader.line_num + 1, f'Invalid CSV: {exc}') from None
+        return
+
+    for line_number, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_number, None, {'non_field_errors': ['Invalid JSON']}
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, {'non_field_errors': ['Expected a JSON object']}
+            continue
+        yield line_number, _clean_row(row), None
+
+
+def _decode_lines(stream):
+    # Decoded line by line, so an encoding error points at its own line
+    for line_number, line in enumerate(stream, 1):
+        try:
+            yield line.decode('utf-8-sig' if line_number == 1 else 'utf-8')
+        except UnicodeDecodeError:
+            raise ImportFileError(line_number, 'File is not valid UTF-8') from None
+
+
+def _clean_row(row):
+    return {
+        str(key).strip().lower(): value.strip() if isinstance(value, str) else value
+        for key, value in row.items()
+        if key is not None and value not in (None, '')
+    }
+
+
+def _creation_summary(lead):
+    # Same wording as signals.log_lead_creation
+    return f"New lead created: {lead.name} from {lead.company or 'Unknown Company'}"
+
+
+class LeadImport:
+    """
+    Import leads into ``organization`` on behalf of ``user``.
+
+    Rows without ``assigned_to`` are assigned to ``user``. ``progress`` is
+    called with the running ``result`` dict after every batch, inside the
+    batch's transaction, so whatever it records commits with the rows.
+    """
+
+    def __init__(self, organization, user, batch_size=IMPORT_BATCH_SIZE, progress=None):
+        self.organization = organization
+        self.user = user
+        self.batch_size = batch_size
+        self.progress = progress
+        self.row_serializer = LeadImportRowSerializer()
+        self.assignees = {user.email.lower(): user} if user.email else {}
+        self.result = {'processed': 0, 'created': 0, 'failed': 0, 'errors': []}
+
+    def run(self, rows):
+        """
+        Import ``(line_number, row, error)`` tuples from ``iter_import_rows`` and return the result.
+
+        On ``ImportFileError`` the rows read before the bad line are still
+        imported, then the error propagates.
+        """
+        batch = []
+        try:
+            for line_number, row, error in rows:
+                self.result['processed'] += 1
+                if error is None:
+                    try:
+                        batch.append((line_number, self.row_serializer.run_validation(row)))
+                    except serializers.ValidationError as exc:
+                        error = exc.detail
+                if error is not None:
+                    self.add_error(line_number, error)
+                if len(batch) >= self.batch_size:
+                    self.write_batch(batch)
+                    batch = []
+        except ImportFileError:
+            if batch:
+                self.write_batch(batch)
+            raise
+        if batch:
+            self.write_batch(batch)
+        elif self.progress:
+            self.progress(self.result)
+        return self.result
+
+    def add_error(self, line_number, errors):
+        self.result['failed'] += 1
+        if len(self.result['errors']) < MAX_REPORTED_ERRORS:
+            self.result['errors'].append({'line': line_number, 'errors': errors})
+
+    def resolve_assignees(self, batch):
+        """Load the users named in ``assigned_to`` with one query per batch."""
+        missing = {data['assigned_to'].lower() for _, data in batch if data['assigned_to']} - set(self.assignees)
+        if missing:
+            users = User.objects.alias(email_lower=Lower('email')).filter(
+                organization=self.organization, email_lower__in=missing
+            )
+            for user in users:
+                self.assignees[user.email.lower()] = user
+
+    def write_batch(self, batch):
+        self.resolve_assignees(batch)
+
+        leads = []
+        for line_number, data in batch:
+            email = data.pop('assigned_to').lower()
+            assignee = self.assignees.get(email) if email else self.user
+            if assignee is None:
+                self.add_error(line_number, {'assigned_to': ['No user with this email in the organization.']})
+                continue
+            leads.append(Lead(assigned_to=assignee, organization=self.organization, **data))
+
+        with transaction.atomic():
+            # bulk_create skips post_save, so log_lead_creation is replayed here
+            leads = Lead.objects.bulk_create(leads)
+            logs = InteractionLog.objects.bulk_create([
+                InteractionLog(
+                    user=lead.assigned_to,
+                    lead=lead,
+                    organization=self.organization,
+                    type='note',
+                    summary=_creation_summary(lead),
+                )
+                for lead in leads
+            ])
+            announce_activity(logs)
+            for model in (Lead, InteractionLog):
+                invalidate_aggregates(self.organization.pk, model)
+                bump_generations([self.organization.pk], model)
+
+            self.result['created'] += len(leads)
+            if self.progress:
+                self.progress(self.result)
+
+
+def queue_import(upload, organization, user, file_format):
+    """Store ``upload`` under ``LEAD_IMPORT_UPLOAD_DIR`` and return its pending ``LeadImportJob``."""
+    directory = Path(settings.LEAD_IMPORT_UPLOAD_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f'{uuid.uuid4().hex}.{file_format}'
+    with open(path, 'wb') as stored:
+        for chunk in upload.chunks():
+            stored.write(chunk)
+    return LeadImportJob.objects.create(
+        organization=organization, user=user, file_format=file_format, path=str(path)
+    )
+
+
+def claim_import_job():
+    """
+    Mark the oldest pending job, or a running one whose runner stopped
+    reporting, as running and return it, or ``None``; safe to call concurrently.
+    """
+    now = timezone.now()
+    stalled = now - timedelta(seconds=settings.LEAD_IMPORT_JOB_TIMEOUT_SECONDS)
+    with transaction.atomic():
+        job = (
+            LeadImportJob.objects.select_for_update(skip_locked=True)
+            .filter(Q(status='pending') | Q(status='running', heartbeat_at__lt=stalled))
+            .order_by('created_at', 'pk').first()
+        )
+        if job is not None:
+            job.status = 'running'
+            job.heartbeat_at = now
+            job.save(update_fields=['status', 'heartbeat_at'])
+    return job
+
+
+def run_import_job(job, batch_size=IMPORT_BATCH_SIZE, progress=None):
+    """
+    Import a claimed job's file, record the result on the job and remove the
+    file. A job claimed again resumes after the rows its last committed batch
+    covered. Any error fails the job rather than leaving it running.
+    """
+    def record_progress(result):
+        job.result = result
+        job.heartbeat_at = timezone.now()
+        job.save(update_fields=['result', 'heartbeat_at'])
+        if progress:
+            progress(result)
+
+    importer = LeadImport(job.organization, job.user, batch_size=batch_size, progress=record_progress)
+    if job.result:
+        importer.result = job.result
+    path = Path(job.path)
+    try:
+        try:
+            with open(path, 'rb') as stream:
+                rows = islice(iter_import_rows(stream, job.file_format), importer.result['processed'], None)
+                job.result = importer.run(rows)
+            job.status = 'done'
+        except ImportFileError as exc:
+            job.result = {**importer.result, 'error': exc.message, 'line': exc.line_number}
+            job.status = 'failed'
+        except Exception:
+            # Such as an upload directory the runner does not share; the
+            # details are for the logs, not the API
+            logger.exception('Lead import job %s failed', job.pk)
+            job.result = {**importer.result, 'error': 'The import failed unexpectedly'}
+            job.status = 'failed'
+        job.finished_at = timezone.now()
+        job.save(update_fields=['result', 'status', 'finished_at'])
+    finally:
+        path.unlink(missing_ok=True)
+    return job
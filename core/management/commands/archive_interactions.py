@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from core.archive import archive_organization, retention_days
+from core.models import Organization
+
+
+class Command(BaseCommand):
+    help = 'Move interaction logs older than each organization\'s retention window to compressed archive files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', type=int, action='append',
+                            help='Only archive this organization id (repeatable)')
+        parser.add_argument('--batch-size', type=int,
+                            help='Rows written per archive file (default INTERACTION_LOG_ARCHIVE_BATCH_SIZE)')
+        parser.add_argument('--delete-chunk', type=int,
+                            help='Rows deleted per transaction (default INTERACTION_LOG_ARCHIVE_DELETE_CHUNK)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only count the rows that would be archived')
+
+    def handle(self, *args, **options):
+        organizations = Organization.objects.order_by('pk')
+        if options['organization']:
+            organizations = organizations.filter(pk__in=options['organization'])
+
+        total = 0
+        for organization in organizations:
+            archived = archive_organization(
+                organization,
+                batch_size=options['batch_size'],
+                delete_chunk=options['delete_chunk'],
+                dry_run=options['dry_run'],
+            )
+            if archived:
+                verb = 'Would archive' if options['dry_run'] else 'Archived'
+                self.stdout.write(
+                    f'{verb} {archived} interaction logs of {organization} '
+                    f'older than {retention_days(organization)} days'
+                )
+            total += archived
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} interaction logs archived' + (' (dry run)' if options['dry_run'] else '')
+        ))
@@ -0,0 +1,208 @@
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.models import (
+    Account,
+    Contact,
+    InteractionLog,
+    Lead,
+    Opportunity,
+    Organization,
+    Quote,
+    Task,
+)
+from core.pagination import keyset_filter
+from core.partitions import partition_names
+from core.utils import get_pipeline_rows
+
+User = get_user_model()
+
+SEED_PREFIX = 'Query plan check'
+
+
+def hot_queries(organization, sample):
+    """
+    Querysets mirroring the hottest reads in ``core/views.py``.
+
+    Each entry is ``(label, model, queryset)``; paginated lists are sliced the
+    way ``PageNumberPagination`` slices them, and deep cursor pages are
+    filtered the way ``KeysetPagination`` filters them.
+    """
+    today = date.today()
+    leads = Lead.objects.filter(organization=organization)
+    opportunities = Opportunity.objects.filter(organization=organization)
+    tasks = Task.objects.filter(organization=organization)
+    interactions = InteractionLog.objects.filter(organization=organization)
+    quotes = Quote.objects.filter(organization=organization)
+    contacts = Contact.objects.filter(organization=organization)
+    return [
+        ('leads list', Lead, leads.order_by('-created_at')[:10]),
+        ('leads by status', Lead, leads.filter(status='qualified').order_by('-created_at')[:10]),
+        ('accounts list', Account, Account.objects.filter(organization=organization).order_by('-created_at')[:10]),
+        ('contacts list', Contact, contacts.order_by('-created_at')[:10]),
+        ('account contacts', Contact, contacts.filter(account_id=sample['account']).order_by('-created_at')),
+        ('opportunities list', Opportunity, opportunities.order_by('-created_at')[:10]),
+        ('opportunities by stage', Opportunity, opportunities.filter(stage='proposal').order_by('-created_at')[:10]),
+        ('account opportunities', Opportunity, opportunities.filter(account_id=sample['account'])),
+        ('pipeline value', Opportunity, get_pipeline_rows(opportunities)),
+        ('tasks by status', Task, tasks.filter(status='pending').order_by('due_date')[:10]),
+        ('overdue tasks', Task, tasks.filter(due_date__lt=today, status='pending').order_by('due_date')),
+        ('interaction feed', InteractionLog, interactions.order_by('-timestamp')[:10]),
+        ('interaction feed cursor page', InteractionLog,
+         keyset_filter(interactions, ('-timestamp', '-id'), sample['interaction_position'])[:11]),
+        ('leads cursor page', Lead, keyset_filter(leads, ('-created_at', '-id'), sample['lead_position'])[:11]),
+        ('lead interactions', InteractionLog, interactions.filter(lead_id=sample['lead']).order_by('-timestamp')[:10]),
+        ('contact interactions', InteractionLog, interactions.filter(contact_id=sample['contact']).order_by('-timestamp')[:10]),
+        ('opportunity interactions', InteractionLog,
+         interactions.filter(opportunity_id=sample['opportunity']).order_by('-timestamp')[:10]),
+        ('quotes list', Quote, quotes.order_by('-created_at')[:10]),
+        ('opportunity quotes', Quote, quotes.filter(opportunity_id=sample['opportunity']).order_by('-created_at')),
+    ]
+
+
+def iter_plan_nodes(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from iter_plan_nodes(child)
+
+
+def scan_index_names(node):
+    """
+    Index names a table scan node reads through; a bitmap heap scan reads
+    through the bitmap index scans beneath it.
+    """
+    if 'Index Name' in node:
+        return [node['Index Name']]
+    return [child['Index Name'] for child in iter_plan_nodes(node) if child['Node Type'] == 'Bitmap Index Scan']
+
+
+def empty_relations(names):
+    """Names among ``names`` that planner statistics record as empty."""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT relname FROM pg_class WHERE relname = ANY(%s) AND reltuples = 0', [list(names)])
+        return {name for (name,) in cursor.fetchall()}
+
+
+def check_plan(model, queryset):
+    """
+    Return ``(ok, summary)`` for a queryset's plan against ``model``'s table.
+
+    A plan passes when the table is read through an index and never through
+    a sequential scan. On a partitioned table every partition with rows
+    counts; empty ones (months created ahead) are rightly read sequentially.
+    """
+    plan = json.loads(queryset.explain(format='json'))[0]['Plan']
+    table = model._meta.db_table
+    partitions = partition_names(table)
+    relations = {table, *partitions} - empty_relations(partitions)
+    scans = [(node, scan_index_names(node)) for node in iter_plan_nodes(plan) if node.get('Relation Name') in relations]
+    ok = bool(scans) and all(indexes for _node, indexes in scans)
+    summary = ', '.join(
+        f"{node['Node Type']}" + (f" using {', '.join(indexes)}" if indexes else '')
+        for node, indexes in scans
+    )
+    return ok, summary or 'table not scanned'
+
+
+class Command(BaseCommand):
+    help = 'Seed a large multi-tenant dataset and check that hot queries use index scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organizations', type=int, default=50,
+                            help='Number of organizations to seed')
+        parser.add_argument('--rows', type=int, default=2000,
+                            help='Rows per table per organization')
+        parser.add_argument('--keep', action='store_true',
+                            help='Commit the seeded data instead of rolling it back')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            organization, sample = self.seed(options['organizations'], options['rows'])
+            self.analyze()
+
+            failures = []
+            for label, model, queryset in hot_queries(organization, sample):
+                ok, summary = check_plan(model, queryset)
+                style = self.style.SUCCESS if ok else self.style.ERROR
+                self.stdout.write(style(f"{'OK  ' if ok else 'FAIL'} {label}: {summary}"))
+                if not ok:
+                    failures.append(label)
+
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"Queries without an index scan: {', '.join(failures)}")
+
+    def seed(self, organization_count, rows):
+        """Bulk-create ``rows`` of each entity for every organization."""
+        self.stdout.write(f'Seeding {organization_count} organizations x {rows} rows per table...')
+        organizations = Organization.objects.bulk_create([
+            Organization(name=f'{SEED_PREFIX} {i}') for i in range(organization_count)
+        ])
+        users = User.objects.bulk_create([
+            User(username=f'plan-check-{org.pk}', email=f'plan-check-{org.pk}@example.com', organization=org)
+            for org in organizations
+        ])
+
+        lead_statuses = [choice for choice, _ in Lead.STATUS_CHOICES]
+        stages = [choice for choice, _ in Opportunity.STAGE_CHOICES]
+        today = date.today()
+        for org, user in zip(organizations, users, strict=True):
+            accounts = Account.objects.bulk_create(
+                [Account(name=f'Account {i}', organization=org) for i in range(rows)], batch_size=5000
+            )
+            contacts = Contact.objects.bulk_create([
+                Contact(name=f'Contact {i}', email=f'c{i}@example.com', account=accounts[i], organization=org)
+                for i in range(rows)
+            ], batch_size=5000)
+            leads = Lead.objects.bulk_create([
+                Lead(name=f'Lead {i}', email=f'l{i}@example.com', status=lead_statuses[i % len(lead_statuses)],
+                     assigned_to=user, organization=org)
+                for i in range(rows)
+            ], batch_size=5000)
+            opportunities = Opportunity.objects.bulk_create([
+                Opportunity(name=f'Deal {i}', account=accounts[i], contact=contacts[i], amount=Decimal(1000 + i),
+                            stage=stages[i % len(stages)], owner=user, organization=org,
+                            close_date=today + timedelta(days=i % 365))
+                for i in range(rows)
+            ], batch_size=5000)
+            Task.objects.bulk_create([
+                Task(title=f'Task {i}', type='call', due_date=today + timedelta(days=(i % 60) - 30),
+                     status='pending' if i % 3 else 'completed', owner=user, organization=org)
+                for i in range(rows)
+            ], batch_size=5000)
+            InteractionLog.objects.bulk_create([
+                InteractionLog(user=user, lead=leads[i], contact=contacts[i], opportunity=opportunities[i],
+                               type='note', summary=f'Activity {i}', organization=org)
+                for i in range(rows)
+            ], batch_size=5000)
+            Quote.objects.bulk_create([
+                Quote(opportunity=opportunities[i], title=f'Quote {i}', created_by=user, organization=org)
+                for i in range(rows)
+            ], batch_size=5000)
+
+        organization = organizations[0]
+        sample = {
+            'account': Account.objects.filter(organization=organization).values_list('pk', flat=True).first(),
+            'contact': Contact.objects.filter(organization=organization).values_list('pk', flat=True).first(),
+            'lead': Lead.objects.filter(organization=organization).values_list('pk', flat=True).first(),
+            'opportunity': Opportunity.objects.filter(organization=organization).values_list('pk', flat=True).first(),
+            # Sort keys from the middle of the table, as a deep cursor would carry
+            'interaction_position': InteractionLog.objects.filter(organization=organization).order_by(
+                '-timestamp', '-id').values_list('timestamp', 'id')[rows // 2],
+            'lead_position': Lead.objects.filter(organization=organization).order_by(
+                '-created_at', '-id').values_list('created_at', 'id')[rows // 2],
+        }
+        return organization, sample
+
+    def analyze(self):
+        """Refresh planner statistics so the plans reflect the seeded volume."""
+        with connection.cursor() as cursor:
+            for model in (Account, Contact, Lead, Opportunity, Task, InteractionLog, Quote):
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
@@ -0,0 +1,70 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.lead_import import (
+    IMPORT_BATCH_SIZE,
+    IMPORT_FORMATS,
+    ImportFileError,
+    LeadImport,
+    guess_import_format,
+    iter_import_rows,
+)
+from core.models import Organization
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Import leads from a CSV or JSONL file in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=str, help='File to import, or - for stdin')
+        parser.add_argument('organization_name', type=str, help='Name of the organization to import into')
+        parser.add_argument('--user-email', type=str, required=True,
+                            help='Email of the user the import runs as; rows without assigned_to go to them')
+        parser.add_argument('--format', dest='file_format', choices=IMPORT_FORMATS,
+                            help='File format (default: guessed from the file extension)')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+                            help='Rows validated and written per batch')
+
+    def handle(self, *args, **options):
+        try:
+            organization = Organization.objects.get(name=options['organization_name'])
+        except Organization.DoesNotExist:
+            raise CommandError(f"Organization {options['organization_name']} not found") from None
+
+        try:
+            user = User.objects.get(email=options['user_email'], organization=organization)
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['user_email']} not found in {organization.name}") from None
+
+        path = options['path']
+        file_format = options['file_format'] or guess_import_format(path)
+        importer = LeadImport(organization, user, batch_size=options['batch_size'], progress=self.report_progress)
+
+        try:
+            if path == '-':
+                result = importer.run(iter_import_rows(sys.stdin.buffer, file_format))
+            else:
+                with open(path, 'rb') as stream:
+                    result = importer.run(iter_import_rows(stream, file_format))
+        except ImportFileError as exc:
+            raise CommandError(
+                f"{exc} ({importer.result['created']} rows imported before it)"
+            ) from None
+
+        for error in result['errors']:
+            self.stderr.write(f"Line {error['line']}: {error['errors']}")
+        if result['failed'] > len(result['errors']):
+            self.stderr.write(f"... and {result['failed'] - len(result['errors'])} more rows with errors")
+
+        style = self.style.SUCCESS if not result['failed'] else self.style.WARNING
+        self.stdout.write(style(
+            f"Imported {result['created']} of {result['processed']} rows into {organization.name} "
+            f"({result['failed']} failed)"
+        ))
+
+    def report_progress(self, result):
+        self.stdout.write(f"Processed {result['processed']} rows: {result['created']} created, {result['failed']} failed")
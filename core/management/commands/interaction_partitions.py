@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.partitions import maintain_partitions
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming monthly InteractionLog partitions and detach those past the retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ahead', type=int, default=settings.INTERACTION_LOG_PARTITIONS_AHEAD,
+                            help='Keep partitions for the next N months')
+        parser.add_argument('--retain-months', type=int, default=settings.INTERACTION_LOG_RETAIN_MONTHS,
+                            help='Detach partitions older than N full months (0 keeps all)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only print what would change')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        created, detached = maintain_partitions(options['ahead'], options['retain_months'], dry_run=dry_run)
+        for name in created:
+            self.stdout.write(f'{"Would create" if dry_run else "Created"} {name}')
+        for name in detached:
+            self.stdout.write(f'{"Would detach" if dry_run else "Detached"} {name}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(created)} partitions created, {len(detached)} detached' + (' (dry run)' if dry_run else '')
+        ))
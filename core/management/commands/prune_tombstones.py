@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.changes import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = 'Delete change-feed tombstones older than the retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.CHANGE_FEED_TOMBSTONE_DAYS,
+                            help='Keep tombstones from the last N days')
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones(options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} tombstones older than {options["days"]} days'))
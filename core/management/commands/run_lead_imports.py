@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from core.lead_import import IMPORT_BATCH_SIZE, claim_import_job, run_import_job
+
+
+class Command(BaseCommand):
+    help = 'Import the lead files queued by the import endpoint, oldest first'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+                            help='Rows validated and written per batch')
+        parser.add_argument('--max-jobs', type=int,
+                            help='Stop after this many jobs (default: until the queue is empty)')
+
+    def handle(self, *args, **options):
+        count = 0
+        while options['max_jobs'] is None or count < options['max_jobs']:
+            job = claim_import_job()
+            if job is None:
+                break
+            run_import_job(job, batch_size=options['batch_size'])
+            result = job.result
+            style = self.style.SUCCESS if job.status == 'done' and not result['failed'] else self.style.WARNING
+            message = f"Job {job.pk}: imported {result['created']} of {result['processed']} rows into {job.organization}"
+            if job.status == 'failed' and 'line' in result:
+                message += f" before line {result['line']}: {result['error']}"
+            elif job.status == 'failed':
+                message += f": {result['error']}"
+            self.stdout.write(style(message))
+            count += 1
+        self.stdout.write(f'{count} import jobs processed')
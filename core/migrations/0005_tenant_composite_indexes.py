@@ -0,0 +1,92 @@
+# Generated by Django 5.1.7 on 2026-10-18 04:10
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without blocking writes on large tenant tables
+    atomic = False
+
+    dependencies = [
+        ('core', '0004_auto_20250710_0505'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='account',
+            index=models.Index(fields=['organization', '-created_at'], name='account_org_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='contact',
+            index=models.Index(fields=['organization', '-created_at'], name='contact_org_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='contact',
+            index=models.Index(fields=['organization', 'account', '-created_at'], name='contact_org_account_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='interactionlog',
+            index=models.Index(fields=['organization', '-timestamp'], name='ilog_org_ts_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='interactionlog',
+            index=models.Index(fields=['organization', 'lead', '-timestamp'], name='ilog_org_lead_ts_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='interactionlog',
+            index=models.Index(fields=['organization', 'contact', '-timestamp'], name='ilog_org_contact_ts_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='interactionlog',
+            index=models.Index(fields=['organization', 'opportunity', '-timestamp'], name='ilog_org_opp_ts_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='lead',
+            index=models.Index(fields=['organization', '-created_at'], name='lead_org_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='lead',
+            index=models.Index(fields=['organization', 'status', '-created_at'], name='lead_org_status_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='opportunity',
+            index=models.Index(fields=['organization', '-created_at'], name='opp_org_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='opportunity',
+            index=models.Index(fields=['organization', 'stage', '-created_at'], name='opp_org_stage_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='opportunity',
+            index=models.Index(fields=['organization', 'account', '-created_at'], name='opp_org_account_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='opportunity',
+            index=models.Index(fields=['organization', 'stage'], include=('amount', 'owner', 'close_date'), name='opp_org_stage_pipeline_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='product',
+            index=models.Index(fields=['organization', 'is_active'], name='product_org_active_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='quote',
+            index=models.Index(fields=['organization', '-created_at'], name='quote_org_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='quote',
+            index=models.Index(fields=['organization', 'opportunity', '-created_at'], name='quote_org_opp_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='quotelineitem',
+            index=models.Index(fields=['organization', 'quote'], name='qli_org_quote_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(fields=['organization', 'due_date'], name='task_org_due_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(fields=['organization', 'status', 'due_date'], name='task_org_status_due_idx'),
+        ),
+    ]
@@ -0,0 +1,163 @@
+# Generated by Django 5.1.7 on 2026-10-18 04:15
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+# Columns and weights feeding each table's search_vector; keep in sync with
+# the models' search_vector_fields
+SEARCH_VECTOR_COLUMNS = {
+    'core_account': [('name', 'A'), ('industry', 'B'), ('website', 'C')],
+    'core_contact': [('name', 'A'), ('title', 'B'), ('email', 'B'), ('phone', 'C')],
+    'core_interactionlog': [('summary', 'A')],
+    'core_lead': [('name', 'A'), ('company', 'A'), ('email', 'B'), ('phone', 'C')],
+    'core_opportunity': [('name', 'A')],
+    'core_product': [('name', 'A'), ('description', 'B')],
+    'core_task': [('title', 'A'), ('notes', 'B')],
+}
+
+# Rows backfilled per UPDATE; each batch commits on its own, so no long lock
+# or transaction is held on large tables
+BACKFILL_BATCH_SIZE = 5000
+
+
+def search_vector_expression(columns, row=''):
+    """
+    The weighted tsvector of ``columns``; ``row`` prefixes the column names.
+
+    Email, URL and phone punctuation is turned into spaces so their parts are
+    searchable on their own.
+    """
+    return ' || '.join(
+        f"setweight(to_tsvector('pg_catalog.simple', "
+        f"translate(coalesce({row}{column}, ''), '@.-_/:()+', '         ')), '{weight}')"
+        for column, weight in columns
+    )
+
+
+def search_vector_sql(table, columns):
+    """
+    Build a BEFORE trigger that rebuilds ``search_vector`` from ``columns``.
+
+    The trigger only fires when a source column is written; existing rows
+    are filled by ``backfill_search_vectors``.
+    """
+    names = ', '.join(column for column, _ in columns)
+    return f"""
+        CREATE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {search_vector_expression(columns, 'NEW.')};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER {table}_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF {names} ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update();
+    """
+
+
+def backfill_search_vectors(apps, schema_editor):
+    """Fill ``search_vector`` for existing rows in id ranges of ``BACKFILL_BATCH_SIZE``."""
+    with schema_editor.connection.cursor() as cursor:
+        for table, columns in SEARCH_VECTOR_COLUMNS.items():
+            cursor.execute(f'SELECT min(id), max(id) FROM {table}')
+            first, last = cursor.fetchone()
+            if first is None:
+                continue
+            for start in range(first, last + 1, BACKFILL_BATCH_SIZE):
+                cursor.execute(
+                    f'UPDATE {table} SET search_vector = {search_vector_expression(columns)} '
+                    f'WHERE id >= %s AND id < %s',
+                    [start, start + BACKFILL_BATCH_SIZE],
+                )
+
+
+def drop_search_vector_sql(table):
+    return f"""
+        DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table};
+        DROP FUNCTION IF EXISTS {table}_search_vector_update();
+    """
+
+
+class Migration(migrations.Migration):
+    # Concurrent index builds cannot run in a transaction, and without one
+    # every backfill batch commits as it goes
+    atomic = False
+
+    dependencies = [
+        ('core', '0005_tenant_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='contact',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='interactionlog',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='lead',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='opportunity',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        *[
+            migrations.RunSQL(search_vector_sql(table, columns), drop_search_vector_sql(table))
+            for table, columns in SEARCH_VECTOR_COLUMNS.items()
+        ],
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='account',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='account_search_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='contact',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='contact_search_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='interactionlog',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='ilog_search_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='lead',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='lead_search_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='opportunity',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='opp_search_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='product_search_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='task_search_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations
+
+# Columns matched by the typeahead endpoints (core/typeahead.py), per table
+TRIGRAM_INDEXES = {
+    'core_product': ['name'],
+    'core_account': ['name'],
+    'core_contact': ['name', 'email'],
+    'core_user': ['first_name', 'last_name', 'email'],
+}
+
+
+def index_name(table, column):
+    return f"{table.removeprefix('core_')}_{column}_trgm_idx"
+
+
+def create_trigram_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        # pg_trgm ships with the standard contrib modules, but minimal builds
+        # may lack it; typeahead then falls back to plain icontains matching.
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table, columns in TRIGRAM_INDEXES.items():
+            for column in columns:
+                cursor.execute(
+                    f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name(table, column)} '
+                    f'ON {table} USING gin ({column} gin_trgm_ops)'
+                )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        for table, columns in TRIGRAM_INDEXES.items():
+            for column in columns:
+                cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name(table, column)}')
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without blocking writes on large tenant tables
+    atomic = False
+
+    dependencies = [
+        ('core', '0006_search_vectors'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
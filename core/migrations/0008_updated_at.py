@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-18 05:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+# Tables whose existing rows take updated_at from created_at; the others
+# (task, product) have no creation time and start at the migration time
+BACKFILL_FROM_CREATED_AT = ['core_account', 'core_contact', 'core_opportunity', 'core_quote']
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_typeahead_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name=model_name,
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        )
+        for model_name in ('account', 'contact', 'opportunity', 'product', 'quote', 'task')
+    ] + [
+        migrations.RunSQL(
+            f'UPDATE {table} SET updated_at = created_at',
+            reverse_sql=migrations.RunSQL.noop,
+        )
+        for table in BACKFILL_FROM_CREATED_AT
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.7 on 2026-10-18 05:10
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+# (model, index prefix) pairs; each index serves the conditional GET check,
+# MAX(updated_at) and COUNT(*) over one organization (core/conditional.py)
+UPDATED_AT_INDEXES = [
+    ('account', 'account'),
+    ('contact', 'contact'),
+    ('lead', 'lead'),
+    ('opportunity', 'opp'),
+    ('product', 'product'),
+    ('quote', 'quote'),
+    ('task', 'task'),
+]
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without blocking writes on large tenant tables
+    atomic = False
+
+    dependencies = [
+        ('core', '0008_updated_at'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name=model_name,
+            index=models.Index(fields=['organization', 'updated_at'], name=f'{prefix}_org_updated_idx'),
+        )
+        for model_name, prefix in UPDATED_AT_INDEXES
+    ]
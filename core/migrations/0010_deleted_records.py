@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-18 04:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletedRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=50)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deleted_records', to='core.organization')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['organization', 'deleted_at'], name='deleted_org_deleted_at_idx')],
+            },
+        ),
+    ]
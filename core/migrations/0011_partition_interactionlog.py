@@ -0,0 +1,112 @@
+from django.db import migrations
+
+# core_interactionlog becomes a table partitioned by month of "timestamp"
+# (see core/partitions.py). The model is unchanged: constraint and index names
+# stay the ones Django generated, only the primary key gains "timestamp",
+# since a partitioned table's unique constraints must include the partition key.
+TABLE = 'core_interactionlog'
+
+# Months created up front besides those holding existing rows; afterwards the
+# interaction_partitions command keeps INTERACTION_LOG_PARTITIONS_AHEAD ready
+INITIAL_MONTHS_AHEAD = 3
+
+FOREIGN_KEYS = [
+    ('core_interactionlog_contact_id_9f0ff520_fk_core_contact_id', 'contact_id', 'core_contact'),
+    ('core_interactionlog_user_id_8972e216_fk_core_user_id', 'user_id', 'core_user'),
+    ('core_interactionlog_lead_id_9ca6f6df_fk_core_lead_id', 'lead_id', 'core_lead'),
+    ('core_interactionlog_opportunity_id_b642c507_fk_core_oppo', 'opportunity_id', 'core_opportunity'),
+    ('core_interactionlog_organization_id_35156cc2_fk_core_orga', 'organization_id', 'core_organization'),
+]
+
+INDEXES = [
+    ('core_interactionlog_contact_id_9f0ff520', 'btree (contact_id)'),
+    ('core_interactionlog_user_id_8972e216', 'btree (user_id)'),
+    ('core_interactionlog_lead_id_9ca6f6df', 'btree (lead_id)'),
+    ('core_interactionlog_opportunity_id_b642c507', 'btree (opportunity_id)'),
+    ('core_interactionlog_organization_id_35156cc2', 'btree (organization_id)'),
+    ('ilog_org_ts_idx', 'btree (organization_id, "timestamp" DESC)'),
+    ('ilog_org_lead_ts_idx', 'btree (organization_id, lead_id, "timestamp" DESC)'),
+    ('ilog_org_contact_ts_idx', 'btree (organization_id, contact_id, "timestamp" DESC)'),
+    ('ilog_org_opp_ts_idx', 'btree (organization_id, opportunity_id, "timestamp" DESC)'),
+    ('ilog_search_idx', 'gin (search_vector)'),
+]
+
+
+def constraints_sql(primary_key):
+    """Primary key, foreign keys, indexes and the search vector trigger (migration 0006) of the table."""
+    statements = [f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY ({primary_key});']
+    statements += [
+        f'ALTER TABLE {TABLE} ADD CONSTRAINT {name} FOREIGN KEY ({column}) '
+        f'REFERENCES {target} (id) DEFERRABLE INITIALLY DEFERRED;'
+        for name, column, target in FOREIGN_KEYS
+    ]
+    statements += [f'CREATE INDEX {name} ON {TABLE} USING {definition};' for name, definition in INDEXES]
+    statements.append(
+        f'CREATE TRIGGER {TABLE}_search_vector_trigger BEFORE INSERT OR UPDATE OF summary ON {TABLE} '
+        f'FOR EACH ROW EXECUTE FUNCTION {TABLE}_search_vector_update();'
+    )
+    return '\n'.join(statements)
+
+
+# Rows are copied before the keys and indexes exist, which is much faster
+# than maintaining them row by row; the whole migration runs in one transaction
+PARTITION_SQL = f"""
+    ALTER TABLE {TABLE} RENAME TO {TABLE}_unpartitioned;
+    CREATE TABLE {TABLE} (LIKE {TABLE}_unpartitioned) PARTITION BY RANGE ("timestamp");
+    CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT;
+
+    DO $$
+    DECLARE
+        month timestamp;
+    BEGIN
+        FOR month IN SELECT generate_series(
+            LEAST(
+                date_trunc('month', (SELECT min("timestamp") FROM {TABLE}_unpartitioned) AT TIME ZONE 'UTC'),
+                date_trunc('month', now() AT TIME ZONE 'UTC') - interval '1 month'
+            ),
+            date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{INITIAL_MONTHS_AHEAD} months',
+            interval '1 month'
+        ) LOOP
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF {TABLE} FOR VALUES FROM (%L) TO (%L)',
+                '{TABLE}_p' || to_char(month, 'YYYY_MM'),
+                month AT TIME ZONE 'UTC',
+                (month + interval '1 month') AT TIME ZONE 'UTC'
+            );
+        END LOOP;
+    END
+    $$;
+
+    INSERT INTO {TABLE} SELECT * FROM {TABLE}_unpartitioned;
+    DROP TABLE {TABLE}_unpartitioned;
+
+    -- Partitioned tables cannot have identity columns; a sequence owned by
+    -- the column behaves the same for Django (pg_get_serial_sequence, flush)
+    CREATE SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id;
+    SELECT setval('{TABLE}_id_seq', COALESCE(MAX(id), 0) + 1, false) FROM {TABLE};
+    ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval('{TABLE}_id_seq');
+    {constraints_sql('id, "timestamp"')}
+"""
+
+# Detached partitions are left alone as ordinary tables
+UNPARTITION_SQL = f"""
+    ALTER TABLE {TABLE} RENAME TO {TABLE}_partitioned;
+    CREATE TABLE {TABLE} (LIKE {TABLE}_partitioned);
+    INSERT INTO {TABLE} SELECT * FROM {TABLE}_partitioned;
+    DROP TABLE {TABLE}_partitioned;
+
+    ALTER TABLE {TABLE} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY;
+    SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {TABLE};
+    {constraints_sql('id')}
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_deleted_records'),
+    ]
+
+    operations = [
+        migrations.RunSQL(PARTITION_SQL, UNPARTITION_SQL),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 05:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_partition_interactionlog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organization',
+            name='interaction_retention_days',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
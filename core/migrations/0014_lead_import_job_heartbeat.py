@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 06:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_lead_import_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leadimportjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
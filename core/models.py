@@ -1,12 +1,88 @@
 # models.py
+from decimal import Decimal
+
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+class TrackedFieldsMixin:
+    """
+    Remember the database values of ``tracked_fields`` so changes can be
+    detected on save without re-reading the row.
+
+    The snapshot is taken in ``from_db`` and refreshed by ``refresh_from_db``
+    and every save, for the fields they actually read or wrote. Instances
+    that were never loaded (or had the fields deferred) fall back to a
+    single query for all tracked fields.
+    """
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_tracked_fields()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self._snapshot_tracked_fields(fields)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._snapshot_tracked_fields(kwargs.get('update_fields'))
+
+    def _snapshot_tracked_fields(self, fields=None):
+        """Snapshot the tracked fields, or only those among ``fields`` (names or attnames)."""
+        names = self.tracked_fields
+        if fields is not None:
+            touched = set()
+            for name in fields:
+                field = self._meta.get_field(name)
+                touched.update((field.name, field.attname))
+            names = [name for name in names if name in touched]
+        # Deferred fields are absent from __dict__ and stay out of the snapshot
+        self._loaded_values = {
+            **getattr(self, '_loaded_values', {}),
+            **{name: self.__dict__[name] for name in names if name in self.__dict__},
+        }
+
+    def get_original_values(self):
+        """
+        Return ``{field: value}`` for the tracked fields as last loaded or saved.
+
+        Returns None for unsaved instances and rows that no longer exist.
+        """
+        if self.pk is None:
+            return None
+        loaded = getattr(self, '_loaded_values', {})
+        if all(name in loaded for name in self.tracked_fields):
+            return loaded
+
+        row = type(self)._base_manager.filter(pk=self.pk).values(*self.tracked_fields).first()
+        if row is not None:
+            self._loaded_values = row
+        return row
+
+
+class SearchVectorManager(models.Manager):
+    """Leave the stored tsvector in the database unless a query asks for it."""
+
+    def get_queryset(self):
+        return super().get_queryset().defer('search_vector')
 
 
 # 1. Organization
 class Organization(models.Model):
     name = models.CharField(max_length=255, unique=True)
     description = models.TextField(blank=True)
+    # Interaction logs older than this move to cold storage (core/archive.py);
+    # empty uses INTERACTION_LOG_ARCHIVE_AFTER_DAYS, 0 never archives
+    interaction_retention_days = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -18,7 +94,7 @@ class Organization(models.Model):
 
 
 # 2. User
-class User(AbstractUser):
+class User(TrackedFieldsMixin, AbstractUser):
     ROLE_CHOICES = [
         ('admin', 'Admin'),
         ('manager', 'Manager'),
@@ -27,12 +103,15 @@ class User(AbstractUser):
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='sales_rep')
     organization = models.ForeignKey(Organization, on_delete=models.SET_NULL, null=True, blank=True, related_name='users')
 
+    # Moving a user invalidates cached responses of the organization they left
+    tracked_fields = ('organization_id',)
+
     def __str__(self):
         org_part = f" - {self.organization.name}" if self.organization else " - No Organization"
         return f"{self.get_full_name() or self.username} ({self.get_role_display()}){org_part}"
 
 # 3. Lead
-class Lead(models.Model):
+class Lead(TrackedFieldsMixin, models.Model):
     STATUS_CHOICES = [
         ('new', 'New'),
         ('contacted', 'Contacted'),
@@ -40,6 +119,8 @@ class Lead(models.Model):
         ('converted', 'Converted'),
         ('disqualified', 'Disqualified'),
     ]
+    tracked_fields = ('status',)
+
     name = models.CharField(max_length=255)
     email = models.EmailField()
     phone = models.CharField(max_length=20, blank=True)
@@ -50,11 +131,26 @@ class Lead(models.Model):
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE, null=True, blank=True, related_name='leads')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by database triggers from search_vector_fields (migration 0006)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    search_vector_fields = ('name', 'company', 'email', 'phone')
+    objects = SearchVectorManager()
 
     def __str__(self):
         company_part = f" ({self.company})" if self.company else ""
         return f"{self.name}{company_part} - {self.get_status_display()}"
 
+    class Meta:
+        # Every tenant list filters on organization first, then by the
+        # column it filters or orders on; the other models follow suit
+        indexes = [
+            models.Index(fields=['organization', '-created_at'], name='lead_org_created_idx'),
+            models.Index(fields=['organization', 'status', '-created_at'], name='lead_org_status_created_idx'),
+            models.Index(fields=['organization', 'updated_at'], name='lead_org_updated_idx'),
+            GinIndex(fields=['search_vector'], name='lead_search_idx'),
+        ]
+
 # 4. Account
 class Account(models.Model):
     name = models.CharField(max_length=255)
@@ -64,11 +160,24 @@ class Account(models.Model):
     website = models.URLField(blank=True)
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE, null=True, blank=True, related_name='accounts')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by database triggers from search_vector_fields (migration 0006)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    search_vector_fields = ('name', 'industry', 'website')
+    objects = SearchVectorManager()
 
     def __str__(self):
         industry_part = f" ({self.industry})" if self.industry else ""
         return f"{self.name}{industry_part}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['organization', '-created_at'], name='account_org_created_idx'),
+            models.Index(fields=['organization', 'updated_at'], name='account_org_updated_idx'),
+            GinIndex(fields=['search_vector'], name='account_search_idx'),
+        ]
+
 # 5. Contact
 class Contact(models.Model):
     name = models.CharField(max_length=255)
@@ -78,13 +187,27 @@ class Contact(models.Model):
     title = models.CharField(max_length=255, blank=True)
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE, null=True, blank=True, related_name='contacts')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by database triggers from search_vector_fields (migration 0006)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    search_vector_fields = ('name', 'title', 'email', 'phone')
+    objects = SearchVectorManager()
 
     def __str__(self):
         title_part = f" ({self.title})" if self.title else ""
         return f"{self.name}{title_part} at {self.account.name}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['organization', '-created_at'], name='contact_org_created_idx'),
+            models.Index(fields=['organization', 'account', '-created_at'], name='contact_org_account_idx'),
+            models.Index(fields=['organization', 'updated_at'], name='contact_org_updated_idx'),
+            GinIndex(fields=['search_vector'], name='contact_search_idx'),
+        ]
+
 # 6. Opportunity (aka Deal)
-class Opportunity(models.Model):
+class Opportunity(TrackedFieldsMixin, models.Model):
     STAGE_CHOICES = [
         ('qualification', 'Qualification'),
         ('proposal', 'Proposal'),
@@ -92,6 +215,8 @@ class Opportunity(models.Model):
         ('won', 'Closed Won'),
         ('lost', 'Closed Lost'),
     ]
+    tracked_fields = ('stage', 'amount')
+
     name = models.CharField(max_length=255)
     account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='opportunities')
     contact = models.ForeignKey(Contact, on_delete=models.SET_NULL, null=True, blank=True)
@@ -101,10 +226,31 @@ class Opportunity(models.Model):
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE, null=True, blank=True, related_name='opportunities')
     close_date = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by database triggers from search_vector_fields (migration 0006)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    search_vector_fields = ('name',)
+    objects = SearchVectorManager()
 
     def __str__(self):
         return f"{self.name} - ${self.amount:,.2f} ({self.get_stage_display()})"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['organization', '-created_at'], name='opp_org_created_idx'),
+            models.Index(fields=['organization', 'stage', '-created_at'], name='opp_org_stage_created_idx'),
+            models.Index(fields=['organization', 'account', '-created_at'], name='opp_org_account_idx'),
+            models.Index(fields=['organization', 'updated_at'], name='opp_org_updated_idx'),
+            # Covers pipeline_value: the aggregate reads only these columns
+            models.Index(
+                fields=['organization', 'stage'],
+                include=['amount', 'owner', 'close_date'],
+                name='opp_org_stage_pipeline_idx',
+            ),
+            GinIndex(fields=['search_vector'], name='opp_search_idx'),
+        ]
+
 # 7. Task (e.g. call, follow-up, meeting)
 class Task(models.Model):
     TYPE_CHOICES = [
@@ -127,10 +273,24 @@ class Task(models.Model):
     owner = models.ForeignKey(User, on_delete=models.CASCADE)
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE, null=True, blank=True, related_name='tasks')
     notes = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by database triggers from search_vector_fields (migration 0006)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    search_vector_fields = ('title', 'notes')
+    objects = SearchVectorManager()
 
     def __str__(self):
         return f"{self.title} ({self.get_type_display()}) - {self.get_status_display()}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['organization', 'due_date'], name='task_org_due_idx'),
+            models.Index(fields=['organization', 'status', 'due_date'], name='task_org_status_due_idx'),
+            models.Index(fields=['organization', 'updated_at'], name='task_org_updated_idx'),
+            GinIndex(fields=['search_vector'], name='task_search_idx'),
+        ]
+
 # 8. InteractionLog (Activity History)
 class InteractionLog(models.Model):
     TYPE_CHOICES = [
@@ -146,12 +306,28 @@ class InteractionLog(models.Model):
     type = models.CharField(max_length=20, choices=TYPE_CHOICES)
     summary = models.TextField()
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE, null=True, blank=True, related_name='interaction_logs')
+    # The table is partitioned by month of timestamp (migration 0011,
+    # core/partitions.py); its primary key is (id, timestamp) in the database
     timestamp = models.DateTimeField(auto_now_add=True)
+    # Maintained by database triggers from search_vector_fields (migration 0006)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    search_vector_fields = ('summary',)
+    objects = SearchVectorManager()
 
     def __str__(self):
         target = self.lead or self.contact or self.opportunity or "Unknown"
         return f"{self.get_type_display()} with {target} by {self.user.username}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['organization', '-timestamp'], name='ilog_org_ts_idx'),
+            models.Index(fields=['organization', 'lead', '-timestamp'], name='ilog_org_lead_ts_idx'),
+            models.Index(fields=['organization', 'contact', '-timestamp'], name='ilog_org_contact_ts_idx'),
+            models.Index(fields=['organization', 'opportunity', '-timestamp'], name='ilog_org_opp_ts_idx'),
+            GinIndex(fields=['search_vector'], name='ilog_search_idx'),
+        ]
+
 # 9. Product
 class Product(models.Model):
     name = models.CharField(max_length=255)
@@ -160,10 +336,23 @@ class Product(models.Model):
     currency = models.CharField(max_length=10, default='USD')
     is_active = models.BooleanField(default=True)
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE, null=True, blank=True, related_name='products')
+    updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by database triggers from search_vector_fields (migration 0006)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    search_vector_fields = ('name', 'description')
+    objects = SearchVectorManager()
 
     def __str__(self):
         return f"{self.name} ({self.currency} {self.price})"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['organization', 'is_active'], name='product_org_active_idx'),
+            models.Index(fields=['organization', 'updated_at'], name='product_org_updated_idx'),
+            GinIndex(fields=['search_vector'], name='product_search_idx'),
+        ]
+
 # 10. Quote
 class Quote(models.Model):
     opportunity = models.ForeignKey(Opportunity, on_delete=models.CASCADE, related_name='quotes')
@@ -172,21 +361,63 @@ class Quote(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE, null=True, blank=True, related_name='quotes')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     notes = models.TextField(blank=True)
 
     def calculate_total_price(self):
-        """Calculate total price from all line items."""
-        total = sum(item.total_price for item in self.line_items.all())
-        return total
+        """Calculate total price from all line items in a single SQL aggregate."""
+        total = self.line_items.aggregate(total=Sum(F('quantity') * F('unit_price')))['total']
+        return total or Decimal('0')
 
     def update_total_price(self):
-        """Update the total_price field with calculated value."""
-        self.total_price = self.calculate_total_price()
-        self.save(update_fields=['total_price'])
+        """Recompute total_price from line items with a single UPDATE, writing only that column."""
+        line_total = (
+            QuoteLineItem.objects
+            .filter(quote=OuterRef('pk'))
+            .values('quote')
+            .annotate(total=Sum(F('quantity') * F('unit_price')))
+            .values('total')
+        )
+        Quote.objects.filter(pk=self.pk).update(
+            total_price=Coalesce(Subquery(line_total), Decimal('0')),
+            updated_at=timezone.now()
+        )
+        self.refresh_from_db(fields=['total_price', 'updated_at'])
+
+    @classmethod
+    def adjust_total_price(cls, quote_id, delta):
+        """
+        Add ``delta`` to a quote's total_price with ``SET total_price = total_price + delta``.
+
+        Line items are never read and only total_price is written, so concurrent
+        line-item writes each apply their own change instead of overwriting one
+        another. Call it inside the same transaction as the line-item write.
+        updated_at is stamped even when the total is unchanged, because the
+        quote's payload includes its line items.
+        """
+        cls.objects.filter(pk=quote_id).update(total_price=F('total_price') + delta, updated_at=timezone.now())
+
+    def save(self, *args, **kwargs):
+        # total_price is written only by the two methods above; saving a
+        # loaded quote would otherwise write back the total it was read with,
+        # undoing line-item changes committed since
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'total_price'
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.title} - {self.total_price}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['organization', '-created_at'], name='quote_org_created_idx'),
+            models.Index(fields=['organization', 'opportunity', '-created_at'], name='quote_org_opp_created_idx'),
+            models.Index(fields=['organization', 'updated_at'], name='quote_org_updated_idx'),
+        ]
+
 # 11. QuoteLineItem
 class QuoteLineItem(models.Model):
     quote = models.ForeignKey(Quote, on_delete=models.CASCADE, related_name='line_items')
@@ -205,3 +436,47 @@ class QuoteLineItem(models.Model):
     def __str__(self):
         product_name = self.product.name if self.product else "No Product"
         return f"{product_name} x {self.quantity} @ {self.unit_price}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['organization', 'quote'], name='qli_org_quote_idx'),
+        ]
+
+# 12. DeletedRecord (tombstones replayed by the change feed)
+class DeletedRecord(models.Model):
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='deleted_records')
+    model = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted at {self.deleted_at}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['organization', 'deleted_at'], name='deleted_org_deleted_at_idx'),
+        ]
+
+# 13. LeadImportJob (uploads too large to import within the request)
+class LeadImportJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='lead_import_jobs')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='lead_import_jobs')
+    file_format = models.CharField(max_length=10)
+    # Path of the stored upload under LEAD_IMPORT_UPLOAD_DIR; removed once imported
+    path = models.CharField(max_length=500)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    result = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when claimed and after every committed batch; a running job silent
+    # for LEAD_IMPORT_JOB_TIMEOUT_SECONDS is claimed again
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Lead import {self.pk} ({self.status})"
@@ -0,0 +1,216 @@
+"""
+Keyset pagination for the append-heavy lists.
+
+``PageNumberPagination`` runs ``COUNT(*)`` and ``OFFSET`` on every page, so
+page N of the interaction feed reads and throws away every row before it.
+Keyset pagination remembers the sort key of the last row served and asks for
+the rows after it instead, which the ``(organization, -timestamp)`` and
+``(organization, -created_at)`` indexes answer directly at any depth.
+
+Clients opt in per request with ``?pagination=cursor``; requests without it
+keep the page-number format, so existing clients are unaffected.
+"""
+
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def _field_name(ordering_field):
+    return ordering_field.lstrip('-')
+
+
+def _after(ordering_field, value, inclusive=False):
+    """Q for rows sorting after ``value`` in ``ordering_field``'s direction."""
+    lookup = 'lt' if ordering_field.startswith('-') else 'gt'
+    if inclusive:
+        lookup += 'e'
+    return Q(**{f'{_field_name(ordering_field)}__{lookup}': value})
+
+
+def _reverse(ordering_field):
+    return ordering_field[1:] if ordering_field.startswith('-') else f'-{ordering_field}'
+
+
+def keyset_filter(queryset, ordering, position=None, reverse=False):
+    """
+    Order ``queryset`` by ``ordering`` and keep the rows after ``position``.
+
+    ``position`` holds one value per ordering field (the sort key of the
+    last row already served). The leading ``<=``/``>=`` bound on the first
+    field gives the planner an index range to start from; the OR chain
+    breaks ties on the following fields. With ``reverse`` the rows *before*
+    ``position`` are returned, nearest first.
+    """
+    if reverse:
+        ordering = [_reverse(field) for field in ordering]
+    queryset = queryset.order_by(*ordering)
+    if position is None:
+        return queryset
+
+    condition = Q()
+    for index in reversed(range(len(ordering))):
+        equal = Q(**{_field_name(field): value for field, value in zip(ordering[:index], position[:index], strict=True)})
+        condition = (equal & _after(ordering[index], position[index])) | condition
+    return queryset.filter(_after(ordering[0], position[0], inclusive=True), condition)
+
+
+class KeysetPagination(pagination.BasePagination):
+    """
+    Cursor pagination over a unique ``(sort key, id)`` ordering.
+
+    The view declares ``keyset_ordering``, e.g. ``('-timestamp', '-id')``.
+    Pages carry opaque ``next``/``previous`` links and no total count.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = list(view.keyset_ordering)
+
+        position, reverse = self.decode_cursor(request, queryset.model)
+        rows = list(keyset_filter(queryset, self.ordering, position, reverse)[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.page = rows
+        return rows
+
+    def get_position(self, obj):
+        return [getattr(obj, _field_name(field)) for field in self.ordering]
+
+    def encode_cursor(self, position, reverse=False):
+        payload = {'p': [value.isoformat() if hasattr(value, 'isoformat') else value for value in position]}
+        if reverse:
+            payload['r'] = 1
+        token = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model):
+        """Return ``(position, reverse)`` from the request, or ``(None, False)`` on page one."""
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            position = payload['p']
+            reverse = bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message) from None
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        position = [
+            self.parse_position_value(model._meta.get_field(_field_name(field)), value)
+            for field, value in zip(self.ordering, position, strict=True)
+        ]
+        return position, reverse
+
+    def parse_position_value(self, field, value):
+        """Convert a cursor value back to ``field``'s type, so a forged cursor cannot reach the query."""
+        if isinstance(field, models.DateTimeField):
+            try:
+                parsed = parse_datetime(value) if isinstance(value, str) else None
+            except ValueError:
+                parsed = None
+            if parsed is None or timezone.is_naive(parsed):
+                raise NotFound(self.invalid_cursor_message)
+            return parsed
+        if isinstance(field, models.IntegerField):
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise NotFound(self.invalid_cursor_message)
+            return value
+        try:
+            return field.to_python(value)
+        except ValidationError:
+            raise NotFound(self.invalid_cursor_message) from None
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class PageNumberOrKeysetPagination(pagination.PageNumberPagination):
+    """
+    Page-number pagination by default, keyset pagination on request.
+
+    ``?pagination=cursor`` (kept in the ``next``/``previous`` links) switches
+    the request to ``KeysetPagination`` using the view's ``keyset_ordering``;
+    any ``?ordering=`` is ignored in that mode since the cursor depends on it.
+    """
+    mode_query_param = 'pagination'
+    keyset_mode = 'cursor'
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if request.query_params.get(self.mode_query_param) == self.keyset_mode:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                'name': self.mode_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Set to "cursor" for keyset pagination with next/previous cursors and no count.',
+                'schema': {'type': 'string', 'enum': [self.keyset_mode]},
+            },
+            {
+                'name': self.keyset_class.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value (with pagination=cursor).',
+                'schema': {'type': 'string'},
+            },
+        ]
@@ -0,0 +1,135 @@
+"""
+Monthly partitions of the ``core_interactionlog`` table (migration 0011).
+
+Postgres range-partitions the table by ``timestamp``, one partition per
+calendar month (UTC) named ``core_interactionlog_pYYYY_MM``. Queries bounded
+to a recent window are pruned to the one or two partitions it spans, and old
+months can be detached in a single catalog operation instead of a mass DELETE.
+
+Rows outside every monthly partition land in ``core_interactionlog_default``
+rather than failing the insert; creating the month's partition moves them
+over. Run the ``interaction_partitions`` command daily from cron so the next
+``INTERACTION_LOG_PARTITIONS_AHEAD`` months always exist.
+"""
+
+import re
+from datetime import UTC, date, datetime
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from .models import InteractionLog
+
+TABLE = InteractionLog._meta.db_table
+DEFAULT_PARTITION = f'{TABLE}_default'
+PARTITION_NAME_RE = re.compile(rf'^{TABLE}_p(\d{{4}})_(\d{{2}})$')
+
+PARTITIONS_SQL = '''
+    SELECT child.relname
+    FROM pg_inherits
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE pg_inherits.inhparent = %s::regclass
+'''
+
+
+def month_start(value):
+    """Return the first day of ``value``'s month."""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, months):
+    """Return the first day of the month ``months`` after (or before) ``month``."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f'{TABLE}_p{month:%Y_%m}'
+
+
+def month_bounds(month):
+    """Return the ``[start, end)`` timestamps of ``month``'s partition."""
+    start = datetime(month.year, month.month, 1, tzinfo=UTC)
+    return start, datetime.combine(add_months(month, 1), datetime.min.time(), tzinfo=UTC)
+
+
+def partition_names(table=TABLE, using=DEFAULT_DB_ALIAS):
+    """Return the names of ``table``'s partitions, including the default one."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(PARTITIONS_SQL, [table])
+        return sorted(name for (name,) in cursor.fetchall())
+
+
+def get_partitions(using=DEFAULT_DB_ALIAS):
+    """Return ``{month: name}`` for the table's attached monthly partitions."""
+    partitions = {}
+    for name in partition_names(using=using):
+        match = PARTITION_NAME_RE.match(name)
+        if match:
+            partitions[date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+def create_partition(month, using=DEFAULT_DB_ALIAS):
+    """
+    Create and attach ``month``'s partition, moving its rows out of the default one.
+
+    Attaching scans the default partition to check that no row belongs to the
+    new range, so the month's rows are moved into the new table first, in the
+    same transaction.
+    """
+    connection = connections[using]
+    name = partition_name(month)
+    start, end = month_bounds(month)
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS)')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE "timestamp" >= %s AND "timestamp" < %s RETURNING *) '
+            f'INSERT INTO {name} SELECT * FROM moved',
+            [start, end],
+        )
+        # Indexes, keys and the search vector trigger are cloned from the parent
+        cursor.execute(
+            f"ALTER TABLE {TABLE} ATTACH PARTITION {name} FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    return name
+
+
+def detach_partition(name, using=DEFAULT_DB_ALIAS):
+    """
+    Detach a partition from the table, keeping it as an ordinary table.
+
+    Its rows disappear from the ORM and the API at once; archive or drop the
+    table afterwards. ``DETACH ... CONCURRENTLY`` is not available while a
+    default partition exists, so this briefly locks the parent table.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'ALTER TABLE {TABLE} DETACH PARTITION {name}')
+
+
+def maintain_partitions(ahead, retain_months=0, today=None, dry_run=False, using=DEFAULT_DB_ALIAS):
+    """
+    Create the partitions of the current and next ``ahead`` months, and detach
+    those older than ``retain_months`` full months (0 keeps every month).
+
+    Return ``(created, detached)`` partition names; with ``dry_run`` nothing
+    is changed.
+    """
+    current = month_start(today or timezone.now())
+    existing = get_partitions(using=using)
+
+    created = []
+    for offset in range(ahead + 1):
+        month = add_months(current, offset)
+        if month not in existing:
+            created.append(partition_name(month) if dry_run else create_partition(month, using=using))
+
+    detached = []
+    if retain_months > 0:
+        oldest_kept = add_months(current, -retain_months)
+        for month, name in sorted(existing.items()):
+            if month < oldest_kept:
+                if not dry_run:
+                    detach_partition(name, using=using)
+                detached.append(name)
+    return created, detached
@@ -0,0 +1,168 @@
+"""
+Versioned response cache for tenant list and detail GETs.
+
+The web UI re-requests the same lead, account and product pages many times
+between writes. ``ResponseCacheMixin`` stores the serialized data of
+``list`` and ``retrieve`` responses under a key that includes a generation
+counter per organization and model. A write to a model bumps its counter for
+the writer's organization, so every cached page built from the old rows
+stops matching at once, without scanning for keys; the orphaned entries
+simply expire.
+
+Counters and pages live in the ``responses`` cache alias (``settings.CACHES``),
+which is Redis when ``RESPONSE_CACHE_URL`` is set. Every worker must see the
+same counters, so pages are only cached then (``RESPONSE_CACHE_ENABLED``);
+with the in-process default a worker would keep serving pages another
+worker's writes invalidated.
+
+With read replicas, a page rebuilt right after a write could be read from a
+replica that has not replayed it yet and then be served until the next
+write. Bumps therefore also mark the scope as recently written for
+``DATABASE_REPLICA_MAX_LAG_SECONDS``, and cache fills in that window read
+from the primary. The markers live in the shared ``routing`` cache
+(``core/db_routing.py``), so they reach every worker even when pages are not
+cached.
+"""
+
+import hashlib
+import math
+import time
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+from .db_routing import ROUTING_CACHE_ALIAS, primary_reads
+
+RESPONSE_CACHE_ALIAS = 'responses'
+
+# Scope of responses that span every organization, such as the lists admins
+# get from OrganizationViewSet and UserViewSet
+GLOBAL_SCOPE = 'all'
+
+
+def _generation_key(scope, label):
+    return f'generation:{scope}:{label}'
+
+
+def get_generations(scope, models):
+    """Return the current generation of each model in ``scope``, starting missing ones."""
+    cache = caches[RESPONSE_CACHE_ALIAS]
+    keys = [_generation_key(scope, model._meta.label_lower) for model in models]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            # Start from the clock rather than 1, so a counter evicted from
+            # the cache can never come back at a value old pages were keyed on
+            cache.add(key, time.time_ns(), timeout=None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def _written_key(scope):
+    return f'written:{scope}'
+
+
+def _bump(scopes, label):
+    cache = caches[RESPONSE_CACHE_ALIAS]
+    for scope in scopes:
+        key = _generation_key(scope, label)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+    if settings.DATABASE_REPLICAS:
+        caches[ROUTING_CACHE_ALIAS].set_many(
+            {_written_key(scope): True for scope in scopes},
+            timeout=math.ceil(settings.DATABASE_REPLICA_MAX_LAG_SECONDS),
+        )
+
+
+def fill_reads(scope):
+    """
+    Context for computing a value to cache for ``scope``: primary reads if
+    the scope was written within the replica lag limit, routing as usual
+    otherwise.
+    """
+    if settings.DATABASE_REPLICAS and caches[ROUTING_CACHE_ALIAS].get(_written_key(scope)):
+        return primary_reads()
+    return nullcontext()
+
+
+def bump_generations(organization_ids, model):
+    """
+    Invalidate cached responses built from ``model`` rows of the given
+    organizations (and those spanning all organizations).
+
+    Counters are bumped right away, so later reads in the same transaction
+    see the write, and again on commit, so a page a concurrent request cached
+    from the pre-commit rows is not served afterwards.
+    """
+    scopes = {organization_id for organization_id in organization_ids if organization_id is not None}
+    scopes.add(GLOBAL_SCOPE)
+    label = model._meta.label_lower
+    _bump(scopes, label)
+    transaction.on_commit(lambda: _bump(scopes, label))
+
+
+class ResponseCacheMixin:
+    """
+    Viewset mixin caching ``list`` and ``retrieve`` responses.
+
+    ``response_cache_models`` lists every model the serialized data is read
+    from (the viewset's own model when empty). Set
+    ``response_cache_vary_on_role`` when results differ by role, and override
+    ``get_response_cache_scope`` when some roles see more than their own
+    organization. ``response_cache_enabled = False`` switches a viewset off;
+    ``settings.RESPONSE_CACHE_ENABLED`` switches them all.
+    """
+    response_cache_enabled = True
+    response_cache_models = ()
+    response_cache_vary_on_role = False
+
+    def get_response_cache_scope(self):
+        return self.request.user.organization_id
+
+    def get_response_cache_key(self, request):
+        scope = self.get_response_cache_scope()
+        if scope is None:
+            return None
+        models = self.response_cache_models or (self.queryset.model,)
+        parts = [
+            self.basename,
+            self.action,
+            str(scope),
+            request.user.role if self.response_cache_vary_on_role else '',
+            request.build_absolute_uri(),
+            *map(str, get_generations(scope, models)),
+        ]
+        return 'response:' + hashlib.sha256('|'.join(parts).encode()).hexdigest()
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not (settings.RESPONSE_CACHE_ENABLED and self.response_cache_enabled):
+            return handler(request, *args, **kwargs)
+        key = self.get_response_cache_key(request)
+        if key is None:
+            return handler(request, *args, **kwargs)
+
+        cache = caches[RESPONSE_CACHE_ALIAS]
+        data = cache.get(key)
+        if data is not None:
+            response = Response(data)
+            response['X-Response-Cache'] = 'hit'
+            return response
+
+        with fill_reads(self.get_response_cache_scope()):
+            response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, timeout=settings.RESPONSE_CACHE_TIMEOUT)
+            response['X-Response-Cache'] = 'miss'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
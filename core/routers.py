@@ -4,6 +4,7 @@ from .views import (
     AccountViewSet,
     ContactViewSet,
     InteractionLogViewSet,
+    LeadImportJobViewSet,
     LeadViewSet,
     OpportunityViewSet,
     OrganizationViewSet,
@@ -26,6 +27,7 @@ router.register('users', UserViewSet, basename='user')
 router.register('accounts', AccountViewSet, basename='account')
 router.register('contacts', ContactViewSet, basename='contact')
 router.register('leads', LeadViewSet, basename='lead')
+router.register('lead-imports', LeadImportJobViewSet, basename='lead-import')
 router.register('opportunities', OpportunityViewSet, basename='opportunity')
 router.register('tasks', TaskViewSet, basename='task')
 router.register('interactions', InteractionLogViewSet, basename='interaction')
@@ -0,0 +1,132 @@
+"""
+PostgreSQL full-text search for the tenant viewsets.
+
+Searchable models keep a ``search_vector`` column that database triggers
+rebuild whenever one of the model's ``search_vector_fields`` is written (see
+migration 0006). ``FullTextSearchFilter`` reads the same ``search_fields``
+declarations as DRF's ``SearchFilter``, but matches any field covered by a
+stored vector, on the model or behind a foreign key, against its GIN index
+instead of OR'ing ``UPPER(...) LIKE '%term%'`` scans together.
+
+As with ``SearchFilter`` every term must match, each in any of the fields:
+"jane acme" finds a task titled "Call Jane" owned by bob@acme.com. Unlike
+``SearchFilter``, vector-backed fields match on word prefixes, not
+substrings: "acm" finds "Acme Corp" but "corp" does not find "Megacorp".
+Fields without a vector keep the substring match.
+"""
+
+import operator
+import re
+from functools import reduce
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework import filters
+
+from .pagination import PageNumberOrKeysetPagination
+
+SEARCH_CONFIG = 'simple'
+
+# Words are runs of letters and digits; the triggers split emails, URLs and
+# phone numbers the same way, so "acme" finds "jane@acme.com"
+_TOKEN_RE = re.compile(r'[^\W_]+')
+
+
+def build_search_query(terms):
+    """
+    Turn search terms into a prefix-matching ``tsquery``.
+
+    Every word must match the start of some indexed word of the same
+    vector. Returns None if no word survives.
+    """
+    words = [word.lower() for term in terms for word in _TOKEN_RE.findall(term)]
+    if not words:
+        return None
+    return SearchQuery(' & '.join(f'{word}:*' for word in words), search_type='raw', config=SEARCH_CONFIG)
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    Drop-in replacement for ``SearchFilter`` backed by stored tsvectors.
+
+    Search fields whose model has a ``search_vector`` covering them become one
+    ``@@`` condition per model and term. Any remaining fields (explicit lookup
+    prefixes, models without a vector) keep ``SearchFilter``'s icontains
+    behaviour. Results are ranked when the model's own vector is searched and
+    neither ``OrderingFilter`` nor keyset pagination will reorder them.
+    """
+    rank_annotation = 'search_rank'
+
+    def split_search_fields(self, model, search_fields):
+        """Return ``(vector_paths, remaining_fields)`` for ``search_fields``."""
+        vector_paths, remaining = [], []
+        for search_field in map(str, search_fields):
+            path = self._vector_path(model, search_field)
+            if path is None:
+                remaining.append(search_field)
+            elif path not in vector_paths:
+                vector_paths.append(path)
+        return vector_paths, remaining
+
+    def _vector_path(self, model, search_field):
+        if search_field[0] in self.lookup_prefixes:
+            return None
+        *relations, name = search_field.split(LOOKUP_SEP)
+        for relation in relations:
+            try:
+                field = model._meta.get_field(relation)
+            except FieldDoesNotExist:
+                return None
+            if not field.is_relation or field.many_to_many or field.one_to_many:
+                return None
+            model = field.related_model
+        if name in getattr(model, 'search_vector_fields', ()):
+            return tuple(relations)
+        return None
+
+    def ordering_requested(self, request, queryset, view):
+        """Whether the results will be reordered after this filter, making a rank wasted work."""
+        pagination = PageNumberOrKeysetPagination
+        if request.query_params.get(pagination.mode_query_param) == pagination.keyset_mode:
+            return True
+        return any(
+            issubclass(backend, filters.OrderingFilter) and backend().get_ordering(request, queryset, view)
+            for backend in getattr(view, 'filter_backends', ())
+        )
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+
+        if not search_fields or not search_terms:
+            return queryset
+
+        vector_paths, remaining = self.split_search_fields(queryset.model, search_fields)
+        # Terms without a word character cannot match a vector and are dropped
+        term_queries = [(term, query) for term in search_terms if (query := build_search_query([term])) is not None]
+        if not vector_paths or not term_queries:
+            return super().filter_queryset(request, queryset, view)
+
+        orm_lookups = [self.construct_search(field, queryset) for field in remaining]
+        condition = reduce(operator.and_, (
+            reduce(operator.or_, [
+                *(models.Q(**{LOOKUP_SEP.join([*path, 'search_vector']): query}) for path in vector_paths),
+                *(models.Q(**{lookup: term}) for lookup in orm_lookups),
+            ])
+            for term, query in term_queries
+        ))
+
+        base = queryset
+        queryset = queryset.filter(condition)
+        if self.must_call_distinct(queryset, search_fields):
+            queryset = base.filter(models.Exists(queryset.filter(pk=models.OuterRef('pk'))))
+
+        if () in vector_paths and not self.ordering_requested(request, queryset, view):
+            # Rows matching more terms in their own fields rank higher
+            rank_query = reduce(operator.or_, (query for _term, query in term_queries))
+            queryset = queryset.annotate(**{
+                self.rank_annotation: SearchRank(models.F('search_vector'), rank_query)
+            }).order_by(f'-{self.rank_annotation}', *queryset.query.order_by)
+        return queryset
@@ -8,6 +8,7 @@ from .models import (
     Contact,
     InteractionLog,
     Lead,
+    LeadImportJob,
     Opportunity,
     Organization,
     Product,
@@ -28,6 +29,9 @@ class OrganizationSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_users_count(self, obj):
+        # Viewsets annotate ``users_total``; fall back to a query for bare instances
+        if hasattr(obj, 'users_total'):
+            return obj.users_total
         return obj.users.count()
 
 
@@ -74,6 +78,24 @@ class LeadSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
+class LeadImportRowSerializer(serializers.Serializer):
+    """One row of a lead import; ``assigned_to`` is the email of a user in the organization."""
+    name = serializers.CharField(max_length=255)
+    email = serializers.EmailField(max_length=254)
+    phone = serializers.CharField(max_length=20, required=False, default='')
+    company = serializers.CharField(max_length=255, required=False, default='')
+    source = serializers.CharField(max_length=100, required=False, default='')
+    status = serializers.ChoiceField(choices=Lead.STATUS_CHOICES, required=False, default='new')
+    assigned_to = serializers.EmailField(required=False, default='')
+
+
+class LeadImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = LeadImportJob
+        fields = ['id', 'status', 'file_format', 'result', 'created_at', 'finished_at']
+        read_only_fields = fields
+
+
 class OpportunitySerializer(serializers.ModelSerializer):
     owner_name = serializers.CharField(source='owner.get_full_name', read_only=True)
     account_name = serializers.CharField(source='account.name', read_only=True)
@@ -154,6 +176,8 @@ class QuoteSerializer(serializers.ModelSerializer):
             'total_price', 'created_by', 'created_by_name', 
             'created_at', 'notes', 'line_items'
         ]
+        # Derived from line items; see Quote.adjust_total_price
+        read_only_fields = ['total_price']
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -5,10 +5,25 @@ This module handles the automatic creation of InteractionLog entries
 for key sales activities that should be visible on the sales dashboard.
 """
 
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from .models import InteractionLog, Lead, Opportunity, Quote, Task
+from .activity_stream import announce_activity
+from .aggregate_cache import invalidate_aggregates
+from .models import (
+    Account,
+    Contact,
+    DeletedRecord,
+    InteractionLog,
+    Lead,
+    Opportunity,
+    Organization,
+    Product,
+    Quote,
+    Task,
+    User,
+)
+from .response_cache import bump_generations
 
 
 @receiver(post_save, sender=Lead)
@@ -32,41 +47,50 @@ def log_lead_creation(sender, instance, created, **kwargs):
 @receiver(pre_save, sender=Lead)
 def log_lead_status_change(sender, instance, **kwargs):
     """Log when a lead's status changes."""
-    if instance.pk:  # Only for existing leads
-        try:
-            old_lead = Lead.objects.get(pk=instance.pk)
-            if old_lead.status != instance.status:
-                # Store the status change info for post_save signal
-                instance._status_changed = True
-                instance._old_status = old_lead.status
-                instance._new_status = instance.status
-        except Lead.DoesNotExist:
-            pass
+    # Compare against the values loaded with the instance instead of re-reading the row
+    instance._status_changed = False
+    original = instance.get_original_values()
+    if original and original['status'] != instance.status:
+        # Store the status change info for post_save signal
+        instance._status_changed = True
+        instance._old_status = original['status']
+        instance._new_status = instance.status
+
+
+def build_lead_status_change_log(lead):
+    """
+    Build (without saving) the InteractionLog for a lead's new status.
+    Returns None when the lead has no assigned user to attribute it to.
+    """
+    status_messages = {
+        'new': 'marked as new',
+        'contacted': 'contacted for the first time',
+        'qualified': 'qualified as a potential customer',
+        'converted': 'successfully converted to opportunity',
+        'disqualified': 'disqualified from sales process'
+    }
+    
+    action = status_messages.get(lead.status, f'status changed to {lead.get_status_display()}')
+    
+    # Only create log if we have a valid assigned user (safety check)
+    if not lead.assigned_to:
+        return None
+    return InteractionLog(
+        user=lead.assigned_to,
+        lead=lead,
+        organization=lead.assigned_to.organization or lead.organization,
+        type='note',
+        summary=f"Lead {lead.name} {action}"
+    )
 
 
 @receiver(post_save, sender=Lead)
 def log_lead_status_change_post_save(sender, instance, created, **kwargs):
     """Log the status change after save."""
     if not created and hasattr(instance, '_status_changed') and instance._status_changed:
-        status_messages = {
-            'new': 'marked as new',
-            'contacted': 'contacted for the first time',
-            'qualified': 'qualified as a potential customer',
-            'converted': 'successfully converted to opportunity',
-            'disqualified': 'disqualified from sales process'
-        }
-        
-        action = status_messages.get(instance._new_status, f'status changed to {instance.get_status_display()}')
-        
-        # Only create log if we have a valid assigned user (safety check)
-        if instance.assigned_to:
-            InteractionLog.objects.create(
-                user=instance.assigned_to,
-                lead=instance,
-                organization=instance.assigned_to.organization or instance.organization,
-                type='note',
-                summary=f"Lead {instance.name} {action}"
-            )
+        log = build_lead_status_change_log(instance)
+        if log:
+            log.save()
 
 
 @receiver(post_save, sender=Opportunity)
@@ -94,64 +118,70 @@ def log_opportunity_creation(sender, instance, created, **kwargs):
 @receiver(pre_save, sender=Opportunity)
 def log_opportunity_stage_change(sender, instance, **kwargs):
     """Log when an opportunity's stage changes."""
-    if instance.pk:  # Only for existing opportunities
-        try:
-            old_opportunity = Opportunity.objects.get(pk=instance.pk)
-            if old_opportunity.stage != instance.stage:
-                # Store the stage change info for post_save signal
-                instance._stage_changed = True
-                instance._old_stage = old_opportunity.stage
-                instance._new_stage = instance.stage
-        except Opportunity.DoesNotExist:
-            pass
+    instance._stage_changed = False
+    original = instance.get_original_values()
+    if original and original['stage'] != instance.stage:
+        # Store the stage change info for post_save signal
+        instance._stage_changed = True
+        instance._old_stage = original['stage']
+        instance._new_stage = instance.stage
+
+
+def build_opportunity_stage_change_log(opportunity):
+    """
+    Build (without saving) the InteractionLog for an opportunity's new stage.
+    Returns None when the opportunity has no owner to attribute it to.
+    """
+    stage_messages = {
+        'qualification': 'moved to qualification stage',
+        'proposal': 'moved to proposal stage - preparing quote',
+        'negotiation': 'entered negotiation phase',
+        'won': 'WON! 🎉 Deal closed successfully',
+        'lost': 'marked as lost - opportunity closed'
+    }
+    
+    action = stage_messages.get(opportunity.stage, f'stage changed to {opportunity.get_stage_display()}')
+    
+    # Only create log if we have a valid owner (safety check)
+    if not opportunity.owner:
+        return None
+    return InteractionLog(
+        user=opportunity.owner,
+        opportunity=opportunity,
+        contact_id=opportunity.contact_id,
+        organization=opportunity.owner.organization or opportunity.organization,
+        type='note',
+        summary=f"Opportunity {opportunity.name} {action}"
+    )
 
 
 @receiver(post_save, sender=Opportunity)
 def log_opportunity_stage_change_post_save(sender, instance, created, **kwargs):
     """Log the stage change after save."""
     if not created and hasattr(instance, '_stage_changed') and instance._stage_changed:
-        stage_messages = {
-            'qualification': 'moved to qualification stage',
-            'proposal': 'moved to proposal stage - preparing quote',
-            'negotiation': 'entered negotiation phase',
-            'won': 'WON! 🎉 Deal closed successfully',
-            'lost': 'marked as lost - opportunity closed'
-        }
-        
-        action = stage_messages.get(instance._new_stage, f'stage changed to {instance.get_stage_display()}')
-        
-        # Only create log if we have a valid owner (safety check)
-        if instance.owner:
-            InteractionLog.objects.create(
-                user=instance.owner,
-                opportunity=instance,
-                contact=instance.contact,
-                organization=instance.owner.organization or instance.organization,
-                type='note',
-                summary=f"Opportunity {instance.name} {action}"
-            )
+        log = build_opportunity_stage_change_log(instance)
+        if log:
+            log.save()
 
 
 @receiver(pre_save, sender=Opportunity)
 def log_opportunity_amount_change(sender, instance, **kwargs):
     """Log when an opportunity's amount changes significantly."""
-    if instance.pk:  # Only for existing opportunities
-        try:
-            old_opportunity = Opportunity.objects.get(pk=instance.pk)
-            old_amount = old_opportunity.amount
-            new_amount = instance.amount
+    instance._amount_changed = False
+    original = instance.get_original_values()
+    if original:
+        old_amount = original['amount']
+        new_amount = instance.amount
+        
+        # Log if amount changes by more than 10% and at least $1000
+        if old_amount and new_amount:
+            change_percent = abs(new_amount - old_amount) / old_amount
+            change_amount = abs(new_amount - old_amount)
             
-            # Log if amount changes by more than 10% and at least $1000
-            if old_amount and new_amount:
-                change_percent = abs(new_amount - old_amount) / old_amount
-                change_amount = abs(new_amount - old_amount)
-                
-                if change_percent > 0.10 and change_amount >= 1000:
-                    instance._amount_changed = True
-                    instance._old_amount = old_amount
-                    instance._new_amount = new_amount
-        except Opportunity.DoesNotExist:
-            pass
+            if change_percent > 0.10 and change_amount >= 1000:
+                instance._amount_changed = True
+                instance._old_amount = old_amount
+                instance._new_amount = new_amount
 
 
 @receiver(post_save, sender=Opportunity)
@@ -198,11 +228,77 @@ def log_quote_creation(sender, instance, created, **kwargs):
             )
 
 
+@receiver(post_save, sender=Lead)
+@receiver(post_save, sender=Opportunity)
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=InteractionLog)
+@receiver(post_delete, sender=Lead)
+@receiver(post_delete, sender=Opportunity)
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=InteractionLog)
+def invalidate_cached_aggregates(sender, instance, **kwargs):
+    """Drop the organization's cached dashboard aggregates that include this row."""
+    invalidate_aggregates(instance.organization_id, sender)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_cached_response_generations(sender, instance, **kwargs):
+    """Invalidate cached API responses built from this row's model."""
+    if sender._meta.app_label != 'core' or sender is DeletedRecord:
+        return
+    if sender is Organization:
+        organization_ids = [instance.pk]
+    else:
+        organization_ids = [getattr(instance, 'organization_id', None)]
+    if sender is User and not kwargs.get('created'):
+        original = instance.get_original_values()
+        if original:
+            organization_ids.append(original['organization_id'])
+    bump_generations(organization_ids, sender)
+
+
+@receiver(post_save, sender=InteractionLog)
+def announce_new_activity(sender, instance, created, using, **kwargs):
+    """Push new activity to the organization's live streams once committed."""
+    if created:
+        announce_activity([instance], using=using)
+
+
+@receiver(post_delete, sender=Account)
+@receiver(post_delete, sender=Contact)
+@receiver(post_delete, sender=Lead)
+@receiver(post_delete, sender=Opportunity)
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Quote)
+@receiver(post_delete, sender=Product)
+def record_deletion_tombstone(sender, instance, origin=None, **kwargs):
+    """Record a tombstone so change-feed clients can replay the delete."""
+    if instance.organization_id is None:
+        return
+    # The organization's own deletion takes its tombstones with it
+    if isinstance(origin, Organization) or getattr(origin, 'model', None) is Organization:
+        return
+    DeletedRecord.objects.create(
+        organization_id=instance.organization_id,
+        model=sender._meta.model_name,
+        object_id=instance.pk,
+    )
+
+
 def create_task_completion_log(task, user):
     """
     Helper function to create interaction log for task completion.
     This should be called from the view when a task is marked as completed.
     """
+    build_task_completion_log(task, user).save()
+
+
+def build_task_completion_log(task, user):
+    """
+    Build (without saving) the InteractionLog for a completed task, so that
+    bulk updates can insert many of them at once.
+    """
     task_type_actions = {
         'call': 'completed call with',
         'email': 'sent email to',
@@ -234,7 +330,7 @@ def create_task_completion_log(task, user):
     if task.notes:
         summary += f" - Notes: {task.notes[:100]}{'...' if len(task.notes) > 100 else ''}"
     
-    InteractionLog.objects.create(
+    return InteractionLog(
         user=user,
         lead=log_lead,
         contact=log_contact,
@@ -0,0 +1,204 @@
+"""
+Test the Server-Sent Events activity stream and its broker
+"""
+import asyncio
+import json
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core import activity_stream
+from core.activity_stream import ActivityBroker, get_broker
+from core.models import InteractionLog, Lead, Organization
+
+User = get_user_model()
+
+
+def _event_data(message):
+    lines = dict(line.split(': ', 1) for line in message.strip().splitlines())
+    return json.loads(lines['data'])
+
+
+class StreamTestMixin:
+    def create_user(self, name):
+        organization = Organization.objects.create(name=f'{name} Org')
+        return User.objects.create_user(
+            username=f'{name}@example.com',
+            email=f'{name}@example.com',
+            password='testpassword123',
+            organization=organization
+        )
+
+    def create_log(self, user, summary):
+        return InteractionLog.objects.create(
+            user=user, organization=user.organization, type='note', summary=summary
+        )
+
+    async def open_stream(self, user, **headers):
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(user).access_token))()
+        response = await self.async_client.get(
+            '/api/v1/activity/stream/', headers={'Authorization': f'Bearer {token}', **headers}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await self.next_message(stream)).startswith('retry:'))
+        return stream
+
+    async def next_message(self, stream):
+        message = await asyncio.wait_for(anext(stream), timeout=5)
+        return message.decode() if isinstance(message, bytes) else message
+
+
+@override_settings(ACTIVITY_STREAM_BACKEND='local')
+class ActivityStreamTestCase(StreamTestMixin, TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(activity_stream, '_broker', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = self.create_user('stream')
+        self.outsider = self.create_user('stream-outsider')
+
+    def committed_log(self, user, summary):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.create_log(user, summary)
+
+    async def test_committed_activity_reaches_only_its_organization(self):
+        """Test that a new log is pushed to its organization's streams once committed"""
+        stream = await self.open_stream(self.user)
+        await sync_to_async(self.committed_log)(self.outsider, 'Elsewhere')
+        log = await sync_to_async(self.committed_log)(self.user, 'Called the customer')
+
+        message = await self.next_message(stream)
+
+        self.assertIn(f'id: {log.id}\nevent: activity\n', message)
+        self.assertEqual(_event_data(message)['summary'], 'Called the customer')
+        # Django cancels the pending read when the client disconnects
+        pending = asyncio.ensure_future(self.next_message(stream))
+        await asyncio.sleep(0.01)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        self.assertEqual(get_broker().subscriber_count(), 0)
+
+    async def test_reconnect_replays_after_last_event_id_then_heartbeats(self):
+        """Test that Last-Event-ID replays missed rows and idle streams send keepalives"""
+        first = await sync_to_async(self.create_log)(self.user, 'First')
+        second = await sync_to_async(self.create_log)(self.user, 'Second')
+
+        with self.settings(ACTIVITY_STREAM_HEARTBEAT_SECONDS=0.01):
+            stream = await self.open_stream(self.user, **{'Last-Event-ID': str(first.id)})
+            replayed = await self.next_message(stream)
+            keepalive = await self.next_message(stream)
+            await stream.aclose()
+
+        self.assertEqual(_event_data(replayed)['id'], second.id)
+        self.assertEqual(keepalive, ': keepalive\n\n')
+
+    async def test_requests_need_credentials_and_asgi(self):
+        """Test that anonymous and WSGI requests are refused"""
+        response = await self.async_client.get('/api/v1/activity/stream/')
+        self.assertEqual(response.status_code, 401)
+
+        client = APIClient()
+        await sync_to_async(client.force_authenticate)(user=self.user)
+        self.assertEqual((await sync_to_async(client.get)('/api/v1/activity/stream/')).status_code, 501)
+
+    async def test_browsers_open_the_stream_with_a_short_lived_ticket(self):
+        """Test that tickets open only the stream, expire, and access tokens are not accepted in the URL"""
+        client = APIClient()
+        await sync_to_async(client.force_authenticate)(user=self.user)
+        response = await sync_to_async(client.post)('/api/v1/activity/stream/ticket/')
+        self.assertEqual(response.status_code, 200)
+        ticket = response.data['ticket']
+
+        response = await self.async_client.get('/api/v1/activity/stream/', {'ticket': ticket})
+        self.assertEqual(response.status_code, 200)
+        await response.streaming_content.aclose()
+        # Not a credential for the rest of the API
+        self.assertEqual((await self.async_client.get('/api/v1/async/leads/', {'ticket': ticket})).status_code, 401)
+
+        with self.settings(ACTIVITY_STREAM_TICKET_SECONDS=-1):
+            response = await self.async_client.get('/api/v1/activity/stream/', {'ticket': ticket})
+            self.assertEqual(response.status_code, 401)
+        self.assertEqual(
+            (await self.async_client.get('/api/v1/activity/stream/', {'ticket': ticket + 'x'})).status_code, 401
+        )
+
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(self.user).access_token))()
+        response = await self.async_client.get('/api/v1/activity/stream/', {'access_token': token})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_slow_subscribers_are_disconnected(self):
+        """Test that an overflowing queue ends the stream instead of growing"""
+        broker = ActivityBroker(queue_size=1)
+        with mock.patch.object(activity_stream, '_broker', broker):
+            stream = await self.open_stream(self.user)
+            for summary in ('One', 'Two'):
+                await sync_to_async(self.committed_log)(self.user, summary)
+            await asyncio.sleep(0.1)
+            with self.assertRaises(StopAsyncIteration):
+                await self.next_message(stream)
+
+    async def test_delivery_errors_are_logged(self):
+        """Test that a failed load of announced rows is logged rather than lost with its future"""
+        error = OperationalError('server closed the connection unexpectedly')
+        with mock.patch.object(activity_stream, '_load_events', side_effect=error):
+            with self.assertLogs('core.activity_stream', 'WARNING'):
+                await ActivityBroker().deliver([1])
+
+    def test_bulk_writes_are_announced(self):
+        """Test that signal-free bulk PATCH logs are announced on commit"""
+        lead = Lead.objects.create(name='Bulk', email='bulk@example.com', assigned_to=self.user,
+                                   organization=self.user.organization)
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        with mock.patch.object(ActivityBroker, 'announce') as announce:
+            with self.captureOnCommitCallbacks(execute=True):
+                client.patch('/api/v1/leads/bulk/', {'ids': [lead.id], 'changes': {'status': 'qualified'}},
+                             format='json')
+
+        payloads = [payload for call in announce.call_args_list for payload in call.args[0]]
+        latest = InteractionLog.objects.filter(lead=lead).latest('id')
+        self.assertIn(f'{self.user.organization_id}:{latest.id}', payloads)
+
+
+@override_settings(ACTIVITY_STREAM_BACKEND='postgres')
+class PostgresActivityStreamTestCase(StreamTestMixin, TransactionTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(activity_stream, '_broker', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = self.create_user('notify')
+
+    async def test_notify_fans_out_committed_rows(self):
+        """Test that rows committed by any connection arrive through LISTEN/NOTIFY"""
+        stream = await self.open_stream(self.user)
+        broker = get_broker()
+        await asyncio.wait_for(broker.listening.wait(), timeout=5)
+
+        log = await sync_to_async(self.create_log)(self.user, 'Over NOTIFY')
+        message = await self.next_message(stream)
+
+        self.assertEqual(_event_data(message)['id'], log.id)
+        await stream.aclose()
+        broker.listener.cancel()
+
+    async def test_open_streams_hold_no_database_connection(self):
+        """Test that the connection used to authenticate and replay is released before the stream idles"""
+        first = await sync_to_async(self.create_log)(self.user, 'First')
+        await sync_to_async(self.create_log)(self.user, 'Second')
+
+        with self.settings(ACTIVITY_STREAM_HEARTBEAT_SECONDS=0.01):
+            stream = await self.open_stream(self.user, **{'Last-Event-ID': str(first.id)})
+            self.assertEqual(_event_data(await self.next_message(stream))['summary'], 'Second')
+            self.assertEqual(await self.next_message(stream), ': keepalive\n\n')
+            self.assertIsNone(await sync_to_async(lambda: connection.connection)())
+            await stream.aclose()
+        get_broker().listener.cancel()
@@ -0,0 +1,203 @@
+"""
+Test the per-organization aggregate cache and its invalidation
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from core.aggregate_cache import (
+    AggregateCache,
+    DummyAggregateBackend,
+    LocMemAggregateBackend,
+    get_aggregate_cache,
+)
+from core.models import Lead, Opportunity, Organization
+from core.tests.utils import seed_organization
+
+User = get_user_model()
+
+
+class FakeRedis:
+    """In-memory stand-in for the few ``redis.Redis`` commands the backend uses."""
+    instances = []
+
+    def __init__(self, url):
+        self.url = url
+        self.strings = {}
+        self.hashes = {}
+        self.expiries = {}
+
+    @classmethod
+    def from_url(cls, url):
+        client = cls(url)
+        cls.instances.append(client)
+        return client
+
+    def get(self, key):
+        value = self.strings.get(key)
+        return None if value is None else str(value).encode()
+
+    def set(self, key, value, nx=False):
+        if not (nx and key in self.strings):
+            self.strings[key] = int(value)
+
+    def incr(self, key):
+        self.strings[key] = self.strings.get(key, 0) + 1
+
+    def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+
+    def expire(self, key, seconds):
+        self.expiries[key] = seconds
+
+    def delete(self, key):
+        self.hashes.pop(key, None)
+
+
+# The configured default (no AGGREGATE_CACHE_URL in tests), and a single test
+# process, the one case the in-process backend is safe for
+DEFAULT_AGGREGATE_CACHE = settings.AGGREGATE_CACHE
+LOCMEM = {'BACKEND': 'core.aggregate_cache.LocMemAggregateBackend', 'TIMEOUT': 300}
+
+REDIS_STAND_IN = {
+    'BACKEND': 'core.aggregate_cache.RedisAggregateBackend',
+    'LOCATION': 'redis://cache.invalid:6379/1',
+    'TIMEOUT': 60,
+    'OPTIONS': {'CLIENT_CLASS': 'core.tests.test_aggregate_cache.FakeRedis'},
+}
+
+
+@override_settings(AGGREGATE_CACHE=LOCMEM)
+class AggregateCacheTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.organization = Organization.objects.create(name='Cache Org')
+        self.user = User.objects.create_user(
+            username='cache@example.com',
+            email='cache@example.com',
+            password='testpassword123',
+            role='admin',
+            organization=self.organization
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            seed_organization(self.organization, self.user, 3)
+        self.client.force_authenticate(user=self.user)
+        get_aggregate_cache().reset_stats()
+
+    def _dashboard(self):
+        self.client.force_authenticate(user=User.objects.get(pk=self.user.pk))
+        return self.client.get('/api/v1/dashboard/activity/').data
+
+    def test_second_dashboard_load_is_served_from_the_cache(self):
+        """Test that repeated loads skip the aggregate queries and count hits"""
+        first = self._dashboard()
+        with self.assertNumQueries(3):
+            # Only the user and organization lookups and the live activity feed remain
+            second = self._dashboard()
+
+        self.assertEqual(first['leads_by_status'], second['leads_by_status'])
+        self.assertEqual(second['leads_by_status']['new'], 3)
+        self.assertEqual(second['overdue_tasks'], 2)
+        stats = get_aggregate_cache().stats()
+        self.assertEqual(stats['pipeline'], {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+        self.assertEqual(stats['activity']['hits'], 2)
+
+    def test_saves_and_deletes_invalidate_only_their_group_on_commit(self):
+        """Test that a lead change drops lead aggregates and leaves the pipeline cached"""
+        self._dashboard()
+        lead = Lead.objects.filter(organization=self.organization).first()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            lead.status = 'qualified'
+            lead.save()
+            self.assertEqual(self._dashboard()['leads_by_status']['qualified'], 0)
+        self.assertTrue(callbacks)
+
+        self.assertEqual(self._dashboard()['leads_by_status']['qualified'], 1)
+        self.assertEqual(get_aggregate_cache().stats()['pipeline']['misses'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            lead.delete()
+        self.assertEqual(self._dashboard()['leads_by_status']['qualified'], 0)
+
+    def test_bulk_updates_invalidate_without_signals(self):
+        """Test that the set-based bulk PATCH drops the cached pipeline"""
+        before = self.client.get('/api/v1/opportunities/pipeline_value/').data
+        ids = list(Opportunity.objects.filter(organization=self.organization).values_list('id', flat=True))
+
+        key = get_aggregate_cache().make_key(self.organization.id, 'pipeline')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch('/api/v1/opportunities/bulk/', {'ids': ids, 'changes': {'stage': 'won'}}, format='json')
+            # Dropped on commit, not while a concurrent read could re-cache the old rows
+            self.assertIsNotNone(get_aggregate_cache().backend.get(key, 'stage:'))
+        self.assertIsNone(get_aggregate_cache().backend.get(key, 'stage:'))
+
+        after = self.client.get('/api/v1/opportunities/pipeline_value/').data
+        self.assertEqual(before['total_count'], 3)
+        self.assertEqual(after['total_count'], 0)
+
+    def test_other_organizations_and_expired_values_are_not_served(self):
+        """Test that entries are keyed per organization and honour the timeout"""
+        cache = AggregateCache(LocMemAggregateBackend(), timeout=60)
+        self.assertEqual(cache.get_or_compute(1, 'leads', 'status', lambda: 'one'), 'one')
+        self.assertEqual(cache.get_or_compute(2, 'leads', 'status', lambda: 'two'), 'two')
+        self.assertEqual(cache.get_or_compute(1, 'leads', 'status', lambda: 'recomputed'), 'one')
+
+        expired = AggregateCache(LocMemAggregateBackend(), timeout=0)
+        expired.get_or_compute(1, 'leads', 'status', lambda: 'old')
+        self.assertEqual(expired.get_or_compute(1, 'leads', 'status', lambda: 'new'), 'new')
+
+    def test_values_computed_across_an_invalidation_are_not_served(self):
+        """Test that a reader finishing after a writer's commit cannot re-cache the old rows"""
+        cache = AggregateCache(LocMemAggregateBackend(), timeout=60)
+
+        def compute_while_a_write_commits():
+            cache.invalidate(1, 'leads')
+            return 'from the old rows'
+
+        self.assertEqual(cache.get_or_compute(1, 'leads', 'status', compute_while_a_write_commits), 'from the old rows')
+        self.assertEqual(cache.get_or_compute(1, 'leads', 'status', lambda: 'current'), 'current')
+        self.assertEqual(cache.get_or_compute(1, 'leads', 'status', lambda: 'recomputed'), 'current')
+
+    @override_settings(AGGREGATE_CACHE=DEFAULT_AGGREGATE_CACHE)
+    def test_aggregates_are_not_cached_by_default(self):
+        """Test that without a shared backend every load computes the aggregates"""
+        self.assertIsInstance(get_aggregate_cache().backend, DummyAggregateBackend)
+
+        self._dashboard()
+        self.assertEqual(self._dashboard()['leads_by_status']['new'], 3)
+        self.assertEqual(get_aggregate_cache().stats()['pipeline'], {'hits': 0, 'misses': 2, 'hit_ratio': 0.0})
+
+    @override_settings(AGGREGATE_CACHE=REDIS_STAND_IN)
+    def test_redis_backend_stores_one_hash_per_group(self):
+        """Test the Redis backend against a local stand-in client"""
+        self._dashboard()
+        redis = FakeRedis.instances[-1]
+        generation = redis.strings[f'aggregates:{self.organization.id}:pipeline:generation']
+        key = f'aggregates:{self.organization.id}:pipeline:{generation}'
+
+        self.assertEqual(redis.url, 'redis://cache.invalid:6379/1')
+        self.assertEqual(list(redis.hashes[key]), ['stage:'])
+        self.assertEqual(redis.expiries[key], 60)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Opportunity.objects.filter(organization=self.organization).first().delete()
+        self.assertNotIn(key, redis.hashes)
+        self.assertEqual(redis.strings[f'aggregates:{self.organization.id}:pipeline:generation'], generation + 1)
+        self.assertEqual(self._dashboard()['pipeline']['total_count'], 2)
+
+    def test_cache_stats_endpoint_is_admin_only(self):
+        """Test that admins can read the counters and other roles cannot"""
+        self._dashboard()
+        response = self.client.get('/api/v1/dashboard/cache-stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['leads']['misses'], 1)
+
+        self.user.role = 'sales_rep'
+        self.user.save()
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get('/api/v1/dashboard/cache-stats/').status_code, 403)
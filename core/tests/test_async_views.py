@@ -0,0 +1,91 @@
+"""
+Test that the async read endpoints match their DRF counterparts
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.models import Lead, Organization
+from core.tests.utils import seed_organization
+
+User = get_user_model()
+
+NO_AGGREGATE_CACHING = {**settings.AGGREGATE_CACHE, 'TIMEOUT': 0}
+
+
+@override_settings(AGGREGATE_CACHE=NO_AGGREGATE_CACHING)
+class AsyncViewsTestCase(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name='Async Org')
+        self.user = User.objects.create_user(
+            username='async@example.com',
+            email='async@example.com',
+            password='testpassword123',
+            role='manager',
+            organization=self.organization
+        )
+        seed_organization(self.organization, self.user, 12)
+        other_organization = Organization.objects.create(name='Other Async Org')
+        outsider = User.objects.create_user(
+            username='async-outsider@example.com',
+            email='async-outsider@example.com',
+            password='testpassword123',
+            organization=other_organization
+        )
+        seed_organization(other_organization, outsider, 2, start=100)
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+    def _sync_get(self, path):
+        client = APIClient()
+        client.force_authenticate(user=User.objects.get(pk=self.user.pk))
+        response = client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    async def _async_get(self, path, status=200, token=None):
+        headers = {'Authorization': f'Bearer {token or self.token}'} if token is not False else {}
+        response = await self.async_client.get(f'/api/v1/async{path}', headers=headers)
+        self.assertEqual(response.status_code, status)
+        return json.loads(response.content)
+
+    async def test_lists_match_the_drf_endpoints(self):
+        """Test that async lists return the same pages, filters and links"""
+        for path in ('/leads/', '/leads/?page=2', '/opportunities/?stage=proposal',
+                     '/interactions/?page=2', '/tasks/overdue/'):
+            with self.subTest(path=path):
+                expected = await sync_to_async(self._sync_get)(f'/api/v1{path}')
+                actual = await self._async_get(path)
+                for key in ('next', 'previous'):
+                    if isinstance(expected, dict) and expected[key]:
+                        expected[key] = expected[key].replace('/api/v1/', '/api/v1/async/')
+                self.assertEqual(actual, expected)
+
+    async def test_aggregates_match_the_drf_endpoints(self):
+        """Test that pipeline_value and the dashboard are computed identically"""
+        for path in ('/opportunities/pipeline_value/', '/dashboard/activity/?days=30&user=me'):
+            with self.subTest(path=path):
+                expected = await sync_to_async(self._sync_get)(f'/api/v1{path}')
+                self.assertEqual(await self._async_get(path), expected)
+
+    async def test_results_stay_inside_the_organization(self):
+        """Test that rows of other organizations are never listed"""
+        data = await self._async_get('/leads/?page=2')
+        count = await Lead.objects.filter(organization=self.organization).acount()
+        self.assertEqual(data['count'], count)
+        self.assertFalse({'Lead 100', 'Lead 101'} & {lead['name'] for lead in data['results']})
+
+        await self._async_get('/dashboard/activity/?user=999999', status=404)
+
+    async def test_authentication_and_organization_are_required(self):
+        """Test the HasOrganizationAccess equivalents and bad pages"""
+        await self._async_get('/leads/', status=401, token=False)
+        await self._async_get('/leads/', status=401, token='not-a-token')
+
+        loner = await User.objects.acreate(username='loner@example.com', email='loner@example.com')
+        await self._async_get('/leads/', status=403, token=str(RefreshToken.for_user(loner).access_token))
+        await self._async_get('/leads/?page=99', status=404)
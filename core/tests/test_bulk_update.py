@@ -0,0 +1,141 @@
+"""
+Test the set-based bulk PATCH actions
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.models import Account, InteractionLog, Lead, Opportunity, Organization, Task
+
+User = get_user_model()
+
+
+class BulkUpdateTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.organization = Organization.objects.create(name='Bulk Org')
+        self.user = User.objects.create_user(
+            username='bulk@example.com',
+            email='bulk@example.com',
+            password='testpassword123',
+            organization=self.organization
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.other_organization = Organization.objects.create(name='Other Bulk Org')
+        self.outsider = User.objects.create_user(
+            username='bulk-outsider@example.com',
+            email='bulk-outsider@example.com',
+            password='testpassword123',
+            organization=self.other_organization
+        )
+
+    def _lead(self, name, organization=None, **kwargs):
+        organization = organization or self.organization
+        return Lead.objects.create(
+            name=name, email=f'{name.lower()}@example.com', organization=organization,
+            assigned_to=self.user if organization == self.organization else self.outsider, **kwargs
+        )
+
+    def _patch(self, resource, body, query=''):
+        return self.client.patch(f'/api/v1/{resource}/bulk/{query}', body, format='json')
+
+    def _logs(self, prefix):
+        return sorted(InteractionLog.objects.filter(summary__startswith=prefix).values_list('summary', flat=True))
+
+    def test_lead_status_by_ids_reports_each_row(self):
+        """Test that ids are updated in one go and every requested id gets a result"""
+        ann = self._lead('Ann')
+        bob = self._lead('Bob')
+        cid = self._lead('Cid', status='contacted')
+        foreign = self._lead('Dee', organization=self.other_organization)
+        before = Lead.objects.get(pk=ann.pk).updated_at
+
+        response = self._patch('leads', {
+            'ids': [ann.id, bob.id, cid.id, foreign.id, 999999],
+            'changes': {'status': 'contacted'},
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 2)
+        results = {row['id']: row for row in response.data['results']}
+        self.assertEqual(results[ann.id], {'id': ann.id, 'status': 'updated', 'changes': {'status': ['new', 'contacted']}})
+        self.assertEqual(results[cid.id]['status'], 'unchanged')
+        self.assertEqual(results[foreign.id]['status'], 'not_found')
+        self.assertEqual(results[999999]['status'], 'not_found')
+
+        self.assertEqual(Lead.objects.get(pk=foreign.pk).status, 'new')
+        self.assertGreater(Lead.objects.get(pk=ann.pk).updated_at, before)
+        self.assertEqual(self._logs('Lead '), [
+            'Lead Ann contacted for the first time',
+            'Lead Bob contacted for the first time',
+        ])
+
+    def test_query_count_does_not_depend_on_row_count(self):
+        """Test that updating many rows costs the same queries as updating a few"""
+        def run(names):
+            ids = [self._lead(name).id for name in names]
+            # Re-fetch the user so the organization lookup is counted every time
+            self.client.force_authenticate(user=User.objects.get(pk=self.user.pk))
+            with CaptureQueriesContext(connection) as context:
+                response = self._patch('leads', {'ids': ids, 'changes': {'status': 'qualified'}})
+            self.assertEqual(response.data['updated'], len(names))
+            return len(context.captured_queries)
+
+        self.assertEqual(run([f'Few{i}' for i in range(2)]), run([f'Many{i}' for i in range(30)]))
+
+    def test_opportunity_stage_by_list_filter(self):
+        """Test that rows can be selected with the list filters instead of ids"""
+        account = Account.objects.create(name='Acme', organization=self.organization)
+        for name, amount in (('Alpha deal', '1000.00'), ('Beta deal', '2000.00'), ('Gamma', '3000.00')):
+            Opportunity.objects.create(
+                name=name, account=account, amount=Decimal(amount), owner=self.user, organization=self.organization
+            )
+
+        response = self._patch('opportunities', {'changes': {'stage': 'proposal'}}, query='?search=deal')
+
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(
+            dict(Opportunity.objects.values_list('name', 'stage')),
+            {'Alpha deal': 'proposal', 'Beta deal': 'proposal', 'Gamma': 'qualification'}
+        )
+        self.assertEqual(self._logs('Opportunity '), [
+            'Opportunity Alpha deal moved to proposal stage - preparing quote',
+            'Opportunity Beta deal moved to proposal stage - preparing quote',
+        ])
+
+    def test_task_completion_logs_match_mark_completed(self):
+        """Test that completing tasks in bulk logs them like mark_completed"""
+        lead = self._lead('Eve')
+        task = Task.objects.create(
+            title='Call Eve', type='call', due_date=date.today(), related_lead=lead,
+            owner=self.user, organization=self.organization
+        )
+
+        response = self._patch('tasks', {'ids': [task.id], 'changes': {'status': 'completed'}})
+
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(self._logs('Task completed'), ['Task completed: completed call with Eve'])
+
+    def test_invalid_requests_are_rejected(self):
+        """Test that selections, fields, values and cross-tenant references are validated"""
+        lead = self._lead('Fay')
+
+        self.assertEqual(self._patch('leads', {'changes': {'status': 'contacted'}}).status_code, 400)
+        # Parameters that select no rows, and misspelt filters, never update the whole organization
+        for query in ('?format=json', '?page=2&ordering=name', '?status=', '?stauts=new', '?status=new&ownr=1'):
+            self.assertEqual(self._patch('leads', {'changes': {'status': 'contacted'}}, query=query).status_code, 400)
+        self.assertEqual(Lead.objects.get(pk=lead.pk).status, 'new')
+        response = self._patch('leads', {'changes': {'status': 'contacted'}}, query='?status=new&format=json')
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(self._patch('leads', {'ids': [lead.id], 'changes': {'name': 'X'}}).status_code, 400)
+        self.assertEqual(self._patch('leads', {'ids': [lead.id], 'changes': {'status': 'bogus'}}).status_code, 400)
+        self.assertEqual(self._patch('leads', {'ids': 'all', 'changes': {'status': 'contacted'}}).status_code, 400)
+        response = self._patch('leads', {'ids': [lead.id], 'changes': {'assigned_to': self.outsider.id}})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Lead.objects.get(pk=lead.pk).assigned_to, self.user)
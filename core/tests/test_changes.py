@@ -0,0 +1,107 @@
+"""
+Test the delta-sync change feed and its delete tombstones
+"""
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.changes import CHANGE_FEED_TYPES
+from core.models import Account, DeletedRecord, Lead, Organization, Product
+from core.tests.utils import seed_organization
+
+User = get_user_model()
+
+
+@override_settings(CHANGE_FEED_OVERLAP_SECONDS=0)
+class ChangeFeedTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.organization = Organization.objects.create(name='Sync Org')
+        self.user = User.objects.create_user(
+            username='sync@example.com',
+            email='sync@example.com',
+            password='testpassword123',
+            organization=self.organization
+        )
+        seed_organization(self.organization, self.user, 3)
+        self.other_organization = Organization.objects.create(name='Other Sync Org')
+        self.client.force_authenticate(user=self.user)
+
+    def _sync(self, cursor=None):
+        response = self.client.get('/api/v1/changes/', {'cursor': cursor} if cursor else {})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_full_sync_then_nothing_new(self):
+        """Test that the first call returns every row and the next one is empty"""
+        first = self._sync()
+        self.assertFalse(first['has_more'])
+        self.assertEqual(set(first['updated']), set(CHANGE_FEED_TYPES))
+        self.assertEqual(len(first['updated']['lead']), 3)
+        self.assertTrue(first['updated']['quote'][0]['line_items'])
+        self.assertEqual(first['deleted']['lead'], [])
+
+        second = self._sync(first['cursor'])
+        self.assertEqual(sum(len(rows) for rows in second['updated'].values()), 0)
+        self.assertEqual(sum(len(ids) for ids in second['deleted'].values()), 0)
+
+    def test_creates_updates_and_deletes_since_the_cursor(self):
+        """Test that only this organization's changes after the cursor are returned"""
+        cursor = self._sync()['cursor']
+        account = Account.objects.filter(organization=self.organization).first()
+        account.name = 'Renamed'
+        account.save()
+        product = Product.objects.create(name='Widget', price=5, organization=self.organization)
+        lead = Lead.objects.filter(organization=self.organization).first()
+        lead_id = lead.id
+        lead.delete()
+        Account.objects.create(name='Elsewhere', organization=self.other_organization)
+
+        changes = self._sync(cursor)
+
+        self.assertEqual([row['name'] for row in changes['updated']['account']], ['Renamed'])
+        self.assertEqual([row['id'] for row in changes['updated']['product']], [product.id])
+        self.assertEqual(changes['deleted']['lead'], [lead_id])
+        self.assertEqual(self._sync(changes['cursor'])['deleted']['lead'], [])
+
+    def test_large_changes_are_paged(self):
+        """Test that has_more pages through the streams without gaps or repeats"""
+        with self.settings(CHANGE_FEED_PAGE_SIZE=2):
+            first = self._sync()
+            second = self._sync(first['cursor'])
+
+        self.assertTrue(first['has_more'])
+        self.assertFalse(second['has_more'])
+        lead_ids = [row['id'] for row in first['updated']['lead'] + second['updated']['lead']]
+        self.assertCountEqual(lead_ids, Lead.objects.filter(organization=self.organization).values_list('id', flat=True))
+
+    def test_recent_rows_are_resent_inside_the_overlap(self):
+        """Test that a caught-up cursor re-reads the overlap window for late commits"""
+        with self.settings(CHANGE_FEED_OVERLAP_SECONDS=60):
+            first = self._sync()
+            again = self._sync(first['cursor'])
+
+        self.assertEqual(len(again['updated']['lead']), 3)
+
+    def test_expired_and_invalid_cursors(self):
+        """Test that cursors past the tombstone retention get 410 and garbage gets 404"""
+        cursor = self._sync()['cursor']
+        with self.settings(CHANGE_FEED_TOMBSTONE_DAYS=0):
+            self.assertEqual(self.client.get('/api/v1/changes/', {'cursor': cursor}).status_code, 410)
+        self.assertEqual(self.client.get('/api/v1/changes/', {'cursor': 'not-a-cursor'}).status_code, 404)
+
+    def test_tombstones_are_pruned_and_follow_their_organization(self):
+        """Test the prune command and that deleting an organization drops its tombstones"""
+        Product.objects.filter(organization=self.organization).delete()
+        self.assertEqual(DeletedRecord.objects.filter(model='product').count(), 3)
+        DeletedRecord.objects.update(deleted_at=timezone.now() - timedelta(days=31))
+
+        call_command('prune_tombstones', stdout=open('/dev/null', 'w'))
+        self.assertFalse(DeletedRecord.objects.exists())
+
+        self.organization.delete()
+        self.assertFalse(DeletedRecord.objects.exists())
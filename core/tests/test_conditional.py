@@ -0,0 +1,103 @@
+"""
+Test ETag / Last-Modified conditional GETs on the tenant viewsets
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+from core.models import Account, Organization, Product, Quote, QuoteLineItem
+from core.tests.utils import seed_organization
+
+User = get_user_model()
+
+
+class ConditionalGetTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.organization = Organization.objects.create(name='Conditional Org')
+        self.user = User.objects.create_user(
+            username='conditional@example.com',
+            email='conditional@example.com',
+            password='testpassword123',
+            organization=self.organization
+        )
+        seed_organization(self.organization, self.user, 3)
+        self.client.force_authenticate(user=self.user)
+
+    def test_matching_etag_returns_304_with_one_query(self):
+        """Test that an unchanged list answers 304 after a single validator query"""
+        first = self.client.get('/api/v1/accounts/')
+        self.assertEqual(first.status_code, 200)
+        # Weak: related rows in the payload do not move it
+        self.assertTrue(first['ETag'].startswith('W/"'))
+        self.assertNotIn('Last-Modified', first)
+
+        self.client.force_authenticate(user=User.objects.select_related('organization').get(pk=self.user.pk))
+        with self.assertNumQueries(1) as context:
+            second = self.client.get('/api/v1/accounts/', HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(second.content, b'')
+        sql = context.captured_queries[0]['sql']
+        self.assertIn('MAX("core_account"."updated_at")', sql)
+        self.assertIn('COUNT("core_account"."id")', sql)
+
+        # A proxy that strips the W/ prefix still matches under weak comparison
+        stripped = self.client.get('/api/v1/accounts/', HTTP_IF_NONE_MATCH=first['ETag'].removeprefix('W/'))
+        self.assertEqual(stripped.status_code, 304)
+
+    def test_updates_deletes_and_query_params_change_the_etag(self):
+        """Test that writes and different filters produce new validators"""
+        etag = self.client.get('/api/v1/accounts/')['ETag']
+        account = Account.objects.filter(organization=self.organization).first()
+
+        account.name = 'Renamed'
+        account.save()
+        after_update = self.client.get('/api/v1/accounts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(after_update.status_code, 200)
+
+        Account.objects.filter(organization=self.organization).order_by('updated_at').first().delete()
+        after_delete = self.client.get('/api/v1/accounts/', HTTP_IF_NONE_MATCH=after_update['ETag'])
+        self.assertEqual(after_delete.status_code, 200)
+
+        filtered = self.client.get('/api/v1/accounts/', {'search': 'Renamed'})
+        self.assertNotEqual(filtered['ETag'], after_delete['ETag'])
+
+    def test_detail_honours_if_modified_since(self):
+        """Test that details carry Last-Modified and answer If-Modified-Since"""
+        product = Product.objects.filter(organization=self.organization).first()
+        response = self.client.get(f'/api/v1/products/{product.id}/')
+        self.assertEqual(response['Last-Modified'], http_date(product.updated_at.timestamp()))
+
+        unchanged = self.client.get(f'/api/v1/products/{product.id}/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(unchanged.status_code, 304)
+
+        earlier = http_date((product.updated_at - timedelta(minutes=5)).timestamp())
+        self.assertEqual(self.client.get(f'/api/v1/products/{product.id}/', HTTP_IF_MODIFIED_SINCE=earlier).status_code, 200)
+
+    def test_line_item_changes_move_the_quote_validators(self):
+        """Test that line-item writes stamp the parent quote's updated_at"""
+        quote = Quote.objects.filter(organization=self.organization).first()
+        etag = self.client.get(f'/api/v1/quotes/{quote.id}/')['ETag']
+        product = Product.objects.filter(organization=self.organization).first()
+
+        self.client.post('/api/v1/quote-line-items/', {
+            'quote': quote.id, 'product': product.id, 'quantity': 1, 'unit_price': '0.00'
+        }, format='json')
+
+        self.assertEqual(self.client.get(f'/api/v1/quotes/{quote.id}/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(QuoteLineItem.objects.filter(quote=quote, unit_price=Decimal('0.00')).count(), 1)
+
+    def test_foreign_records_still_return_404(self):
+        """Test that the validator lookup stays inside the organization"""
+        other_organization = Organization.objects.create(name='Other Conditional Org')
+        foreign = Account.objects.create(name='Foreign', organization=other_organization)
+
+        response = self.client.get(f'/api/v1/accounts/{foreign.id}/', HTTP_IF_NONE_MATCH='*')
+
+        self.assertEqual(response.status_code, 404)
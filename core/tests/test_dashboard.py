@@ -0,0 +1,144 @@
+"""
+Test the dashboard activity endpoint and its aggregate helpers
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import Contact, InteractionLog, Organization
+from core.tests.utils import seed_organization
+from core.utils import (
+    get_activity_summary,
+    get_dashboard_activity_feed,
+    get_top_active_entities,
+)
+
+User = get_user_model()
+
+
+class DashboardActivityTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.organization = Organization.objects.create(name='Dashboard Org')
+        self.manager = User.objects.create_user(
+            username='manager@example.com',
+            email='manager@example.com',
+            password='testpassword123',
+            organization=self.organization,
+            role='manager'
+        )
+        self.rep = User.objects.create_user(
+            username='rep@example.com',
+            email='rep@example.com',
+            password='testpassword123',
+            organization=self.organization
+        )
+        seed_organization(self.organization, self.manager, 4)
+
+        other_organization = Organization.objects.create(name='Other Dashboard Org')
+        self.outsider = User.objects.create_user(
+            username='dashboard-outsider@example.com',
+            email='dashboard-outsider@example.com',
+            password='testpassword123',
+            organization=other_organization
+        )
+        seed_organization(other_organization, self.outsider, 3)
+
+        InteractionLog.objects.create(
+            user=self.rep, type='call', summary='Intro call', organization=self.organization
+        )
+
+    def test_summary_is_a_single_query(self):
+        """Test that the summary counts types and entities in one aggregate"""
+        expected = InteractionLog.objects.filter(organization=self.organization)
+
+        with self.assertNumQueries(1):
+            summary = get_activity_summary(organization=self.organization)
+
+        self.assertEqual(summary['total_activities'], expected.count())
+        self.assertEqual(summary['by_type']['call'], expected.filter(type='call').count())
+        self.assertEqual(summary['by_entity']['leads'], expected.filter(lead__isnull=False).count())
+        self.assertEqual(sum(summary['by_type'].values()), summary['total_activities'])
+
+    def test_top_entities_use_one_query_per_type_and_stay_in_the_organization(self):
+        """Test that top entities are grouped per type and exclude other tenants"""
+        with self.assertNumQueries(3):
+            top = get_top_active_entities(organization=self.organization)
+            top = {key: list(value) for key, value in top.items()}
+
+        self.assertEqual(len(top['leads']), 4)
+        self.assertTrue(all(row['lead__name'].startswith('Lead ') for row in top['leads']))
+        own_leads = set(
+            InteractionLog.objects.filter(organization=self.organization, lead__isnull=False)
+            .values_list('lead_id', flat=True)
+        )
+        self.assertTrue({row['lead__id'] for row in top['leads']} <= own_leads)
+
+    def test_feed_is_one_query_including_contact_accounts(self):
+        """Test that contact-based activities do not fetch their account one by one"""
+        for contact in Contact.objects.filter(organization=self.organization).select_related('account'):
+            InteractionLog.objects.create(
+                user=self.rep, contact=contact, type='email', summary=f'Emailed {contact.name}',
+                organization=self.organization
+            )
+
+        with self.assertNumQueries(1):
+            feed = get_dashboard_activity_feed(user=self.rep, limit=50, organization=self.organization)
+
+        contact_cards = [activity for activity in feed if activity['entity']['type'] == 'contact']
+        self.assertEqual(len(contact_cards), 4)
+        self.assertTrue(all(card['entity']['subtitle'].startswith('Account ') for card in contact_cards))
+        self.assertEqual(feed[0]['user'], {'id': self.rep.id, 'name': 'rep@example.com', 'email': 'rep@example.com'})
+        self.assertEqual(feed[0]['type_display'], 'Email')
+
+    def test_endpoint_returns_feed_summary_and_top_entities(self):
+        """Test that the endpoint is scoped to the caller's organization"""
+        self.client.force_authenticate(user=self.manager)
+
+        response = self.client.get('/api/v1/dashboard/activity/', {'days': 30, 'limit': 5})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), {
+            'activities', 'summary', 'top_entities', 'pipeline', 'leads_by_status', 'overdue_tasks', 'filters'
+        })
+        self.assertEqual(len(response.data['activities']), 5)
+        self.assertEqual(
+            response.data['summary']['total_activities'],
+            InteractionLog.objects.filter(organization=self.organization).count()
+        )
+        self.assertEqual(response.data['filters'], {'days': 30, 'limit': 5, 'user': None})
+
+    def test_user_filter_is_limited_to_managers_and_the_organization(self):
+        """Test that only admins and managers can filter by another user of their organization"""
+        self.client.force_authenticate(user=self.manager)
+        response = self.client.get('/api/v1/dashboard/activity/', {'user': self.rep.id})
+        self.assertEqual(response.data['summary']['total_activities'], 1)
+        self.assertEqual(self.client.get('/api/v1/dashboard/activity/', {'user': self.outsider.id}).status_code, 404)
+        self.assertEqual(self.client.get('/api/v1/dashboard/activity/', {'user': 'nobody'}).status_code, 404)
+
+        self.client.force_authenticate(user=self.rep)
+        response = self.client.get('/api/v1/dashboard/activity/', {'user': 'me'})
+        self.assertEqual(response.data['filters']['user'], self.rep.id)
+        self.assertEqual([activity['summary'] for activity in response.data['activities']], ['Intro call'])
+        response = self.client.get('/api/v1/dashboard/activity/', {'user': self.manager.id})
+        self.assertIsNone(response.data['filters']['user'])
+
+    def test_invalid_days_and_limit_are_clamped(self):
+        """Test that out-of-range parameters fall back to sane bounds"""
+        self.client.force_authenticate(user=self.manager)
+
+        response = self.client.get('/api/v1/dashboard/activity/', {'days': 'abc', 'limit': 10000})
+
+        self.assertEqual(response.data['filters'], {'days': 7, 'limit': 100, 'user': None})
+
+    def test_benchmark_command_reports_both_strategies(self):
+        """Test that the feed benchmark formats every seeded activity with one query"""
+        out = StringIO()
+
+        call_command('benchmark_activity_feed', activities=30, repeat=1, stdout=out)
+
+        self.assertIn('model instances: 30 rows', out.getvalue())
+        self.assertRegex(out.getvalue(), r'flat values\(\): 30 rows in .* 1 queries\)')
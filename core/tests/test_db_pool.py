@@ -0,0 +1,68 @@
+"""
+Test the database connection pool statistics
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from psycopg_pool import ConnectionPool, PoolTimeout
+from rest_framework.test import APITestCase
+
+from core import db_pool
+from core.db_pool import pool_stats
+from core.models import Organization
+
+User = get_user_model()
+
+
+class DatabasePoolTestCase(APITestCase):
+    def setUp(self):
+        organization = Organization.objects.create(name='Pool Org')
+        self.admin = User.objects.create_user(
+            username='pool-admin@example.com',
+            email='pool-admin@example.com',
+            password='testpassword123',
+            role='admin',
+            organization=organization
+        )
+        params = connection.get_connection_params()
+        for key in ('cursor_factory', 'context'):
+            params.pop(key, None)
+        self.pool = ConnectionPool(
+            kwargs=params, min_size=1, max_size=2, timeout=1,
+            check=ConnectionPool.check_connection, open=True
+        )
+        self.addCleanup(self.pool.close)
+        self.pool.wait()
+
+    def test_stats_report_saturation_and_waits(self):
+        """Test that checked-out connections show up as saturation and timeouts as errors"""
+        with mock.patch.object(db_pool, 'get_pool', return_value=self.pool):
+            with self.pool.connection(), self.pool.connection():
+                stats = pool_stats()
+                with self.assertRaises(PoolTimeout):
+                    self.pool.getconn(timeout=0.05)
+            after = pool_stats()
+
+        self.assertEqual(stats['in_use'], 2)
+        self.assertEqual(stats['saturation'], 1.0)
+        self.assertEqual(after['in_use'], 0)
+        self.assertEqual(after['requests'], 3)
+        self.assertEqual(after['timeouts'], 1)
+        self.assertGreater(after['mean_wait_ms'], 0)
+
+    def test_endpoint_is_for_admins_and_reports_disabled_pools(self):
+        """Test that the stats endpoint needs an admin and says when pooling is off"""
+        self.client.force_authenticate(user=self.admin)
+        with mock.patch.object(db_pool, 'get_pool', return_value=None):
+            response = self.client.get('/api/v1/dashboard/pool-stats/')
+        self.assertEqual(response.json(), {'enabled': False})
+
+        with mock.patch.object(db_pool, 'get_pool', return_value=self.pool):
+            response = self.client.get('/api/v1/dashboard/pool-stats/')
+        self.assertTrue(response.json()['enabled'])
+        self.assertEqual(response.json()['max_size'], 2)
+
+        self.admin.role = 'sales_rep'
+        self.admin.save()
+        self.assertEqual(self.client.get('/api/v1/dashboard/pool-stats/').status_code, 403)
@@ -0,0 +1,204 @@
+"""
+Test primary/replica routing against the ``replica`` alias of the dev settings
+"""
+import math
+import tempfile
+import time
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core import db_routing
+from core.db_routing import (
+    PRIMARY_PIN_COOKIE,
+    ROUTING_CACHE_ALIAS,
+    ReplicaRoutingMiddleware,
+    get_replica_lag,
+)
+from core.models import Lead, Organization
+from core.response_cache import RESPONSE_CACHE_ALIAS
+from core.utils import get_lead_status_counts
+
+User = get_user_model()
+
+
+def fresh_lag(lag=0.0):
+    """Pretend the replica's lag was just measured."""
+    return mock.patch.dict(db_routing._replica_lag, {'replica': (time.monotonic(), lag)}, clear=True)
+
+
+# app/settings/dev.py defines the alias unless real replicas are configured
+HAS_REPLICA_ALIAS = 'replica' in settings.DATABASES
+needs_replica_alias = skipUnless(HAS_REPLICA_ALIAS, 'needs the dev settings\' replica alias')
+# Checks run against every alias a test class names, skipped or not
+TEST_DATABASES = {'default', 'replica'} if HAS_REPLICA_ALIAS else {'default'}
+
+
+class SharedRoutingCacheMixin:
+    """Keep the routing cache on disk, a store shared between processes like the Redis replicas require."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        directory = cls.enterClassContext(tempfile.TemporaryDirectory())
+        cls.enterClassContext(override_settings(CACHES={
+            **settings.CACHES,
+            ROUTING_CACHE_ALIAS: {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory},
+        }))
+
+
+@needs_replica_alias
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTestCase(SharedRoutingCacheMixin, TestCase):
+    databases = TEST_DATABASES
+
+    def setUp(self):
+        self.organization = Organization.objects.create(name='Routing Org')
+        patcher = fresh_lag()
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        caches[ROUTING_CACHE_ALIAS].clear()
+
+    def route(self, method, cookies=None, write=False):
+        """Run a request through the middleware, returning the read alias before and after ``write``."""
+        seen = []
+
+        def view(request):
+            seen.append(Lead.objects.all().db)
+            if write:
+                Organization.objects.filter(pk=self.organization.pk).update(name='Renamed')
+                seen.append(Lead.objects.all().db)
+            return HttpResponse()
+
+        request = getattr(RequestFactory(), method)('/api/v1/leads/')
+        request.COOKIES.update(cookies or {})
+        response = ReplicaRoutingMiddleware(view)(request)
+        return seen, response
+
+    def test_safe_requests_read_from_the_replica_until_they_write(self):
+        """Test that GETs use the replica, and the primary from their first write on"""
+        self.assertEqual(self.route('get')[0], ['replica'])
+        self.assertEqual(self.route('post')[0], ['default'])
+
+        seen, response = self.route('get', write=True)
+        self.assertEqual(seen, ['replica', 'default'])
+        self.assertEqual(response.cookies[PRIMARY_PIN_COOKIE]['max-age'], 5)
+
+        # The writer's next requests stay on the primary while the pin lasts
+        self.assertEqual(self.route('get', cookies={PRIMARY_PIN_COOKIE: '1'})[0], ['default'])
+        self.assertNotIn(PRIMARY_PIN_COOKIE, self.route('get')[1].cookies)
+
+    def test_writers_stay_pinned_without_cookies(self):
+        """Test that a cross-origin client, which drops the pin cookie, still reads its write back"""
+        writer, other = (
+            User.objects.create_user(username=f'{name}@example.com', email=f'{name}@example.com',
+                                     organization=self.organization)
+            for name in ('writer', 'other')
+        )
+        client = APIClient()
+        client.force_authenticate(user=writer)
+        response = client.post('/api/v1/leads/', {'name': 'Pinned', 'email': 'pinned@example.com'})
+        self.assertEqual(response.status_code, 201)
+        client.cookies.clear()
+
+        with CaptureQueriesContext(connections['replica']) as replica_queries:
+            self.assertEqual(client.get('/api/v1/leads/').status_code, 200)
+        self.assertFalse(any('"core_lead"' in query['sql'] for query in replica_queries))
+
+        client.force_authenticate(user=other)
+        with CaptureQueriesContext(connections['replica']) as replica_queries:
+            self.assertEqual(client.get('/api/v1/leads/').status_code, 200)
+        self.assertTrue(any('"core_lead"' in query['sql'] for query in replica_queries))
+
+    def test_replicas_refuse_a_per_process_routing_cache(self):
+        """Test that pins and written markers kept in one worker's memory are rejected"""
+        caches_setting = {
+            **settings.CACHES,
+            ROUTING_CACHE_ALIAS: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        }
+        with override_settings(CACHES=caches_setting), self.assertRaises(ImproperlyConfigured):
+            ReplicaRoutingMiddleware(HttpResponse)
+
+    def test_report_helpers_read_from_the_replica_outside_requests(self):
+        """Test that reads_from_replica helpers query the replica while plain queries stay on the primary"""
+        leads = Lead.objects.filter(organization=self.organization)
+        with CaptureQueriesContext(connections['replica']) as replica_queries:
+            get_lead_status_counts(leads)
+        self.assertEqual(len(replica_queries), 1)
+        self.assertEqual(leads.db, 'default')
+
+    def test_lagging_or_unreachable_replicas_are_skipped(self):
+        """Test the lag guard and that lag is measured once per check interval"""
+        with fresh_lag(30.0):
+            self.assertEqual(self.route('get')[0], ['default'])
+        with fresh_lag(math.inf):
+            self.assertEqual(self.route('get')[0], ['default'])
+
+        db_routing._replica_lag.clear()
+        with mock.patch.object(db_routing, 'measure_replica_lag', return_value=0.5) as measure:
+            get_replica_lag('replica')
+            get_replica_lag('replica')
+        self.assertEqual(measure.call_count, 1)
+        self.assertEqual(self.route('get')[0], ['replica'])
+
+    @override_settings(RESPONSE_CACHE_ENABLED=True)
+    def test_cache_fills_right_after_a_write_read_the_primary(self):
+        """Test that cached pages and aggregates are not rebuilt from a replica that may lag"""
+        user = User.objects.create_user(
+            username='fill@example.com', email='fill@example.com', organization=self.organization
+        )
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        def replica_sql(path):
+            with CaptureQueriesContext(connections['replica']) as replica_queries:
+                self.assertEqual(client.get(path).status_code, 200)
+            return [query['sql'] for query in replica_queries]
+
+        # Long after the last write, aggregates and pages come from the replica
+        caches[RESPONSE_CACHE_ALIAS].clear()
+        caches[ROUTING_CACHE_ALIAS].clear()
+        self.assertEqual(len(replica_sql('/api/v1/dashboard/activity/')), 8)
+        self.assertTrue(any('"__count"' in sql for sql in replica_sql('/api/v1/leads/')))
+
+        Lead.objects.create(name='Fresh', email='fresh@example.com', organization=self.organization)
+
+        # Only the uncached activity feed still does; the rest is refilled from the primary
+        self.assertEqual(len(replica_sql('/api/v1/dashboard/activity/')), 1)
+        self.assertFalse(any('"__count"' in sql for sql in replica_sql('/api/v1/leads/')))
+
+
+@needs_replica_alias
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaConnectionTestCase(SharedRoutingCacheMixin, TransactionTestCase):
+    databases = TEST_DATABASES
+
+    def test_reads_use_the_replica_connection(self):
+        """Test a committed write read back through a second connection, as a replica would serve it"""
+        organization = Organization.objects.create(name='Replica Org')
+        user = User.objects.create_user(
+            username='replica@example.com', email='replica@example.com', organization=organization
+        )
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        with fresh_lag(), CaptureQueriesContext(connections['replica']) as replica_queries:
+            response = client.post('/api/v1/leads/', {'name': 'Written', 'email': 'written@example.com'})
+            self.assertEqual(response.status_code, 201)
+            self.assertIn(PRIMARY_PIN_COOKIE, response.cookies)
+            self.assertEqual(len(replica_queries), 0)
+
+            # Once the pin expires
+            client.cookies.pop(PRIMARY_PIN_COOKIE)
+            caches[ROUTING_CACHE_ALIAS].clear()
+            response = client.get('/api/v1/leads/export/?file_format=jsonl')
+            self.assertIn(b'"Written"', b''.join(response.streaming_content))
+        self.assertTrue(any('"core_lead"' in query['sql'] for query in replica_queries))
@@ -0,0 +1,147 @@
+"""
+Test serializer-driven eager loading for the tenant viewsets
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.eager_loading import get_eager_loading_plan
+from core.models import (
+    Account,
+    Contact,
+    Opportunity,
+    Organization,
+    Product,
+    Quote,
+    QuoteLineItem,
+)
+from core.serializers import (
+    InteractionLogSerializer,
+    OpportunitySerializer,
+    QuoteSerializer,
+)
+
+User = get_user_model()
+
+
+class EagerLoadingPlanTestCase(TestCase):
+    def test_dotted_sources_become_select_related(self):
+        """Test that dotted sources are joined, pk-only relations are not"""
+        select, prefetch = get_eager_loading_plan(OpportunitySerializer)
+
+        self.assertEqual(select, ('account', 'contact', 'owner'))
+        self.assertEqual(prefetch, ())
+
+    def test_nested_many_serializer_becomes_prefetch(self):
+        """Test that nested list serializers are prefetched with their own joins"""
+        select, prefetch = get_eager_loading_plan(QuoteSerializer)
+
+        self.assertEqual(select, ('created_by', 'opportunity'))
+        self.assertEqual(len(prefetch), 1)
+        lookup, model, nested_plan = prefetch[0]
+        self.assertEqual(lookup, 'line_items')
+        self.assertIs(model, QuoteLineItem)
+        self.assertEqual(nested_plan, (('product',), ()))
+
+    def test_interaction_log_plan(self):
+        """Test that every *_name field on interaction logs is covered"""
+        select, _ = get_eager_loading_plan(InteractionLogSerializer)
+
+        self.assertEqual(select, ('contact', 'lead', 'opportunity', 'user'))
+
+
+class EagerLoadingQueryCountTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.organization = Organization.objects.create(name='Eager Org')
+        self.user = User.objects.create_user(
+            username='eager@example.com',
+            email='eager@example.com',
+            password='testpassword123',
+            first_name='Eager',
+            last_name='Loader',
+            organization=self.organization
+        )
+        self.account = Account.objects.create(name='Acme', organization=self.organization)
+        self.product = Product.objects.create(
+            name='Widget', price=Decimal('10.00'), organization=self.organization
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _add_opportunities(self, count):
+        for i in range(count):
+            contact = Contact.objects.create(
+                name=f'Contact {i}',
+                email=f'contact{i}@example.com',
+                account=self.account,
+                organization=self.organization
+            )
+            Opportunity.objects.create(
+                name=f'Deal {i}',
+                account=self.account,
+                contact=contact,
+                amount=Decimal('1000.00'),
+                owner=self.user,
+                organization=self.organization
+            )
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_interaction_list_is_constant(self):
+        """Test that the interaction feed does not grow with page size"""
+        self._add_opportunities(2)
+        small = self._count_queries('/api/v1/interactions/')
+
+        self._add_opportunities(10)
+        large = self._count_queries('/api/v1/interactions/')
+
+        self.assertEqual(small, large)
+
+    def test_account_opportunities_action_is_constant(self):
+        """Test that the account opportunities action joins its relations"""
+        url = f'/api/v1/accounts/{self.account.id}/opportunities/'
+        self._add_opportunities(2)
+        small = self._count_queries(url)
+
+        self._add_opportunities(10)
+        large = self._count_queries(url)
+
+        self.assertEqual(small, large)
+
+    def test_opportunity_quotes_action_prefetches_line_items(self):
+        """Test that quotes with line items cost the same regardless of volume"""
+        self._add_opportunities(1)
+        opportunity = Opportunity.objects.get()
+        url = f'/api/v1/opportunities/{opportunity.id}/quotes/'
+
+        def add_quote():
+            quote = Quote.objects.create(
+                opportunity=opportunity,
+                title='Quote',
+                created_by=self.user,
+                organization=self.organization
+            )
+            for _ in range(3):
+                QuoteLineItem.objects.create(
+                    quote=quote,
+                    product=self.product,
+                    unit_price=Decimal('10.00'),
+                    organization=self.organization
+                )
+
+        add_quote()
+        small = self._count_queries(url)
+
+        for _ in range(5):
+            add_quote()
+        large = self._count_queries(url)
+
+        self.assertEqual(small, large)
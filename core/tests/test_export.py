@@ -0,0 +1,105 @@
+"""
+Test the streaming CSV/JSONL export actions
+"""
+import csv
+import io
+import json
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.models import Lead, Organization, Product, Quote, QuoteLineItem
+from core.tests.utils import seed_organization
+from core.views import QuoteViewSet
+
+User = get_user_model()
+
+
+class ExportTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.organization = Organization.objects.create(name='Export Org')
+        self.user = User.objects.create_user(
+            username='exporter@example.com',
+            email='exporter@example.com',
+            password='testpassword123',
+            organization=self.organization
+        )
+        self.client.force_authenticate(user=self.user)
+
+        seed_organization(self.organization, self.user, 12)
+        other_organization = Organization.objects.create(name='Other Export Org')
+        other_user = User.objects.create_user(
+            username='other-exporter@example.com',
+            email='other-exporter@example.com',
+            password='testpassword123',
+            organization=other_organization
+        )
+        seed_organization(other_organization, other_user, 3)
+
+    def _export(self, resource, **params):
+        response = self.client.get(f'/api/v1/{resource}/export/', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv_export_streams_every_row_of_the_organization(self):
+        """Test that the CSV export has the list fields and all of the tenant's rows"""
+        response, content = self._export('leads')
+
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment; filename="lead-export.csv"', response['Content-Disposition'])
+        self.assertEqual(len(rows), 12)
+        self.assertEqual(
+            {int(row['id']) for row in rows},
+            set(Lead.objects.filter(organization=self.organization).values_list('id', flat=True))
+        )
+        self.assertEqual(rows[0]['assigned_to_name'], self.user.get_full_name())
+
+    def test_export_applies_list_filters_and_search(self):
+        """Test that exports honour the same query parameters as the list"""
+        Lead.objects.filter(organization=self.organization, name='Lead 3').update(status='qualified')
+
+        _response, content = self._export('leads', status='qualified')
+        self.assertEqual([row['name'] for row in csv.DictReader(io.StringIO(content))], ['Lead 3'])
+
+        _response, content = self._export('leads', search='lead 7', file_format='jsonl')
+        self.assertEqual([json.loads(line)['name'] for line in content.splitlines()], ['Lead 7'])
+
+    def test_jsonl_export_keeps_nested_data(self):
+        """Test that JSONL rows carry nested serializer data"""
+        _response, content = self._export('quotes', file_format='jsonl')
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 12)
+        self.assertTrue(all(len(row['line_items']) == 2 for row in rows))
+
+    def test_rows_are_fetched_in_chunks(self):
+        """Test that prefetches run per iterator chunk instead of over the whole table"""
+        quote = Quote.objects.filter(organization=self.organization).first()
+        product = Product.objects.create(name='Extra', price=Decimal('1.00'), organization=self.organization)
+        QuoteLineItem.objects.create(
+            quote=quote, product=product, quantity=1, unit_price=Decimal('1.00'), organization=self.organization
+        )
+
+        with mock.patch.object(QuoteViewSet, 'export_chunk_size', 5):
+            with CaptureQueriesContext(connection) as context:
+                _response, content = self._export('quotes', file_format='jsonl')
+
+        line_item_queries = [
+            query for query in context.captured_queries if 'FROM "core_quotelineitem"' in query['sql']
+        ]
+        self.assertEqual(len(line_item_queries), 3)
+        self.assertEqual(sum(len(json.loads(line)['line_items']) for line in content.splitlines()), 25)
+
+    def test_unknown_format_is_rejected(self):
+        """Test that unsupported formats return 400"""
+        response = self.client.get('/api/v1/leads/export/', {'file_format': 'xlsx'})
+
+        self.assertEqual(response.status_code, 400)
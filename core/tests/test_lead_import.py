@@ -0,0 +1,234 @@
+"""
+Test the batched lead import endpoint and management command
+"""
+import io
+import json
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.lead_import import (
+    LeadImport,
+    claim_import_job,
+    iter_import_rows,
+    run_import_job,
+)
+from core.models import InteractionLog, Lead, LeadImportJob, Organization
+
+User = get_user_model()
+
+
+def csv_bytes(rows):
+    lines = ['name,email,company,status,assigned_to']
+    lines += [','.join(row) for row in rows]
+    return ('\n'.join(lines) + '\n').encode()
+
+
+class LeadImportTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.organization = Organization.objects.create(name='Import Org')
+        self.user = User.objects.create_user(
+            username='importer@example.com',
+            email='importer@example.com',
+            password='testpassword123',
+            organization=self.organization
+        )
+        self.teammate = User.objects.create_user(
+            username='teammate@example.com',
+            email='teammate@example.com',
+            password='testpassword123',
+            organization=self.organization
+        )
+        other_organization = Organization.objects.create(name='Other Import Org')
+        User.objects.create_user(
+            username='outsider@example.com',
+            email='outsider@example.com',
+            password='testpassword123',
+            organization=other_organization
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _upload(self, name, content, **data):
+        return self.client.post(
+            '/api/v1/leads/import/', {'file': SimpleUploadedFile(name, content), **data}, format='multipart'
+        )
+
+    def test_csv_import_creates_leads_logs_and_reports_errors(self):
+        """Test that valid rows are imported with creation logs and bad rows are reported by line"""
+        response = self._upload('leads.csv', csv_bytes([
+            ('Jane Doe', 'jane@acme.com', 'Acme', '', ''),
+            ('John Roe', 'not-an-email', 'Globex', '', ''),
+            ('Ann Lee', 'ann@initech.com', '', 'qualified', 'TEAMMATE@example.com'),
+            ('Bob Ray', 'bob@hooli.com', 'Hooli', '', 'outsider@example.com'),
+        ]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['processed'], 4)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(response.data['failed'], 2)
+        self.assertEqual(
+            sorted((error['line'], list(error['errors'])) for error in response.data['errors']),
+            [(3, ['email']), (5, ['assigned_to'])]
+        )
+
+        jane = Lead.objects.get(email='jane@acme.com')
+        ann = Lead.objects.get(email='ann@initech.com')
+        self.assertEqual((jane.organization, jane.assigned_to, jane.status), (self.organization, self.user, 'new'))
+        self.assertEqual((ann.assigned_to, ann.status), (self.teammate, 'qualified'))
+        self.assertEqual(
+            sorted(InteractionLog.objects.filter(lead__in=[jane, ann]).values_list('summary', flat=True)),
+            ['New lead created: Ann Lee from Unknown Company', 'New lead created: Jane Doe from Acme']
+        )
+
+    def test_jsonl_import_reports_malformed_lines(self):
+        """Test that JSONL uploads are parsed line by line"""
+        content = '\n'.join([
+            json.dumps({'name': 'Jane Doe', 'email': 'jane@acme.com', 'phone': '555-0100'}),
+            '{not json',
+            '',
+            json.dumps(['not', 'an', 'object']),
+        ]).encode()
+
+        response = self._upload('leads.jsonl', content)
+
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([error['line'] for error in response.data['errors']], [2, 4])
+        self.assertEqual(Lead.objects.get(email='jane@acme.com').phone, '555-0100')
+
+    def test_missing_file_and_unknown_format_are_rejected(self):
+        """Test that the endpoint validates its input"""
+        self.assertEqual(self.client.post('/api/v1/leads/import/', {}, format='multipart').status_code, 400)
+        self.assertEqual(self._upload('leads.csv', b'name\n', file_format='xlsx').status_code, 400)
+
+    def test_assignees_match_emails_case_insensitively(self):
+        """Test that assigned_to finds users whose stored email has capitals"""
+        self.teammate.email = 'Teammate@Example.com'
+        self.teammate.save()
+
+        response = self._upload('leads.csv', csv_bytes([('Ann Lee', 'ann@initech.com', '', '', 'teammate@EXAMPLE.com')]))
+
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(Lead.objects.get(email='ann@initech.com').assigned_to, self.teammate)
+
+    def test_unreadable_files_are_rejected_with_their_line(self):
+        """Test that bad encoding and malformed CSV return 400 naming the line, after earlier batches"""
+        content = csv_bytes([('Jane Doe', 'jane@acme.com', 'Acme', '', '')]) + b'Caf\xe9,cafe@example.com,,,\n'
+        response = self._upload('leads.csv', content)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual((response.data['line'], response.data['error']), (3, 'File is not valid UTF-8'))
+        self.assertEqual(response.data['created'], 1)
+
+        content = csv_bytes([('Huge', 'x' * 200000, '', '', '')])
+        response = self._upload('leads.csv', content)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['line'], 2)
+        self.assertIn('Invalid CSV', response.data['error'])
+
+    def test_large_uploads_are_queued_and_imported_by_the_command(self):
+        """Test that uploads over the limit return a job that run_lead_imports completes"""
+        content = csv_bytes([(f'Lead {i}', f'lead{i}@example.com', '', '', '') for i in range(30)])
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            LEAD_IMPORT_SYNC_MAX_BYTES=100, LEAD_IMPORT_UPLOAD_DIR=directory
+        ):
+            response = self._upload('leads.csv', content)
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(response.data['status'], 'pending')
+            self.assertFalse(Lead.objects.filter(organization=self.organization).exists())
+            job = LeadImportJob.objects.get(pk=response.data['id'])
+            self.assertEqual(Path(job.path).read_bytes(), content)
+
+            out = io.StringIO()
+            call_command('run_lead_imports', stdout=out)
+            self.assertIn(f'Job {job.pk}: imported 30 of 30 rows into Import Org', out.getvalue())
+            self.assertFalse(Path(job.path).exists())
+
+        response = self.client.get(f'/api/v1/lead-imports/{job.pk}/')
+        self.assertEqual(response.data['status'], 'done')
+        self.assertEqual(response.data['result']['created'], 30)
+        self.assertEqual(Lead.objects.filter(organization=self.organization).count(), 30)
+
+        self.client.force_authenticate(user=self.teammate)
+        self.assertEqual(self.client.get(f'/api/v1/lead-imports/{job.pk}/').status_code, 404)
+
+    def test_jobs_that_cannot_run_fail_instead_of_staying_running(self):
+        """Test that an unexpected error, such as an upload missing on the runner, fails the job"""
+        job = LeadImportJob.objects.create(
+            organization=self.organization, user=self.user, file_format='csv', path='/nonexistent/leads.csv'
+        )
+        self.assertEqual(claim_import_job(), job)
+
+        with self.assertLogs('core.lead_import', 'ERROR'):
+            out = io.StringIO()
+            call_command('run_lead_imports', stdout=out)
+            # Claimed above; the command picks it up again once it stalls
+            self.assertIn('0 import jobs processed', out.getvalue())
+            run_import_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(job.result['error'], 'The import failed unexpectedly')
+        self.assertIsNotNone(job.finished_at)
+
+    def test_stalled_jobs_are_claimed_again_and_resume(self):
+        """Test that a running job without progress is reclaimed and skips the rows it already imported"""
+        content = csv_bytes([(f'Lead {i}', f'lead{i}@example.com', '', '', '') for i in range(3)])
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'leads.csv'
+            path.write_bytes(content)
+            # Its runner died after committing the first two rows
+            job = LeadImportJob.objects.create(
+                organization=self.organization, user=self.user, file_format='csv', path=str(path),
+                status='running', heartbeat_at=timezone.now(),
+                result={'processed': 2, 'created': 2, 'failed': 0, 'errors': []},
+            )
+            self.assertIsNone(claim_import_job())
+
+            LeadImportJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+            out = io.StringIO()
+            call_command('run_lead_imports', stdout=out)
+
+        self.assertIn(f'Job {job.pk}: imported 3 of 3 rows into Import Org', out.getvalue())
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(
+            list(Lead.objects.filter(organization=self.organization).values_list('email', flat=True)),
+            ['lead2@example.com'],
+        )
+
+    def test_queries_scale_with_batches_not_rows(self):
+        """Test that a batch costs the same number of queries regardless of its size"""
+        def run(count, start):
+            content = csv_bytes([(f'Lead {i}', f'lead{i}@example.com', 'Acme', '', '') for i in range(start, start + count)])
+            with CaptureQueriesContext(connection) as context:
+                result = LeadImport(self.organization, self.user).run(iter_import_rows(io.BytesIO(content), 'csv'))
+            self.assertEqual(result['created'], count)
+            return len(context.captured_queries)
+
+        self.assertEqual(run(5, 0), run(200, 5))
+
+    def test_management_command_imports_in_batches_with_progress(self):
+        """Test that the command reports progress per batch and a summary"""
+        content = csv_bytes([(f'Lead {i}', f'lead{i}@example.com', '', '', '') for i in range(25)])
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'leads.csv'
+            path.write_bytes(content)
+            out = io.StringIO()
+            call_command(
+                'import_leads', str(path), self.organization.name,
+                user_email=self.user.email, batch_size=10, stdout=out
+            )
+
+        output = out.getvalue()
+        self.assertEqual(output.count('Processed'), 3)
+        self.assertIn('Imported 25 of 25 rows into Import Org (0 failed)', output)
+        self.assertEqual(Lead.objects.filter(organization=self.organization).count(), 25)
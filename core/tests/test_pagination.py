@@ -0,0 +1,142 @@
+"""
+Test keyset pagination on the append-heavy lists
+"""
+import base64
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import InteractionLog, Lead, Organization
+
+User = get_user_model()
+
+
+def make_cursor(position):
+    return base64.urlsafe_b64encode(json.dumps({'p': position}).encode()).decode()
+
+
+class KeysetPaginationTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.organization = Organization.objects.create(name='Cursor Org')
+        self.user = User.objects.create_user(
+            username='cursor@example.com',
+            email='cursor@example.com',
+            password='testpassword123',
+            organization=self.organization
+        )
+        self.client.force_authenticate(user=self.user)
+
+        InteractionLog.objects.bulk_create([
+            InteractionLog(user=self.user, type='note', summary=f'Note {i}', organization=self.organization)
+            for i in range(25)
+        ])
+        # Give groups of rows identical timestamps so pages must break ties on id
+        now = timezone.now()
+        for index, pk in enumerate(InteractionLog.objects.order_by('id').values_list('pk', flat=True)):
+            InteractionLog.objects.filter(pk=pk).update(timestamp=now - timedelta(minutes=index // 4))
+        self.expected = list(InteractionLog.objects.order_by('-timestamp', '-id').values_list('pk', flat=True))
+
+    def _walk(self, url, params=None):
+        """Follow ``next`` links from ``url`` and return ``(ids, responses)``."""
+        ids, responses = [], []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            responses.append(response)
+            ids.extend(row['id'] for row in response.data['results'])
+            if not response.data['next']:
+                return ids, responses
+            response = self.client.get(response.data['next'])
+
+    def test_page_number_format_is_unchanged_by_default(self):
+        """Test that clients that don't opt in still get page-number pages"""
+        response = self.client.get('/api/v1/interactions/')
+
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_cursor_pages_cover_every_row_once_in_order(self):
+        """Test that following next links visits every row once, ties included"""
+        ids, responses = self._walk('/api/v1/interactions/', {'pagination': 'cursor'})
+
+        self.assertEqual(ids, self.expected)
+        self.assertEqual(len(responses), 3)
+        self.assertNotIn('count', responses[0].data)
+        self.assertIsNone(responses[0].data['previous'])
+
+    def test_previous_link_returns_the_previous_page(self):
+        """Test that previous links walk back to the same pages"""
+        _ids, responses = self._walk('/api/v1/interactions/', {'pagination': 'cursor'})
+
+        back = self.client.get(responses[2].data['previous'])
+        self.assertEqual(
+            [row['id'] for row in back.data['results']],
+            [row['id'] for row in responses[1].data['results']]
+        )
+        first = self.client.get(back.data['previous'])
+        self.assertEqual([row['id'] for row in first.data['results']], self.expected[:10])
+        self.assertIsNone(first.data['previous'])
+
+    def test_deep_pages_skip_count_and_offset(self):
+        """Test that a deep cursor page runs the same queries as page one, without COUNT or OFFSET"""
+        _ids, responses = self._walk('/api/v1/interactions/', {'pagination': 'cursor'})
+
+        counts = []
+        for url in ('/api/v1/interactions/?pagination=cursor', responses[-2].data['next']):
+            # Re-fetch the user so the organization lookup is counted every time
+            self.client.force_authenticate(user=User.objects.get(pk=self.user.pk))
+            with CaptureQueriesContext(connection) as context:
+                self.client.get(url)
+            sql = '\n'.join(query['sql'] for query in context.captured_queries)
+            self.assertNotIn('COUNT(', sql)
+            self.assertNotIn('OFFSET', sql)
+            counts.append(len(context.captured_queries))
+
+        self.assertEqual(counts[0], counts[1])
+
+    def test_cursor_respects_filters(self):
+        """Test that cursor mode keeps the view's filters"""
+        lead = Lead.objects.create(name='Jane', email='jane@example.com', organization=self.organization)
+        InteractionLog.objects.bulk_create([
+            InteractionLog(user=self.user, lead=lead, type='call', summary=f'Call {i}', organization=self.organization)
+            for i in range(12)
+        ])
+        ids, _responses = self._walk('/api/v1/interactions/', {'pagination': 'cursor', 'lead': lead.id})
+
+        self.assertEqual(ids, list(
+            InteractionLog.objects.filter(lead=lead).order_by('-timestamp', '-id').values_list('pk', flat=True)
+        ))
+
+    def test_invalid_cursor_is_rejected(self):
+        """Test that a malformed cursor returns 404 instead of an error"""
+        response = self.client.get('/api/v1/interactions/', {'pagination': 'cursor', 'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_values_must_match_the_ordering_types(self):
+        """Test that forged cursor values of the wrong type return 404 instead of a database error"""
+        now = timezone.now().isoformat()
+        for position in (
+            ['yesterday', 1],
+            ['2020-01-01T00:00:00', 1],
+            ['2020-13-45T00:00:00+00:00', 1],
+            [None, 1],
+            [now, 'abc'],
+            [now, True],
+            [now, 1.5],
+        ):
+            with self.subTest(position=position):
+                response = self.client.get(
+                    '/api/v1/interactions/', {'pagination': 'cursor', 'cursor': make_cursor(position)}
+                )
+                self.assertEqual(response.status_code, 404)
+
+        response = self.client.get('/api/v1/interactions/', {'pagination': 'cursor', 'cursor': make_cursor([now, 1])})
+        self.assertEqual(response.status_code, 200)
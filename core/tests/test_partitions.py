@@ -0,0 +1,101 @@
+"""
+Test the monthly InteractionLog partitions and their maintenance command
+"""
+import json
+from datetime import UTC, date, datetime
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from core.management.commands.check_query_plans import iter_plan_nodes
+from core.models import InteractionLog, Organization
+from core.partitions import (
+    DEFAULT_PARTITION,
+    add_months,
+    get_partitions,
+    maintain_partitions,
+    month_start,
+    partition_name,
+    partition_names,
+)
+from core.search import build_search_query
+from core.utils import _recent_activity_queryset
+
+User = get_user_model()
+
+OLD_TIMESTAMP = datetime(2020, 1, 15, 12, 0, tzinfo=UTC)
+
+
+def scanned_relations(queryset):
+    plan = json.loads(queryset.explain(format='json'))[0]['Plan']
+    return {node['Relation Name'] for node in iter_plan_nodes(plan) if 'Relation Name' in node}
+
+
+def stored_in(interaction):
+    """Return the partition holding ``interaction``'s row."""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT tableoid::regclass::text FROM core_interactionlog WHERE id = %s', [interaction.pk])
+        return cursor.fetchone()[0]
+
+
+class InteractionLogPartitionTestCase(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name='Partition Org')
+        self.user = User.objects.create_superuser(
+            username='partitions@example.com', email='partitions@example.com', password='pass',
+            organization=self.organization,
+        )
+        self.interaction = InteractionLog.objects.create(
+            user=self.user, type='note', summary='Kickoff notes', organization=self.organization
+        )
+
+    def test_recent_window_touches_only_its_months(self):
+        """Test that the dashboard's recent-activity window is pruned to the current (and previous) month"""
+        current = month_start(timezone.now())
+        self.assertEqual(stored_in(self.interaction), partition_name(current))
+
+        relations = scanned_relations(_recent_activity_queryset(organization=self.organization))
+        self.assertTrue(relations)
+        self.assertLessEqual(relations, {partition_name(current), partition_name(add_months(current, -1))})
+
+    def test_rows_outside_partitions_move_in_when_their_month_is_created(self):
+        """Test that old rows wait in the default partition, then move to the month created for them"""
+        InteractionLog.objects.filter(pk=self.interaction.pk).update(timestamp=OLD_TIMESTAMP)
+        self.assertEqual(stored_in(self.interaction), DEFAULT_PARTITION)
+
+        created, detached = maintain_partitions(ahead=1, today=date(2020, 1, 20))
+        self.assertEqual(created, ['core_interactionlog_p2020_01', 'core_interactionlog_p2020_02'])
+        self.assertEqual(detached, [])
+        self.assertEqual(stored_in(self.interaction), 'core_interactionlog_p2020_01')
+
+        # The ORM and the admin work unchanged across partitions
+        self.interaction.summary = 'Renamed notes'
+        self.interaction.save()
+        self.assertTrue(InteractionLog.objects.filter(pk=self.interaction.pk, search_vector=build_search_query(['renamed'])).exists())
+        self.client.force_login(self.user)
+        response = self.client.get(f'/admin/core/interactionlog/{self.interaction.pk}/change/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_command_detaches_months_past_retention(self):
+        """Test the dry run, then that old months are detached as standalone tables"""
+        InteractionLog.objects.filter(pk=self.interaction.pk).update(timestamp=OLD_TIMESTAMP)
+        maintain_partitions(ahead=0, today=OLD_TIMESTAMP)
+
+        out = StringIO()
+        call_command('interaction_partitions', retain_months=12, dry_run=True, stdout=out)
+        self.assertIn('Would detach core_interactionlog_p2020_01', out.getvalue())
+        self.assertIn('core_interactionlog_p2020_01', get_partitions().values())
+
+        call_command('interaction_partitions', retain_months=12, stdout=StringIO())
+        self.assertNotIn('core_interactionlog_p2020_01', partition_names())
+        self.assertFalse(InteractionLog.objects.filter(pk=self.interaction.pk).exists())
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM core_interactionlog_p2020_01')
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+        # The current month and those created ahead are kept
+        self.assertIn(partition_name(month_start(timezone.now())), get_partitions().values())
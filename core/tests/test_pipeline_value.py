@@ -0,0 +1,107 @@
+"""
+Test the database-side pipeline value aggregation
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Account, Opportunity, Organization
+
+User = get_user_model()
+
+
+class PipelineValueTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.organization = Organization.objects.create(name='Pipeline Org')
+        self.alice = User.objects.create_user(
+            username='alice@example.com',
+            email='alice@example.com',
+            password='testpassword123',
+            first_name='Alice',
+            last_name='Seller',
+            organization=self.organization
+        )
+        self.bob = User.objects.create_user(
+            username='bob@example.com',
+            email='bob@example.com',
+            password='testpassword123',
+            organization=self.organization
+        )
+        self.account = Account.objects.create(name='Acme', organization=self.organization)
+
+        self._create('qualification', '1000.00', self.alice, date(2025, 1, 15))
+        self._create('qualification', '500.00', self.bob, date(2025, 1, 20))
+        self._create('proposal', '2500.00', self.alice, date(2025, 2, 1))
+        self._create('negotiation', '4000.00', self.bob, None)
+        # Closed deals are not part of the pipeline
+        self._create('won', '9999.00', self.alice, date(2025, 1, 1))
+        self._create('lost', '8888.00', self.bob, date(2025, 1, 1))
+
+        # Another tenant's deals must not be counted
+        other_organization = Organization.objects.create(name='Other Pipeline Org')
+        Opportunity.objects.create(
+            name='Other deal',
+            account=Account.objects.create(name='Other', organization=other_organization),
+            amount=Decimal('123456.00'),
+            organization=other_organization
+        )
+
+        self.client.force_authenticate(user=self.alice)
+
+    def _create(self, stage, amount, owner, close_date):
+        return Opportunity.objects.create(
+            name=f'{stage} deal',
+            account=self.account,
+            amount=Decimal(amount),
+            stage=stage,
+            owner=owner,
+            close_date=close_date,
+            organization=self.organization
+        )
+
+    def test_total_and_breakdowns(self):
+        """Test that totals and breakdowns cover only open deals in the organization"""
+        response = self.client.get('/api/v1/opportunities/pipeline_value/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Decimal(response.data['total_pipeline_value']), Decimal('8000.00'))
+        self.assertEqual(response.data['total_count'], 4)
+
+        by_stage = {row['stage']: (row['count'], row['total']) for row in response.data['by_stage']}
+        self.assertEqual(by_stage, {
+            'qualification': (2, Decimal('1500.00')),
+            'proposal': (1, Decimal('2500.00')),
+            'negotiation': (1, Decimal('4000.00')),
+        })
+
+        by_owner = [(row['owner_name'], row['count'], row['total']) for row in response.data['by_owner']]
+        self.assertEqual(by_owner, [
+            ('bob@example.com', 2, Decimal('4500.00')),
+            ('Alice Seller', 2, Decimal('3500.00')),
+        ])
+
+        by_month = [(row['month'], row['count']) for row in response.data['by_close_month']]
+        self.assertEqual(by_month, [('2025-01', 2), ('2025-02', 1), (None, 1)])
+
+    def test_single_aggregate_query(self):
+        """Test that the summary is computed by one query after the organization lookup"""
+        user = User.objects.get(pk=self.alice.pk)
+        self.client.force_authenticate(user=user)
+
+        with self.assertNumQueries(2):
+            self.client.get('/api/v1/opportunities/pipeline_value/')
+
+    def test_empty_pipeline(self):
+        """Test that an organization without open deals reports zero"""
+        Opportunity.objects.filter(organization=self.organization).update(stage='won')
+
+        response = self.client.get('/api/v1/opportunities/pipeline_value/')
+
+        self.assertEqual(Decimal(response.data['total_pipeline_value']), Decimal('0'))
+        self.assertEqual(response.data['total_count'], 0)
+        self.assertEqual(response.data['by_stage'], [])
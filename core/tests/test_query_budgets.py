@@ -0,0 +1,132 @@
+"""
+Test that every API route runs a bounded, size-independent number of queries
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Organization
+from core.routers import router
+from core.tests.utils import seed_organization
+from core.typeahead import trigram_available
+
+User = get_user_model()
+
+
+def iter_get_routes():
+    """Yield ``(viewset, action_name, url_name, detail)`` for every GET route."""
+    for _prefix, viewset, basename in router.registry:
+        yield viewset, 'list', f'core:{basename}-list', False
+        yield viewset, 'retrieve', f'core:{basename}-detail', True
+        for extra_action in viewset.get_extra_actions():
+            if 'get' in extra_action.mapping:
+                yield viewset, extra_action.__name__, f'core:{basename}-{extra_action.url_name}', extra_action.detail
+
+
+# Budgets cover the database path, so cached responses are never served here
+@override_settings(CACHES={
+    **settings.CACHES,
+    'responses': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+})
+class QueryBudgetTestCase(TestCase):
+    """
+    Hits every GET route registered in ``core.routers`` with a small and a
+    larger organization and checks the SQL count against the budget declared
+    in the viewset's ``query_budgets``.
+    """
+    SMALL = 2
+    GROWTH = 10
+
+    def setUp(self):
+        self.client = APIClient()
+        self.organization = Organization.objects.create(name='Budget Org')
+        self.user = User.objects.create_user(
+            username='budget@example.com',
+            email='budget@example.com',
+            password='testpassword123',
+            first_name='Budget',
+            last_name='Keeper',
+            role='admin',
+            organization=self.organization
+        )
+
+        # Rows in another tenant must not leak into counts or results
+        other_organization = Organization.objects.create(name='Other Org')
+        other_user = User.objects.create_user(
+            username='other@example.com',
+            email='other@example.com',
+            password='testpassword123',
+            organization=other_organization
+        )
+        seed_organization(other_organization, other_user, self.SMALL)
+
+        # Typeahead probes for pg_trgm once per process; keep that out of the counts
+        trigram_available()
+
+    def _detail_pk(self, viewset):
+        model = viewset.queryset.model
+        if model is Organization:
+            return self.organization.pk
+        return model.objects.filter(organization=self.organization).order_by('pk').values_list('pk', flat=True)[0]
+
+    def _measure(self):
+        """Return ``{(viewset, action): captured_queries}`` for every GET route."""
+        results = {}
+        for viewset, action_name, url_name, detail in iter_get_routes():
+            kwargs = {'pk': self._detail_pk(viewset)} if detail else {}
+            url = reverse(url_name, kwargs=kwargs)
+
+            # Re-fetch the user so the organization lookup is counted every time
+            self.client.force_authenticate(user=User.objects.get(pk=self.user.pk))
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+                # Streamed responses only query while their content is consumed
+                if response.streaming:
+                    b''.join(response.streaming_content)
+
+            self.assertEqual(response.status_code, 200, f'GET {url} returned {response.status_code}')
+            results[(viewset, action_name)] = (url, context.captured_queries)
+        return results
+
+    def _format_queries(self, queries):
+        return '\n'.join(f'  {index}. {query["sql"]}' for index, query in enumerate(queries, 1))
+
+    def test_every_get_route_declares_a_budget(self):
+        """Test that new endpoints cannot ship without a query budget"""
+        for viewset, action_name, _url_name, _detail in iter_get_routes():
+            with self.subTest(viewset=viewset.__name__, action=action_name):
+                self.assertIn(
+                    action_name, getattr(viewset, 'query_budgets', {}),
+                    f'{viewset.__name__}.query_budgets has no entry for {action_name!r}'
+                )
+
+    def test_query_counts_are_within_budget_and_do_not_grow(self):
+        """Test that query counts stay under budget and independent of row count"""
+        # Run the on-commit hooks so cached aggregates are dropped as in production
+        with self.captureOnCommitCallbacks(execute=True):
+            seed_organization(self.organization, self.user, self.SMALL)
+        small = self._measure()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            seed_organization(self.organization, self.user, self.GROWTH, start=self.SMALL)
+        large = self._measure()
+
+        for (viewset, action_name), (url, queries) in large.items():
+            budget = getattr(viewset, 'query_budgets', {}).get(action_name)
+            small_queries = small[(viewset, action_name)][1]
+            with self.subTest(url=url):
+                self.assertEqual(
+                    len(queries), len(small_queries),
+                    f'GET {url} grew from {len(small_queries)} to {len(queries)} queries '
+                    f'after adding {self.GROWTH} rows:\n{self._format_queries(queries)}'
+                )
+                if budget is not None:
+                    self.assertLessEqual(
+                        len(queries), budget,
+                        f'GET {url} ran {len(queries)} queries, budget is {budget}:\n'
+                        f'{self._format_queries(queries)}'
+                    )
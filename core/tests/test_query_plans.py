@@ -0,0 +1,19 @@
+"""
+Test that the hot tenant queries are served by index scans
+"""
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class QueryPlanTestCase(TestCase):
+    def test_hot_queries_use_index_scans(self):
+        """Test the plan check against a seeded multi-tenant dataset"""
+        out = StringIO()
+
+        # Raises CommandError if any hot query falls back to a sequential scan
+        call_command('check_query_plans', organizations=20, rows=300, stdout=out)
+
+        self.assertNotIn('FAIL', out.getvalue())
+        self.assertIn('OK   interaction feed', out.getvalue())
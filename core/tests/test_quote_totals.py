@@ -0,0 +1,166 @@
+"""
+Test incremental quote total maintenance
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import (
+    Account,
+    Opportunity,
+    Organization,
+    Product,
+    Quote,
+    QuoteLineItem,
+)
+
+User = get_user_model()
+
+
+class QuoteTotalTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.organization = Organization.objects.create(name='Quote Org')
+        self.user = User.objects.create_user(
+            username='quoter@example.com',
+            email='quoter@example.com',
+            password='testpassword123',
+            organization=self.organization
+        )
+        account = Account.objects.create(name='Acme', organization=self.organization)
+        self.opportunity = Opportunity.objects.create(
+            name='Deal',
+            account=account,
+            amount=Decimal('1000.00'),
+            owner=self.user,
+            organization=self.organization
+        )
+        self.product = Product.objects.create(
+            name='Widget', price=Decimal('10.00'), organization=self.organization
+        )
+        self.quote = self._create_quote('Quote A')
+        self.client.force_authenticate(user=self.user)
+
+    def _create_quote(self, title):
+        return Quote.objects.create(
+            opportunity=self.opportunity,
+            title=title,
+            created_by=self.user,
+            organization=self.organization
+        )
+
+    def _total(self, quote):
+        return Quote.objects.values_list('total_price', flat=True).get(pk=quote.pk)
+
+    def _create_item(self, quote, quantity, unit_price):
+        response = self.client.post('/api/v1/quote-line-items/', {
+            'quote': quote.pk,
+            'product': self.product.pk,
+            'quantity': quantity,
+            'unit_price': unit_price,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['id']
+
+    def test_add_line_item_action_applies_delta(self):
+        """Test that add_line_item adds the item amount without reading other items"""
+        QuoteLineItem.objects.bulk_create([
+            QuoteLineItem(quote=self.quote, product=self.product, quantity=1,
+                          unit_price=Decimal('1.00'), organization=self.organization)
+            for _ in range(50)
+        ])
+        Quote.objects.filter(pk=self.quote.pk).update(total_price=Decimal('50.00'))
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                f'/api/v1/quotes/{self.quote.pk}/add_line_item/',
+                {'product_id': self.product.pk, 'quantity': '3'},
+                format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._total(self.quote), Decimal('80.00'))
+        line_item_reads = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT') and 'core_quotelineitem' in query['sql']
+        ]
+        self.assertEqual(line_item_reads, [])
+
+    def test_add_line_item_rejects_non_numeric_quantity(self):
+        """Test that a bad quantity is a 400 and leaves the total untouched"""
+        response = self.client.post(
+            f'/api/v1/quotes/{self.quote.pk}/add_line_item/',
+            {'product_id': self.product.pk, 'quantity': 'many'},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._total(self.quote), Decimal('0.00'))
+
+    def test_create_update_delete_line_items(self):
+        """Test that each line-item write moves the total by its own delta"""
+        first = self._create_item(self.quote, 2, '10.00')
+        self._create_item(self.quote, 1, '5.50')
+        self.assertEqual(self._total(self.quote), Decimal('25.50'))
+
+        response = self.client.patch(f'/api/v1/quote-line-items/{first}/', {'quantity': 5}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._total(self.quote), Decimal('55.50'))
+
+        response = self.client.delete(f'/api/v1/quote-line-items/{first}/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self._total(self.quote), Decimal('5.50'))
+
+    def test_moving_line_item_between_quotes(self):
+        """Test that reassigning an item moves its amount to the other quote"""
+        other_quote = self._create_quote('Quote B')
+        item = self._create_item(self.quote, 3, '10.00')
+
+        response = self.client.patch(
+            f'/api/v1/quote-line-items/{item}/', {'quote': other_quote.pk}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._total(self.quote), Decimal('0.00'))
+        self.assertEqual(self._total(other_quote), Decimal('30.00'))
+
+    def test_total_price_is_read_only(self):
+        """Test that clients cannot overwrite the derived total"""
+        self._create_item(self.quote, 1, '10.00')
+
+        self.client.patch(f'/api/v1/quotes/{self.quote.pk}/', {'total_price': '999.00'}, format='json')
+
+        self.assertEqual(self._total(self.quote), Decimal('10.00'))
+
+    def test_saving_a_loaded_quote_keeps_concurrent_totals(self):
+        """Test that a quote edit does not write back the total it loaded"""
+        stale = Quote.objects.get(pk=self.quote.pk)
+        self._create_item(self.quote, 2, '10.00')
+
+        stale.title = 'Renamed'
+        stale.save()
+        response = self.client.patch(f'/api/v1/quotes/{self.quote.pk}/', {'notes': 'Rush'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            Quote.objects.values_list('title', 'notes', 'total_price').get(pk=self.quote.pk),
+            ('Renamed', 'Rush', Decimal('20.00'))
+        )
+
+    def test_update_total_price_recomputes_in_one_statement(self):
+        """Test that a full recompute repairs a drifted total"""
+        QuoteLineItem.objects.create(
+            quote=self.quote, product=self.product, quantity=4,
+            unit_price=Decimal('2.50'), organization=self.organization
+        )
+        Quote.objects.filter(pk=self.quote.pk).update(total_price=Decimal('1.00'))
+
+        self.quote.update_total_price()
+
+        self.assertEqual(self.quote.total_price, Decimal('10.00'))
+        self.assertEqual(self.quote.calculate_total_price(), Decimal('10.00'))
@@ -0,0 +1,156 @@
+"""
+Test the versioned per-organization response cache
+"""
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from core.models import Lead, Organization, Product
+from core.response_cache import RESPONSE_CACHE_ALIAS
+from core.views import LeadViewSet
+
+User = get_user_model()
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class ResponseCacheTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.organization = Organization.objects.create(name='Response Cache Org')
+        self.admin = User.objects.create_user(
+            username='cache-admin@example.com',
+            email='cache-admin@example.com',
+            password='testpassword123',
+            role='admin',
+            organization=self.organization
+        )
+        self.rep = User.objects.create_user(
+            username='cache-rep@example.com',
+            email='cache-rep@example.com',
+            password='testpassword123',
+            organization=self.organization
+        )
+        self.other_organization = Organization.objects.create(name='Other Response Cache Org')
+        self.outsider = User.objects.create_user(
+            username='cache-outsider@example.com',
+            email='cache-outsider@example.com',
+            password='testpassword123',
+            organization=self.other_organization
+        )
+        for name in ('Ann', 'Bob'):
+            Lead.objects.create(
+                name=name, email=f'{name.lower()}@example.com', assigned_to=self.rep, organization=self.organization
+            )
+
+    def _get(self, user, url, **params):
+        self.client.force_authenticate(user=User.objects.get(pk=user.pk))
+        return self.client.get(url, params)
+
+    def test_repeated_gets_are_served_from_the_cache(self):
+        """Test that the second identical GET skips the list queries"""
+        first = self._get(self.rep, '/api/v1/leads/')
+        self.client.force_authenticate(user=User.objects.select_related('organization').get(pk=self.rep.pk))
+        # Only the conditional GET validator query runs; nothing is serialized
+        with self.assertNumQueries(1):
+            second = self.client.get('/api/v1/leads/')
+
+        self.assertEqual(first['X-Response-Cache'], 'miss')
+        self.assertEqual(second['X-Response-Cache'], 'hit')
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(self._get(self.rep, '/api/v1/leads/', search='ann')['X-Response-Cache'], 'miss')
+
+    def test_writes_bump_only_their_organization_and_model(self):
+        """Test that a write invalidates its organization's pages of that model"""
+        self._get(self.rep, '/api/v1/leads/')
+        self._get(self.rep, '/api/v1/products/')
+        self._get(self.outsider, '/api/v1/leads/')
+
+        self.client.force_authenticate(user=self.rep)
+        self.client.post('/api/v1/leads/', {'name': 'Cid', 'email': 'cid@example.com'}, format='json')
+
+        response = self._get(self.rep, '/api/v1/leads/')
+        self.assertEqual(response['X-Response-Cache'], 'miss')
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(self._get(self.rep, '/api/v1/products/')['X-Response-Cache'], 'hit')
+        self.assertEqual(self._get(self.outsider, '/api/v1/leads/')['X-Response-Cache'], 'hit')
+
+    def test_related_models_and_bulk_updates_invalidate(self):
+        """Test that dependent models and signal-free bulk writes bump generations"""
+        self._get(self.rep, '/api/v1/leads/')
+        self.rep.first_name = 'Renamed'
+        self.rep.save()
+        response = self._get(self.rep, '/api/v1/leads/')
+        self.assertEqual(response['X-Response-Cache'], 'miss')
+        self.assertEqual(response.data['results'][0]['assigned_to_name'], 'Renamed')
+
+        self.client.patch('/api/v1/leads/bulk/', {'ids': list(Lead.objects.values_list('id', flat=True)),
+                                                  'changes': {'status': 'qualified'}}, format='json')
+        response = self._get(self.rep, '/api/v1/leads/')
+        self.assertEqual({lead['status'] for lead in response.data['results']}, {'qualified'})
+
+    def test_writes_through_one_worker_invalidate_another(self):
+        """Test that with a shared backend a bump made through one worker's cache client reaches another's"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        # Separate clients of one store, as each worker process holds its own Redis client
+        first_worker, second_worker = FileBasedCache(directory.name, {}), FileBasedCache(directory.name, {})
+        original = caches[RESPONSE_CACHE_ALIAS]
+        self.addCleanup(caches.__setitem__, RESPONSE_CACHE_ALIAS, original)
+
+        caches[RESPONSE_CACHE_ALIAS] = first_worker
+        self._get(self.rep, '/api/v1/leads/')
+        self.assertEqual(self._get(self.rep, '/api/v1/leads/')['X-Response-Cache'], 'hit')
+
+        caches[RESPONSE_CACHE_ALIAS] = second_worker
+        self.client.post('/api/v1/leads/', {'name': 'Cid', 'email': 'cid@example.com'}, format='json')
+
+        caches[RESPONSE_CACHE_ALIAS] = first_worker
+        response = self._get(self.rep, '/api/v1/leads/')
+        self.assertEqual(response['X-Response-Cache'], 'miss')
+        self.assertEqual(response.data['count'], 3)
+
+    @override_settings(RESPONSE_CACHE_ENABLED=False)
+    def test_pages_are_not_cached_without_a_shared_backend(self):
+        """Test that the in-process default serves every GET fresh"""
+        self._get(self.rep, '/api/v1/leads/')
+        response = self._get(self.rep, '/api/v1/leads/')
+        self.assertNotIn('X-Response-Cache', response)
+
+    def test_results_vary_by_role_and_admins_span_organizations(self):
+        """Test that admins and reps get separate entries and admin lists follow every tenant"""
+        admin_users = self._get(self.admin, '/api/v1/users/')
+        rep_users = self._get(self.rep, '/api/v1/users/')
+        self.assertEqual(rep_users['X-Response-Cache'], 'miss')
+        self.assertGreater(len(admin_users.data), len(rep_users.data))
+
+        User.objects.create_user(
+            username='late@example.com', email='late@example.com', password='testpassword123',
+            organization=self.other_organization
+        )
+        self.assertEqual(self._get(self.admin, '/api/v1/users/')['X-Response-Cache'], 'miss')
+        self.assertEqual(self._get(self.rep, '/api/v1/users/')['X-Response-Cache'], 'hit')
+
+    def test_moving_a_user_invalidates_the_organization_they_left(self):
+        """Test that removing a user from an organization refreshes its user list"""
+        self.assertEqual(len(self._get(self.rep, '/api/v1/users/').data), 2)
+
+        self.client.force_authenticate(user=self.admin)
+        self.client.post(f'/api/v1/organizations/{self.organization.id}/remove_user/', {'user_id': self.admin.id})
+
+        self.assertEqual(len(self._get(self.rep, '/api/v1/users/').data), 1)
+
+    def test_cache_can_be_switched_off_per_viewset(self):
+        """Test that response_cache_enabled = False bypasses the cache"""
+        with mock.patch.object(LeadViewSet, 'response_cache_enabled', False):
+            self._get(self.rep, '/api/v1/leads/')
+            response = self._get(self.rep, '/api/v1/leads/')
+
+        self.assertNotIn('X-Response-Cache', response)
+        self.assertEqual(self._get(self.rep, '/api/v1/products/')['X-Response-Cache'], 'miss')
+        Product.objects.create(name='Widget', price=1, organization=self.organization)
+        self.assertEqual(len(self._get(self.rep, '/api/v1/products/').data['results']), 1)
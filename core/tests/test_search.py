@@ -0,0 +1,163 @@
+"""
+Test the full-text search filter backend
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.models import (
+    Account,
+    Contact,
+    InteractionLog,
+    Lead,
+    Opportunity,
+    Organization,
+    Quote,
+    Task,
+)
+
+User = get_user_model()
+
+
+class FullTextSearchTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.organization = Organization.objects.create(name='Search Org')
+        self.user = User.objects.create_user(
+            username='searcher@example.com',
+            email='searcher@example.com',
+            password='testpassword123',
+            organization=self.organization
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _lead(self, name, email, company=''):
+        return Lead.objects.create(
+            name=name, email=email, company=company, assigned_to=self.user, organization=self.organization
+        )
+
+    def _search(self, resource, term, **params):
+        response = self.client.get(f'/api/v1/{resource}/', {'search': term, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_prefix_and_email_parts_match(self):
+        """Test that word prefixes and the parts of an email address match"""
+        jane = self._lead('Jane Doe', 'jane@acme.com')
+        self._lead('John Smith', 'john@globex.com')
+
+        self.assertEqual([lead['id'] for lead in self._search('leads', 'jan')], [jane.id])
+        self.assertEqual([lead['id'] for lead in self._search('leads', 'acme')], [jane.id])
+        self.assertEqual([lead['id'] for lead in self._search('leads', 'doe acm')], [jane.id])
+        self.assertEqual(self._search('leads', 'initech'), [])
+
+    def test_search_uses_the_stored_vector(self):
+        """Test that the lead search is a tsvector match, not a LIKE scan"""
+        self._lead('Jane Doe', 'jane@acme.com')
+
+        with CaptureQueriesContext(connection) as context:
+            self._search('leads', 'jane')
+
+        sql = '\n'.join(query['sql'] for query in context.captured_queries)
+        self.assertIn('@@', sql)
+        self.assertNotIn('LIKE', sql)
+
+    def test_vector_follows_updates(self):
+        """Test that renaming a lead makes it findable under the new name"""
+        lead = self._lead('Jane Doe', 'jane@acme.com')
+        lead.name = 'Janet Roe'
+        lead.save()
+
+        self.assertEqual([row['id'] for row in self._search('leads', 'roe')], [lead.id])
+        self.assertEqual(self._search('leads', 'doe'), [])
+
+    def test_name_matches_rank_above_email_matches(self):
+        """Test that results are ranked by field weight when no ordering is requested"""
+        by_email = self._lead('Someone Else', 'zephyr@example.com')
+        by_name = self._lead('Zephyr Jones', 'jones@example.com')
+
+        ids = [lead['id'] for lead in self._search('leads', 'zephyr')]
+
+        self.assertEqual(ids, [by_name.id, by_email.id])
+
+        ordered = [lead['id'] for lead in self._search('leads', 'zephyr', ordering='created_at')]
+        self.assertEqual(ordered, [by_email.id, by_name.id])
+
+    def test_each_term_may_match_a_different_field(self):
+        """Test that terms are AND'ed across fields, vector-backed or not, as with SearchFilter"""
+        account = Account.objects.create(name='Acme', organization=self.organization)
+        opportunity = Opportunity.objects.create(
+            name='Platform deal', account=account, amount=Decimal('100.00'),
+            owner=self.user, organization=self.organization
+        )
+        task = Task.objects.create(
+            title='Call back', type='call', due_date=date.today(), owner=self.user, organization=self.organization
+        )
+
+        self.assertEqual([row['id'] for row in self._search('opportunities', 'platform acme')], [opportunity.id])
+        self.assertEqual(self._search('opportunities', 'platform globex'), [])
+        self.assertEqual([row['id'] for row in self._search('tasks', 'call searcher@')], [task.id])
+        self.assertEqual(self._search('tasks', 'call nobody@'), [])
+
+    def test_rank_is_skipped_when_results_are_reordered(self):
+        """Test that no rank is computed when an ordering or the cursor mode decides the order"""
+        self._lead('Jane Doe', 'jane@acme.com')
+
+        for params in ({}, {'ordering': 'created_at'}, {'pagination': 'cursor'}):
+            with self.subTest(params=params), CaptureQueriesContext(connection) as context:
+                self.client.get('/api/v1/leads/', {'search': 'jane', **params})
+            sql = '\n'.join(query['sql'] for query in context.captured_queries)
+            self.assertEqual('ts_rank' in sql, not params)
+
+    def test_related_fields_use_related_vectors(self):
+        """Test that interaction search reaches lead names through the lead vector"""
+        lead = self._lead('Quasar Industries', 'info@quasar.io')
+        log = InteractionLog.objects.create(
+            user=self.user, lead=lead, type='call', summary='Intro call', organization=self.organization
+        )
+        InteractionLog.objects.create(
+            user=self.user, type='note', summary='Unrelated note', organization=self.organization
+        )
+
+        ids = [row['id'] for row in self._search('interactions', 'quasar')]
+
+        self.assertIn(log.id, ids)
+        self.assertTrue(all(
+            InteractionLog.objects.get(pk=pk).lead_id == lead.id for pk in ids
+        ))
+
+    def test_fields_without_vector_fall_back_to_icontains(self):
+        """Test that quote search still matches creator emails"""
+        account = Account.objects.create(name='Acme', organization=self.organization)
+        opportunity = Opportunity.objects.create(
+            name='Platform deal', account=account, amount=Decimal('100.00'),
+            owner=self.user, organization=self.organization
+        )
+        quote = Quote.objects.create(
+            opportunity=opportunity, title='Q1', created_by=self.user, organization=self.organization
+        )
+
+        self.assertEqual([row['id'] for row in self._search('quotes', 'platform')], [quote.id])
+        self.assertEqual([row['id'] for row in self._search('quotes', 'searcher@')], [quote.id])
+
+    def test_task_search_covers_notes(self):
+        """Test that task search works on notes"""
+        task = Task.objects.create(
+            title='Call back', type='call', due_date=date.today(), notes='Discuss renewal pricing',
+            owner=self.user, organization=self.organization
+        )
+
+        self.assertEqual([row['id'] for row in self._search('tasks', 'renewal')], [task.id])
+
+    def test_search_is_scoped_to_organization(self):
+        """Test that other tenants' rows never match"""
+        other = Organization.objects.create(name='Other Search Org')
+        account = Account.objects.create(name='Hidden', organization=other)
+        Contact.objects.create(name='Hidden Person', email='hidden@example.com', account=account, organization=other)
+
+        self.assertEqual(self._search('contacts', 'hidden'), [])
@@ -0,0 +1,107 @@
+"""
+Test InteractionLog signals and the field snapshots they diff against
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from core.models import Account, InteractionLog, Lead, Opportunity, Organization
+
+User = get_user_model()
+
+
+class FieldChangeSignalTestCase(TestCase):
+    def setUp(self):
+        self.organization = Organization.objects.create(name='Signal Org')
+        self.user = User.objects.create_user(
+            username='signals@example.com',
+            email='signals@example.com',
+            password='testpassword123',
+            organization=self.organization
+        )
+        account = Account.objects.create(name='Acme', organization=self.organization)
+        self.lead = Lead.objects.create(
+            name='Jane', email='jane@example.com', assigned_to=self.user, organization=self.organization
+        )
+        self.opportunity = Opportunity.objects.create(
+            name='Deal',
+            account=account,
+            amount=Decimal('10000.00'),
+            owner=self.user,
+            organization=self.organization
+        )
+
+    def _summaries(self):
+        return list(InteractionLog.objects.order_by('id').values_list('summary', flat=True))
+
+    def test_unchanged_opportunity_update_is_a_single_query(self):
+        """Test that saving a loaded opportunity runs only the UPDATE"""
+        opportunity = Opportunity.objects.get(pk=self.opportunity.pk)
+        opportunity.name = 'Renamed deal'
+
+        with self.assertNumQueries(1):
+            opportunity.save()
+
+    def test_unchanged_lead_update_is_a_single_query(self):
+        """Test that saving a loaded lead runs only the UPDATE"""
+        lead = Lead.objects.get(pk=self.lead.pk)
+        lead.phone = '555-0100'
+
+        with self.assertNumQueries(1):
+            lead.save()
+
+    def test_stage_and_amount_changes_are_logged(self):
+        """Test that stage and significant amount changes are logged once"""
+        opportunity = Opportunity.objects.get(pk=self.opportunity.pk)
+        before = len(self._summaries())
+
+        opportunity.stage = 'proposal'
+        opportunity.amount = Decimal('20000.00')
+        opportunity.save()
+        # Saving again without changes must not log the same change twice
+        opportunity.save()
+
+        new_logs = self._summaries()[before:]
+        self.assertEqual(len(new_logs), 2)
+        self.assertIn('moved to proposal stage', new_logs[0])
+        self.assertIn('increased from $10,000.00 to $20,000.00', new_logs[1])
+
+    def test_lead_status_change_is_logged(self):
+        """Test that a lead status change is detected from the snapshot"""
+        lead = Lead.objects.get(pk=self.lead.pk)
+        before = len(self._summaries())
+
+        lead.status = 'contacted'
+        lead.save()
+
+        self.assertEqual(self._summaries()[before:], ['Lead Jane contacted for the first time'])
+
+    def test_snapshot_follows_refresh_and_partial_saves(self):
+        """Test that refresh_from_db re-snapshots and update_fields only snapshots the saved fields"""
+        lead = Lead.objects.get(pk=self.lead.pk)
+        Lead.objects.filter(pk=lead.pk).update(status='contacted')
+        lead.refresh_from_db(fields=['status'])
+        self.assertEqual(lead.get_original_values(), {'status': 'contacted'})
+
+        # An unsaved status change must still be detected after saving other fields
+        lead.status = 'qualified'
+        lead.name = 'Jane Q'
+        lead.save(update_fields=['name'])
+        self.assertEqual(lead.get_original_values(), {'status': 'contacted'})
+
+        before = len(self._summaries())
+        lead.save()
+        self.assertEqual(len(self._summaries()), before + 1)
+        self.assertEqual(lead.get_original_values(), {'status': 'qualified'})
+
+    def test_instance_not_loaded_from_database_falls_back_to_one_query(self):
+        """Test that instances built by hand are still diffed correctly"""
+        lead = Lead.objects.get(pk=self.lead.pk)
+        detached = Lead(
+            pk=lead.pk, name=lead.name, email=lead.email, status='qualified',
+            assigned_to=self.user, organization=self.organization
+        )
+
+        self.assertEqual(detached.get_original_values(), {'status': 'new'})
+        self.assertIsNone(Lead(name='Unsaved').get_original_values())
@@ -0,0 +1,104 @@
+"""
+Test the typeahead endpoints used by the entity pickers
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import Account, Contact, Organization, Product
+from core.typeahead import TYPEAHEAD_MAX_LIMIT
+
+User = get_user_model()
+
+
+class TypeaheadTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.organization = Organization.objects.create(name='Typeahead Org')
+        self.user = User.objects.create_user(
+            username='picker@example.com',
+            email='picker@example.com',
+            password='testpassword123',
+            first_name='Pat',
+            last_name='Picker',
+            role='admin',
+            organization=self.organization
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.other_organization = Organization.objects.create(name='Other Typeahead Org')
+
+    def _product(self, name, organization=None, **kwargs):
+        return Product.objects.create(
+            name=name, price=Decimal('10.00'), organization=organization or self.organization, **kwargs
+        )
+
+    def _typeahead(self, resource, q, **params):
+        response = self.client.get(f'/api/v1/{resource}/typeahead/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_product_typeahead_returns_best_matches_with_minimal_payload(self):
+        """Test that product matches are ranked and only carry picker fields"""
+        widget = self._product('Widget Pro')
+        self._product('Blue Widget')
+        self._product('Gadget')
+        self._product('Widget Classic', is_active=False)
+        self._product('Widget Pro', organization=self.other_organization)
+
+        results = self._typeahead('products', 'widg')
+
+        self.assertEqual([row['name'] for row in results], ['Widget Pro', 'Blue Widget'])
+        self.assertEqual(results[0], {'id': widget.id, 'name': 'Widget Pro', 'price': Decimal('10.00'), 'currency': 'USD'})
+
+    def test_limit_is_applied_and_clamped(self):
+        """Test that ?limit= caps the result count within the allowed range"""
+        for i in range(TYPEAHEAD_MAX_LIMIT + 5):
+            self._product(f'Item {i:03d}')
+
+        self.assertEqual(len(self._typeahead('products', 'item', limit=3)), 3)
+        self.assertEqual(len(self._typeahead('products', 'item', limit=1000)), TYPEAHEAD_MAX_LIMIT)
+        self.assertEqual(len(self._typeahead('products', 'item', limit='many')), 10)
+
+    def test_empty_query_lists_alphabetically(self):
+        """Test that an empty query returns the first rows by name"""
+        Account.objects.create(name='Zeta', organization=self.organization)
+        Account.objects.create(name='Alpha', organization=self.organization)
+
+        self.assertEqual([row['name'] for row in self._typeahead('accounts', '')], ['Alpha', 'Zeta'])
+
+    def test_contact_typeahead_matches_email(self):
+        """Test that contacts can be picked by email and include their account"""
+        account = Account.objects.create(name='Acme', organization=self.organization)
+        contact = Contact.objects.create(
+            name='Jane Doe', email='jdoe@acme.com', account=account, organization=self.organization
+        )
+
+        self.assertEqual(
+            self._typeahead('contacts', 'jdoe'),
+            [{'id': contact.id, 'name': 'Jane Doe', 'email': 'jdoe@acme.com', 'account': account.id}]
+        )
+
+    def test_user_typeahead_is_limited_to_the_organization(self):
+        """Test that even admins only pick active users from their own organization"""
+        User.objects.create_user(username='pat.other@example.com', email='pat.other@example.com',
+                                 first_name='Pat', organization=self.other_organization)
+        User.objects.create_user(username='pat.gone@example.com', email='pat.gone@example.com',
+                                 first_name='Pat', is_active=False, organization=self.organization)
+
+        results = self._typeahead('users', 'pat')
+
+        self.assertEqual([row['id'] for row in results], [self.user.id])
+        self.assertEqual(set(results[0]), {'id', 'email', 'first_name', 'last_name'})
+
+    def test_available_for_quotes_search_covers_descriptions(self):
+        """Test that quote product search ranks name matches above description matches"""
+        self._product('Support plan', description='Includes widget onboarding')
+        self._product('Widget Pro')
+
+        response = self.client.get('/api/v1/products/available_for_quotes/', {'search': 'widget', 'limit': 5})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['name'] for row in response.data], ['Widget Pro', 'Support plan'])
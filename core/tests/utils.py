@@ -0,0 +1,94 @@
+"""
+Shared fixtures for API tests
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+
+from core.models import (
+    Account,
+    Contact,
+    InteractionLog,
+    Lead,
+    LeadImportJob,
+    Opportunity,
+    Product,
+    Quote,
+    QuoteLineItem,
+    Task,
+)
+
+
+def seed_organization(organization, user, count, start=0):
+    """
+    Create ``count`` rows of every tenant entity for ``organization``.
+
+    Rows are linked the way the web UI links them (contacts under accounts,
+    opportunities with contacts, quotes with line items) so serializers touch
+    every relation they expose. ``start`` offsets names and emails so the
+    helper can be called repeatedly to grow the same organization.
+    """
+    for i in range(start, start + count):
+        account = Account.objects.create(
+            name=f'Account {i}', industry='Software', organization=organization
+        )
+        contact = Contact.objects.create(
+            name=f'Contact {i}',
+            email=f'contact{i}@example.com',
+            account=account,
+            organization=organization
+        )
+        lead = Lead.objects.create(
+            name=f'Lead {i}',
+            email=f'lead{i}@example.com',
+            company=f'Company {i}',
+            assigned_to=user,
+            organization=organization
+        )
+        opportunity = Opportunity.objects.create(
+            name=f'Opportunity {i}',
+            account=account,
+            contact=contact,
+            amount=Decimal('1000.00') * (i + 1),
+            stage=Opportunity.STAGE_CHOICES[i % len(Opportunity.STAGE_CHOICES)][0],
+            owner=user,
+            close_date=date.today() + timedelta(days=30 * (i % 6)),
+            organization=organization
+        )
+        Task.objects.create(
+            title=f'Follow up {i}',
+            type='call',
+            due_date=date.today() - timedelta(days=i % 3),
+            related_lead=lead,
+            related_opportunity=opportunity,
+            owner=user,
+            organization=organization
+        )
+        product = Product.objects.create(
+            name=f'Product {i}', price=Decimal('99.00'), organization=organization
+        )
+        quote = Quote.objects.create(
+            opportunity=opportunity,
+            title=f'Quote {i}',
+            created_by=user,
+            organization=organization
+        )
+        for quantity in (1, 2):
+            QuoteLineItem.objects.create(
+                quote=quote,
+                product=product,
+                quantity=quantity,
+                unit_price=product.price,
+                organization=organization
+            )
+        InteractionLog.objects.create(
+            user=user,
+            contact=contact,
+            opportunity=opportunity,
+            type='call',
+            summary=f'Discovery call {i}',
+            organization=organization
+        )
+        LeadImportJob.objects.create(
+            organization=organization, user=user, file_format='csv', path=f'leads-{i}.csv', status='done',
+            result={'processed': 1, 'created': 1, 'failed': 0, 'errors': []}
+        )
@@ -0,0 +1,113 @@
+"""
+Trigram typeahead for the entity pickers.
+
+Quote builders and lead forms look products, accounts, contacts and users up
+on every keystroke, so these lookups return only the best few matches with
+just enough columns to render a picker row. Matching uses ``pg_trgm`` word
+similarity, served by the GIN trigram indexes from migration 0007. Databases
+without the extension fall back to prefix-first ``icontains`` matching.
+"""
+
+import operator
+import re
+from functools import cache, reduce
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections, models
+from django.db.models.functions import Greatest
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+TYPEAHEAD_DEFAULT_LIMIT = 10
+TYPEAHEAD_MAX_LIMIT = 50
+
+
+@cache
+def _trigram_installed(alias, database_name):
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+        return cursor.fetchone()[0]
+
+
+def trigram_available(using='default'):
+    """Return whether ``pg_trgm`` is installed in the ``using`` database (checked once per process)."""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return False
+    return _trigram_installed(using, connection.settings_dict['NAME'])
+
+
+def _any(conditions):
+    return reduce(operator.or_, conditions)
+
+
+def typeahead(queryset, fields, term, also=None):
+    """
+    Filter ``queryset`` to rows matching ``term`` in any of ``fields``, best first.
+
+    Rows are annotated with ``similarity`` and ordered by it, then by the
+    first field. ``also`` is an optional ``Q`` that counts as a match too;
+    rows found only through it sort after the field matches. An empty term
+    returns the rows ordered by the first field.
+    """
+    term = term.strip()
+    if not term:
+        return queryset.order_by(fields[0], 'pk')
+
+    if trigram_available(queryset.db):
+        # ``~*`` rather than ``istartswith``: the trigram indexes serve regex
+        # matches on the bare column, but not ``UPPER(column) LIKE``. Prefixes
+        # keep one- and two-letter terms matching before similarity kicks in.
+        prefix = [models.Q(**{f'{field}__iregex': f'^{re.escape(term)}'}) for field in fields]
+        condition = _any(prefix + [models.Q(**{f'{field}__trigram_word_similar': term}) for field in fields])
+        scores = [TrigramWordSimilarity(term, field) for field in fields]
+    else:
+        prefix = [models.Q(**{f'{field}__istartswith': term}) for field in fields]
+        contains = [models.Q(**{f'{field}__icontains': term}) for field in fields]
+        condition = _any(contains)
+        scores = [
+            models.Case(
+                models.When(starts, then=models.Value(1.0)),
+                models.When(within, then=models.Value(0.5)),
+                default=models.Value(0.0),
+                output_field=models.FloatField(),
+            )
+            for starts, within in zip(prefix, contains, strict=True)
+        ]
+    if also is not None:
+        condition |= also
+
+    similarity = scores[0] if len(scores) == 1 else Greatest(*scores)
+    return queryset.filter(condition).annotate(similarity=similarity).order_by('-similarity', fields[0], 'pk')
+
+
+def get_typeahead_limit(request):
+    """Read ``?limit=`` from the request, clamped to ``1..TYPEAHEAD_MAX_LIMIT``."""
+    try:
+        limit = int(request.query_params.get('limit', TYPEAHEAD_DEFAULT_LIMIT))
+    except ValueError:
+        limit = TYPEAHEAD_DEFAULT_LIMIT
+    return max(1, min(limit, TYPEAHEAD_MAX_LIMIT))
+
+
+class TypeaheadMixin:
+    """
+    Viewset mixin adding a ``GET <prefix>/typeahead/?q=...&limit=...`` route.
+
+    ``typeahead_fields`` are matched against ``q``; ``typeahead_values`` are
+    the columns returned per row. The response is a plain list fetched with a
+    single ``.values()`` query, skipping serializers and pagination.
+    """
+    typeahead_fields = ()
+    typeahead_values = ()
+
+    def get_typeahead_queryset(self):
+        return self.get_queryset()
+
+    @action(detail=False, methods=['get'])
+    def typeahead(self, request):
+        """Get the best matches for ``q`` with a minimal payload"""
+        queryset = typeahead(
+            self.get_typeahead_queryset(), self.typeahead_fields, request.query_params.get('q', '')
+        )
+        return Response(list(queryset.values(*self.typeahead_values)[:get_typeahead_limit(request)]))
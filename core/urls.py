@@ -1,13 +1,37 @@
 from django.urls import include, path
 
+from . import async_views
 from .routers import router
-from .views import CreateOrganizationForUserView, NoOrganizationView
+from .views import (
+    ActivityStreamTicketView,
+    AggregateCacheStatsView,
+    ChangesView,
+    CreateOrganizationForUserView,
+    DashboardActivityView,
+    DatabasePoolStatsView,
+    NoOrganizationView,
+)
 
 app_name = "core"
 
+async_urlpatterns = [
+    path("leads/", async_views.lead_list, name="async-lead-list"),
+    path("opportunities/", async_views.opportunity_list, name="async-opportunity-list"),
+    path("opportunities/pipeline_value/", async_views.pipeline_value, name="async-pipeline-value"),
+    path("interactions/", async_views.interaction_list, name="async-interaction-list"),
+    path("tasks/overdue/", async_views.overdue_tasks, name="async-tasks-overdue"),
+    path("dashboard/activity/", async_views.dashboard_activity, name="async-dashboard-activity"),
+]
+
 urlpatterns = [
     path("no-organization/", NoOrganizationView.as_view(), name="no-organization"),
     path("create-organization/", CreateOrganizationForUserView.as_view(), name="create-organization"),
+    path("dashboard/activity/", DashboardActivityView.as_view(), name="dashboard-activity"),
+    path("dashboard/cache-stats/", AggregateCacheStatsView.as_view(), name="dashboard-cache-stats"),
+    path("dashboard/pool-stats/", DatabasePoolStatsView.as_view(), name="dashboard-pool-stats"),
+    path("activity/stream/", async_views.activity_stream, name="activity-stream"),
+    path("activity/stream/ticket/", ActivityStreamTicketView.as_view(), name="activity-stream-ticket"),
+    path("changes/", ChangesView.as_view(), name="changes"),
+    path("async/", include(async_urlpatterns)),
     path("", include(router.urls)),
 ]
-
@@ -1,16 +1,60 @@
 """
-Utility functions for InteractionLog dashboard integration.
+Utility functions for InteractionLog and pipeline dashboard integration.
+
+The report helpers that run their queries themselves are marked
+``reads_from_replica``, so they read from a replica (core/db_routing.py)
+unless the caller already wrote; helpers returning querysets leave that to
+whoever evaluates them.
 """
 
 from datetime import timedelta
+from decimal import Decimal
 
-from django.db.models import Count, Q
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
 from django.utils import timezone
 
-from .models import InteractionLog
+from .db_routing import reads_from_replica
+from .models import InteractionLog, Lead, Opportunity
+
+CLOSED_OPPORTUNITY_STAGES = ['won', 'lost']
+
+ACTIVITY_TYPE_LABELS = dict(InteractionLog.TYPE_CHOICES)
 
+# Everything a dashboard activity card shows, fetched in one joined query
+DASHBOARD_ACTIVITY_FIELDS = (
+    'id', 'timestamp', 'type', 'summary',
+    'user_id', 'user__username', 'user__first_name', 'user__last_name', 'user__email',
+    'lead_id', 'lead__name', 'lead__company',
+    'opportunity_id', 'opportunity__name', 'opportunity__amount',
+    'contact_id', 'contact__name', 'contact__account__name',
+)
 
-def get_recent_activities(user=None, days=7, limit=20):
+
+def _activity_window(days):
+    """
+    InteractionLog rows of the last ``days`` days.
+
+    The upper bound lets Postgres prune the table's monthly partitions (see
+    core/partitions.py) to the one or two the window spans; with only a lower
+    bound it would also scan the months created ahead and the default one.
+    """
+    now = timezone.now()
+    return InteractionLog.objects.filter(timestamp__gte=now - timedelta(days=days), timestamp__lte=now)
+
+
+def _recent_activity_queryset(user=None, days=7, organization=None):
+    queryset = _activity_window(days)
+    
+    if organization:
+        queryset = queryset.filter(organization=organization)
+    if user:
+        queryset = queryset.filter(user=user)
+    
+    return queryset.order_by('-timestamp')
+
+
+def get_recent_activities(user=None, days=7, limit=20, organization=None):
     """
     Get recent activities for dashboard display.
     
@@ -18,19 +62,14 @@ def get_recent_activities(user=None, days=7, limit=20):
         user: Filter by specific user (None for all users)
         days: Number of days to look back
         limit: Maximum number of activities to return
+        organization: Restrict to this organization (None for no restriction)
     
     Returns:
         QuerySet of InteractionLog entries
     """
-    since_date = timezone.now() - timedelta(days=days)
-    queryset = InteractionLog.objects.filter(timestamp__gte=since_date)
-    
-    if user:
-        queryset = queryset.filter(user=user)
-    
-    return queryset.select_related(
+    return _recent_activity_queryset(user=user, days=days, organization=organization).select_related(
         'user', 'lead', 'contact', 'opportunity'
-    ).order_by('-timestamp')[:limit]
+    )[:limit]
 
 
 def get_lead_activity_timeline(lead):
@@ -82,6 +121,65 @@ def get_contact_activity_timeline(contact):
     ).select_related('user').order_by('-timestamp')
 
 
+def _activity_summary_queryset(organization=None, user=None, days=30):
+    activities = _activity_window(days)
+    if organization:
+        activities = activities.filter(organization=organization)
+    if user:
+        activities = activities.filter(user=user)
+    return activities
+
+
+def _activity_summary_aggregates():
+    # One conditional count per type and entity instead of a pass over
+    # every row plus a COUNT query per entity
+    return dict(
+        total_activities=Count('id'),
+        leads=Count('id', filter=Q(lead__isnull=False)),
+        contacts=Count('id', filter=Q(contact__isnull=False)),
+        opportunities=Count('id', filter=Q(opportunity__isnull=False)),
+        **{f'type_{value}': Count('id', filter=Q(type=value)) for value, _ in InteractionLog.TYPE_CHOICES}
+    )
+
+
+def _format_activity_summary(counts, days):
+    type_keys = [value for value, _ in InteractionLog.TYPE_CHOICES]
+    return {
+        'total_activities': counts['total_activities'],
+        'by_type': {value: counts[f'type_{value}'] for value in type_keys if counts[f'type_{value}']},
+        'by_entity': {
+            'leads': counts['leads'],
+            'contacts': counts['contacts'],
+            'opportunities': counts['opportunities'],
+        },
+        'period_days': days
+    }
+
+
+@reads_from_replica
+def get_activity_summary(organization=None, user=None, days=30):
+    """
+    Get activity statistics in a single aggregate query.
+    
+    Args:
+        organization: Restrict to this organization (None for no restriction)
+        user: Restrict to this user (None for everyone in scope)
+        days: Number of days to analyze
+    
+    Returns:
+        Dictionary with activity statistics
+    """
+    activities = _activity_summary_queryset(organization=organization, user=user, days=days)
+    return _format_activity_summary(activities.aggregate(**_activity_summary_aggregates()), days)
+
+
+@reads_from_replica
+async def aget_activity_summary(organization=None, user=None, days=30):
+    """Async version of ``get_activity_summary``."""
+    activities = _activity_summary_queryset(organization=organization, user=user, days=days)
+    return _format_activity_summary(await activities.aaggregate(**_activity_summary_aggregates()), days)
+
+
 def get_user_activity_summary(user, days=30):
     """
     Get activity summary for a specific user.
@@ -93,122 +191,111 @@ def get_user_activity_summary(user, days=30):
     Returns:
         Dictionary with activity statistics
     """
-    since_date = timezone.now() - timedelta(days=days)
-    activities = InteractionLog.objects.filter(
-        user=user,
-        timestamp__gte=since_date
-    )
-    
-    # Count by type
-    type_counts = {}
-    for activity in activities:
-        type_counts[activity.type] = type_counts.get(activity.type, 0) + 1
-    
-    # Count by entity type
-    entity_counts = {
-        'leads': activities.filter(lead__isnull=False).count(),
-        'contacts': activities.filter(contact__isnull=False).count(),
-        'opportunities': activities.filter(opportunity__isnull=False).count(),
-    }
+    return get_activity_summary(user=user, days=days)
+
+
+def _top_entity_querysets(days=30, limit=10, organization=None):
+    activities = _activity_window(days)
+    if organization:
+        activities = activities.filter(organization=organization)
     
     return {
-        'total_activities': activities.count(),
-        'by_type': type_counts,
-        'by_entity': entity_counts,
-        'period_days': days
+        # Top leads by activity count
+        'leads': (
+            activities
+            .filter(lead__isnull=False)
+            .values('lead__id', 'lead__name', 'lead__company')
+            .annotate(activity_count=Count('id'))
+            .order_by('-activity_count', 'lead__id')[:limit]
+        ),
+        # Top opportunities by activity count
+        'opportunities': (
+            activities
+            .filter(opportunity__isnull=False)
+            .values('opportunity__id', 'opportunity__name', 'opportunity__amount')
+            .annotate(activity_count=Count('id'))
+            .order_by('-activity_count', 'opportunity__id')[:limit]
+        ),
+        # Top contacts by activity count
+        'contacts': (
+            activities
+            .filter(contact__isnull=False)
+            .values('contact__id', 'contact__name', 'contact__account__name')
+            .annotate(activity_count=Count('id'))
+            .order_by('-activity_count', 'contact__id')[:limit]
+        ),
     }
 
 
-def get_top_active_entities(days=30, limit=10):
+@reads_from_replica
+def get_top_active_entities(days=30, limit=10, organization=None):
     """
     Get entities with the most activity in the specified period.
     
     Args:
         days: Number of days to analyze
         limit: Maximum number of entities per type
+        organization: Restrict to this organization (None for no restriction)
     
     Returns:
         Dictionary with top active leads, contacts, and opportunities
     """
-    since_date = timezone.now() - timedelta(days=days)
-    
-    # Top leads by activity count
-    top_leads = (
-        InteractionLog.objects
-        .filter(timestamp__gte=since_date, lead__isnull=False)
-        .values('lead__id', 'lead__name', 'lead__company')
-        .annotate(activity_count=Count('id'))
-        .order_by('-activity_count')[:limit]
-    )
-    
-    # Top opportunities by activity count
-    top_opportunities = (
-        InteractionLog.objects
-        .filter(timestamp__gte=since_date, opportunity__isnull=False)
-        .values('opportunity__id', 'opportunity__name', 'opportunity__amount')
-        .annotate(activity_count=Count('id'))
-        .order_by('-activity_count')[:limit]
-    )
-    
-    # Top contacts by activity count
-    top_contacts = (
-        InteractionLog.objects
-        .filter(timestamp__gte=since_date, contact__isnull=False)
-        .values('contact__id', 'contact__name', 'contact__account__name')
-        .annotate(activity_count=Count('id'))
-        .order_by('-activity_count')[:limit]
-    )
-    
-    return {
-        'leads': list(top_leads),
-        'opportunities': list(top_opportunities),
-        'contacts': list(top_contacts)
-    }
+    querysets = _top_entity_querysets(days=days, limit=limit, organization=organization)
+    return {name: list(queryset) for name, queryset in querysets.items()}
+
+
+@reads_from_replica
+async def aget_top_active_entities(days=30, limit=10, organization=None):
+    """Async version of ``get_top_active_entities``."""
+    querysets = _top_entity_querysets(days=days, limit=limit, organization=organization)
+    return {name: [row async for row in queryset] for name, queryset in querysets.items()}
 
 
 def format_activity_for_dashboard(activity):
     """
-    Format an InteractionLog entry for dashboard display.
+    Format an activity row for dashboard display.
     
     Args:
-        activity: InteractionLog instance
+        activity: Dictionary with DASHBOARD_ACTIVITY_FIELDS, as returned by
+            ``InteractionLog.objects.values(*DASHBOARD_ACTIVITY_FIELDS)``
     
     Returns:
         Dictionary with formatted activity data
     """
     # Determine the primary entity and create a descriptive title
-    if activity.lead:
+    if activity['lead_id']:
         entity_type = 'lead'
-        entity_name = activity.lead.name
-        entity_id = activity.lead.id
-        entity_subtitle = activity.lead.company or "No Company"
-    elif activity.opportunity:
+        entity_name = activity['lead__name']
+        entity_id = activity['lead_id']
+        entity_subtitle = activity['lead__company'] or "No Company"
+    elif activity['opportunity_id']:
         entity_type = 'opportunity'
-        entity_name = activity.opportunity.name
-        entity_id = activity.opportunity.id
-        entity_subtitle = f"${activity.opportunity.amount:,.2f}"
-    elif activity.contact:
+        entity_name = activity['opportunity__name']
+        entity_id = activity['opportunity_id']
+        entity_subtitle = f"${activity['opportunity__amount']:,.2f}"
+    elif activity['contact_id']:
         entity_type = 'contact'
-        entity_name = activity.contact.name
-        entity_id = activity.contact.id
-        entity_subtitle = activity.contact.account.name
+        entity_name = activity['contact__name']
+        entity_id = activity['contact_id']
+        entity_subtitle = activity['contact__account__name']
     else:
         entity_type = 'unknown'
         entity_name = "Unknown Entity"
         entity_id = None
         entity_subtitle = ""
     
+    full_name = f"{activity['user__first_name']} {activity['user__last_name']}".strip()
     return {
-        'id': activity.id,
-        'timestamp': activity.timestamp,
+        'id': activity['id'],
+        'timestamp': activity['timestamp'],
         'user': {
-            'id': activity.user.id,
-            'name': activity.user.get_full_name() or activity.user.username,
-            'email': activity.user.email
+            'id': activity['user_id'],
+            'name': full_name or activity['user__username'],
+            'email': activity['user__email']
         },
-        'type': activity.type,
-        'type_display': activity.get_type_display(),
-        'summary': activity.summary,
+        'type': activity['type'],
+        'type_display': ACTIVITY_TYPE_LABELS.get(activity['type'], activity['type']),
+        'summary': activity['summary'],
         'entity': {
             'type': entity_type,
             'id': entity_id,
@@ -218,7 +305,28 @@ def format_activity_for_dashboard(activity):
     }
 
 
-def get_dashboard_activity_feed(user=None, days=7, limit=20):
+def get_dashboard_activity_rows(user=None, days=7, limit=20, organization=None):
+    """
+    Get the columns of recent activities that the dashboard card shows.
+    
+    The user, entity and contact account columns come from joins in the
+    same query, so formatting the rows never touches the database.
+    
+    Args:
+        user: Filter by specific user (None for all users)
+        days: Number of days to look back
+        limit: Maximum number of activities to return
+        organization: Restrict to this organization (None for no restriction)
+    
+    Returns:
+        Values QuerySet of dictionaries with DASHBOARD_ACTIVITY_FIELDS
+    """
+    queryset = _recent_activity_queryset(user=user, days=days, organization=organization)
+    return queryset.values(*DASHBOARD_ACTIVITY_FIELDS)[:limit]
+
+
+@reads_from_replica
+def get_dashboard_activity_feed(user=None, days=7, limit=20, organization=None):
     """
     Get formatted activity feed for dashboard display.
     
@@ -226,9 +334,165 @@ def get_dashboard_activity_feed(user=None, days=7, limit=20):
         user: Filter by specific user (None for all users)
         days: Number of days to look back
         limit: Maximum number of activities to return
+        organization: Restrict to this organization (None for no restriction)
     
     Returns:
         List of formatted activity dictionaries
     """
-    activities = get_recent_activities(user=user, days=days, limit=limit)
-    return [format_activity_for_dashboard(activity) for activity in activities]
+    rows = get_dashboard_activity_rows(user=user, days=days, limit=limit, organization=organization)
+    return [format_activity_for_dashboard(row) for row in rows]
+
+
+@reads_from_replica
+async def aget_dashboard_activity_feed(user=None, days=7, limit=20, organization=None):
+    """Async version of ``get_dashboard_activity_feed``."""
+    rows = get_dashboard_activity_rows(user=user, days=days, limit=limit, organization=organization)
+    return [format_activity_for_dashboard(row) async for row in rows]
+
+
+def get_pipeline_rows(queryset):
+    """
+    Group open opportunities by stage, owner and close-date month.
+
+    Args:
+        queryset: Opportunity QuerySet, already scoped to an organization
+
+    Returns:
+        Values QuerySet with one row per (stage, owner, month) group carrying
+        ``count`` and ``total``. The database does the summing, so the row
+        count depends on the number of groups, not the number of deals.
+    """
+    return (
+        queryset
+        .exclude(stage__in=CLOSED_OPPORTUNITY_STAGES)
+        .annotate(close_month=TruncMonth('close_date'))
+        .values(
+            'stage', 'close_month', 'owner_id',
+            'owner__username', 'owner__first_name', 'owner__last_name',
+        )
+        .annotate(count=Count('id'), total=Sum('amount'))
+        .order_by()
+    )
+
+
+def summarize_pipeline(rows):
+    """
+    Roll grouped pipeline rows up into totals and per-dimension breakdowns.
+
+    Args:
+        rows: Iterable of rows produced by ``get_pipeline_rows``
+
+    Returns:
+        Dictionary with the overall value and count plus ``by_stage``,
+        ``by_owner`` and ``by_close_month`` lists
+    """
+    stage_labels = dict(Opportunity.STAGE_CHOICES)
+    by_stage, by_owner, by_month = {}, {}, {}
+    total_value, total_count = Decimal('0'), 0
+
+    def add(bucket, key, defaults, row):
+        entry = bucket.setdefault(key, {**defaults, 'count': 0, 'total': Decimal('0')})
+        entry['count'] += row['count']
+        entry['total'] += row['total'] or 0
+
+    for row in rows:
+        total_count += row['count']
+        total_value += row['total'] or 0
+
+        add(by_stage, row['stage'], {
+            'stage': row['stage'],
+            'stage_display': stage_labels.get(row['stage'], row['stage']),
+        }, row)
+
+        full_name = f"{row['owner__first_name'] or ''} {row['owner__last_name'] or ''}".strip()
+        add(by_owner, row['owner_id'], {
+            'owner': row['owner_id'],
+            'owner_name': full_name or row['owner__username'] or 'Unassigned',
+        }, row)
+
+        month = row['close_month'].strftime('%Y-%m') if row['close_month'] else None
+        add(by_month, month, {'month': month}, row)
+
+    # Stages keep their funnel order; owners rank by value; months run
+    # chronologically with undated deals last
+    stage_order = [stage for stage, _ in Opportunity.STAGE_CHOICES]
+    return {
+        'total_pipeline_value': total_value,
+        'total_count': total_count,
+        'by_stage': sorted(by_stage.values(), key=lambda entry: stage_order.index(entry['stage'])),
+        'by_owner': sorted(by_owner.values(), key=lambda entry: entry['total'], reverse=True),
+        'by_close_month': sorted(by_month.values(), key=lambda entry: (entry['month'] is None, entry['month'] or '')),
+    }
+
+
+@reads_from_replica
+def get_pipeline_summary(queryset):
+    """
+    Compute the open pipeline summary for an organization in one query.
+
+    Args:
+        queryset: Opportunity QuerySet, already scoped to an organization
+
+    Returns:
+        Dictionary as described in ``summarize_pipeline``
+    """
+    return summarize_pipeline(get_pipeline_rows(queryset))
+
+
+@reads_from_replica
+async def aget_pipeline_summary(queryset):
+    """Async version of ``get_pipeline_summary``."""
+    return summarize_pipeline([row async for row in get_pipeline_rows(queryset)])
+
+
+def _lead_status_count_rows(queryset):
+    return queryset.values_list('status').annotate(count=Count('id')).order_by()
+
+
+def _format_lead_status_counts(counts):
+    return {status: counts.get(status, 0) for status, _ in Lead.STATUS_CHOICES}
+
+
+@reads_from_replica
+def get_lead_status_counts(queryset):
+    """
+    Count leads per status in one grouped query.
+
+    Args:
+        queryset: Lead QuerySet, already scoped to an organization
+
+    Returns:
+        Dictionary mapping every status to its lead count
+    """
+    return _format_lead_status_counts(dict(_lead_status_count_rows(queryset)))
+
+
+@reads_from_replica
+async def aget_lead_status_counts(queryset):
+    """Async version of ``get_lead_status_counts``."""
+    return _format_lead_status_counts({status: count async for status, count in _lead_status_count_rows(queryset)})
+
+
+def _overdue_tasks(queryset, today):
+    return queryset.filter(due_date__lt=today, status='pending')
+
+
+@reads_from_replica
+def get_overdue_task_count(queryset, today):
+    """
+    Count pending tasks that are past their due date.
+
+    Args:
+        queryset: Task QuerySet, already scoped to an organization
+        today: Date that tasks due before it are overdue
+
+    Returns:
+        Number of overdue tasks
+    """
+    return _overdue_tasks(queryset, today).count()
+
+
+@reads_from_replica
+async def aget_overdue_task_count(queryset, today):
+    """Async version of ``get_overdue_task_count``."""
+    return await _overdue_tasks(queryset, today).acount()
@@ -1,20 +1,50 @@
 from datetime import date
+from decimal import Decimal, InvalidOperation
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Count, Q
 from rest_framework import filters, generics, permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .activity_stream import issue_stream_ticket
+from .aggregate_cache import get_aggregate_cache
+from .archive import ARCHIVE_FILTER_FIELDS, ArchivedInteractions
+from .bulk import BulkUpdateMixin
+from .changes import get_changes
+from .conditional import ConditionalGetMixin
+from .dashboard import (
+    dashboard_aggregates,
+    dashboard_filters,
+    parse_dashboard_params,
+    pipeline_cache_variant,
+    resolve_user_filter,
+)
+from .db_pool import pool_stats
+from .eager_loading import EagerLoadingMixin, eager_load
+from .export import ExportMixin
+from .lead_import import (
+    IMPORT_FORMATS,
+    ImportFileError,
+    LeadImport,
+    guess_import_format,
+    iter_import_rows,
+    queue_import,
+)
 from .models import (
     Account,
     Contact,
     InteractionLog,
     Lead,
+    LeadImportJob,
     Opportunity,
     Organization,
     Product,
@@ -22,10 +52,14 @@ from .models import (
     QuoteLineItem,
     Task,
 )
+from .pagination import PageNumberOrKeysetPagination
+from .response_cache import GLOBAL_SCOPE, ResponseCacheMixin
+from .search import FullTextSearchFilter, build_search_query
 from .serializers import (
     AccountSerializer,
     ContactSerializer,
     InteractionLogSerializer,
+    LeadImportJobSerializer,
     LeadSerializer,
     OpportunitySerializer,
     OrganizationSerializer,
@@ -37,48 +71,15 @@ from .serializers import (
     UserRegistrationSerializer,
     UserSerializer,
 )
-from .signals import create_lead_conversion_log, create_task_completion_log
-
-# class DashboardActivityView(APIView):
-#     """Get formatted activity feed for dashboard display."""
-#     permission_classes = [permissions.IsAuthenticated]
-    
-#     def get(self, request):
-#         from .utils import get_dashboard_activity_feed, get_user_activity_summary
-        
-#         # Get query parameters
-#         days = int(request.query_params.get('days', 7))
-#         limit = int(request.query_params.get('limit', 20))
-#         user_filter = request.query_params.get('user')
-        
-#         # Apply user filter
-#         if user_filter == 'me':
-#             user = request.user
-#         elif user_filter and request.user.role in ['admin', 'manager']:
-#             try:
-#                 user = User.objects.get(id=user_filter)
-#             except User.DoesNotExist:
-#                 user = None
-#         else:
-#             user = None
-        
-#         # Get activity feed
-#         activities = get_dashboard_activity_feed(user=user, days=days, limit=limit)
-        
-#         # Get user summary if filtering by specific user
-#         summary = None
-#         if user:
-#             summary = get_user_activity_summary(user, days=days)
-        
-#         return Response({
-#             'activities': activities,
-#             'summary': summary,
-#             'filters': {
-#                 'days': days,
-#                 'limit': limit,
-#                 'user': user.id if user else None
-#             }
-#         })
+from .signals import (
+    build_lead_status_change_log,
+    build_opportunity_stage_change_log,
+    build_task_completion_log,
+    create_lead_conversion_log,
+    create_task_completion_log,
+)
+from .typeahead import TypeaheadMixin, get_typeahead_limit, typeahead
+from .utils import get_dashboard_activity_feed, get_pipeline_summary
 
 
 # --- Auth Views ---
@@ -158,9 +159,10 @@ class HasOrganizationAccess(permissions.BasePermission):
         if request.user.organization is None:
             return False
         
-        # Check if object belongs to user's organization
-        if hasattr(obj, 'organization'):
-            return obj.organization == request.user.organization
+        # Check if object belongs to user's organization (by id, so the
+        # related organization row is never loaded just for this check)
+        if hasattr(obj, 'organization_id'):
+            return obj.organization_id == request.user.organization_id
         return True
 
 
@@ -229,12 +231,114 @@ class CreateOrganizationForUserView(APIView):
             )
 
 
-class OrganizationViewSet(viewsets.ModelViewSet):
+class DashboardActivityView(APIView):
+    """
+    Activity feed, summary and most active entities for the dashboard,
+    scoped to the caller's organization
+    """
+    permission_classes = [permissions.IsAuthenticated, HasOrganizationAccess]
+    
+    def get(self, request):
+        organization = request.user.organization
+        days, limit, user_filter = parse_dashboard_params(request.query_params)
+
+        # Apply user filter; only admins and managers can look at someone else
+        user, lookup = resolve_user_filter(request.user, user_filter)
+        if lookup is not None:
+            user = lookup.first()
+            if user is None:
+                return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        # Aggregates come from the per-organization cache; the feed is always live
+        cache = get_aggregate_cache()
+        aggregates = dashboard_aggregates(organization.id, user, days, date.today())
+        return Response({
+            'activities': get_dashboard_activity_feed(user=user, days=days, limit=limit, organization=organization),
+            **{
+                name: cache.get_or_compute(organization.id, group, variant, compute)
+                for name, (group, variant, compute, _acompute) in aggregates.items()
+            },
+            'filters': dashboard_filters(days, limit, user),
+        })
+
+
+class ChangesView(APIView):
+    """
+    Rows created, updated or deleted in the caller's organization since
+    ``?cursor=`` (everything when omitted), for incremental client sync
+    """
+    permission_classes = [permissions.IsAuthenticated, HasOrganizationAccess]
+
+    def get(self, request):
+        return Response(get_changes(
+            request.user.organization,
+            cursor=request.query_params.get('cursor'),
+            serializer_context={'request': request},
+        ))
+
+
+class AggregateCacheStatsView(APIView):
+    """
+    Hit and miss counters of this worker's dashboard aggregate cache
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request):
+        if request.user.role != 'admin':
+            return Response(
+                {'error': 'Only admins can view cache statistics'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return Response(get_aggregate_cache().stats())
+
+
+class ActivityStreamTicketView(APIView):
+    """
+    Short-lived ticket for opening the activity stream with ``?ticket=``,
+    since EventSource cannot send the Authorization header
+    """
+    permission_classes = [permissions.IsAuthenticated, HasOrganizationAccess]
+
+    def post(self, request):
+        return Response({
+            'ticket': issue_stream_ticket(request.user),
+            'expires_in': settings.ACTIVITY_STREAM_TICKET_SECONDS,
+        })
+
+
+class DatabasePoolStatsView(APIView):
+    """
+    Size, saturation and wait times of this worker's database connection pool
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != 'admin':
+            return Response(
+                {'error': 'Only admins can view pool statistics'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        stats = pool_stats()
+        if stats is None:
+            return Response({'enabled': False})
+        return Response({'enabled': True, **stats})
+
+
+class OrganizationViewSet(EagerLoadingMixin, ResponseCacheMixin, viewsets.ModelViewSet):
     queryset = Organization.objects.all()
     serializer_class = OrganizationSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [FullTextSearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description']
+    query_budgets = {'list': 2, 'retrieve': 1}
+    response_cache_models = (Organization, User)
+    response_cache_vary_on_role = True
+
+    def get_response_cache_scope(self):
+        # Admins list every organization
+        if self.request.user.role == 'admin':
+            return GLOBAL_SCOPE
+        return self.request.user.organization_id
 
     def get_queryset(self):
         # Return empty queryset for unauthenticated users
@@ -243,11 +347,15 @@ class OrganizationViewSet(viewsets.ModelViewSet):
         
         # Only admins can see all organizations
         if self.request.user.role == 'admin':
-            return Organization.objects.all().order_by('name')
+            queryset = Organization.objects.all().order_by('name')
         # Others can only see their own organization
         elif self.request.user.organization:
-            return Organization.objects.filter(id=self.request.user.organization.id)
-        return Organization.objects.none()
+            queryset = Organization.objects.filter(id=self.request.user.organization.id)
+        else:
+            return Organization.objects.none()
+
+        # Count members in the same query instead of once per organization
+        return queryset.annotate(users_total=Count('users'))
 
     def get_permissions(self):
         """
@@ -318,13 +426,24 @@ class OrganizationViewSet(viewsets.ModelViewSet):
             )
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(EagerLoadingMixin, TypeaheadMixin, ResponseCacheMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated, HasOrganizationAccess]
     pagination_class = None  # Disable pagination for user APIs
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [FullTextSearchFilter, filters.OrderingFilter]
     search_fields = ['email', 'first_name', 'last_name']
+    typeahead_fields = ('first_name', 'last_name', 'email')
+    typeahead_values = ('id', 'email', 'first_name', 'last_name')
+    query_budgets = {'list': 2, 'retrieve': 2, 'typeahead': 2}
+    response_cache_models = (User, Organization)
+    response_cache_vary_on_role = True
+
+    def get_response_cache_scope(self):
+        # Admins see the users of every organization
+        if self.request.user.role == 'admin':
+            return GLOBAL_SCOPE
+        return self.request.user.organization_id
 
     def get_queryset(self):
         # Return empty queryset for unauthenticated users
@@ -342,13 +461,22 @@ class UserViewSet(viewsets.ModelViewSet):
         # Managers and sales reps can only see users in their organization
         return User.objects.filter(organization=self.request.user.organization)
 
+    def get_typeahead_queryset(self):
+        # Pickers assign records within the organization, even for admins
+        if not self.request.user.is_authenticated or not self.request.user.organization:
+            return User.objects.none()
+        return User.objects.filter(organization=self.request.user.organization, is_active=True)
+
 
-class AccountViewSet(viewsets.ModelViewSet):
+class AccountViewSet(EagerLoadingMixin, TypeaheadMixin, ExportMixin, ConditionalGetMixin, ResponseCacheMixin, viewsets.ModelViewSet):
     queryset = Account.objects.all()
     serializer_class = AccountSerializer
     permission_classes = [permissions.IsAuthenticated, HasOrganizationAccess]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [FullTextSearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'industry', 'website']
+    typeahead_fields = ('name',)
+    typeahead_values = ('id', 'name')
+    query_budgets = {'list': 4, 'retrieve': 3, 'contacts': 3, 'opportunities': 3, 'typeahead': 2, 'export': 2}
 
     def get_queryset(self):
         # Return empty queryset for unauthenticated users
@@ -370,7 +498,10 @@ class AccountViewSet(viewsets.ModelViewSet):
     def contacts(self, request, pk=None):
         """Get all contacts associated with this account"""
         account = self.get_object()
-        contacts = Contact.objects.filter(account=account, organization=self.request.user.organization)
+        contacts = eager_load(
+            Contact.objects.filter(account=account, organization=self.request.user.organization),
+            ContactSerializer,
+        )
         serializer = ContactSerializer(contacts, many=True)
         return Response(serializer.data)
 
@@ -378,17 +509,23 @@ class AccountViewSet(viewsets.ModelViewSet):
     def opportunities(self, request, pk=None):
         """Get all opportunities associated with this account"""
         account = self.get_object()
-        opportunities = Opportunity.objects.filter(account=account, organization=self.request.user.organization)
+        opportunities = eager_load(
+            Opportunity.objects.filter(account=account, organization=self.request.user.organization),
+            OpportunitySerializer,
+        )
         serializer = OpportunitySerializer(opportunities, many=True)
         return Response(serializer.data)
 
 
-class ContactViewSet(viewsets.ModelViewSet):
+class ContactViewSet(EagerLoadingMixin, TypeaheadMixin, ExportMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Contact.objects.all()
     serializer_class = ContactSerializer
     permission_classes = [permissions.IsAuthenticated, HasOrganizationAccess]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [FullTextSearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'email', 'phone']
+    typeahead_fields = ('name', 'email')
+    typeahead_values = ('id', 'name', 'email', 'account')
+    query_budgets = {'list': 4, 'retrieve': 3, 'typeahead': 2, 'export': 2}
 
     def get_queryset(self):
         # Return empty queryset for unauthenticated users
@@ -437,12 +574,19 @@ class ContactViewSet(viewsets.ModelViewSet):
         return Response({'status': 'Interaction logged successfully'})
 
 
-class LeadViewSet(viewsets.ModelViewSet):
+class LeadViewSet(EagerLoadingMixin, ExportMixin, BulkUpdateMixin, ConditionalGetMixin, ResponseCacheMixin, viewsets.ModelViewSet):
     queryset = Lead.objects.all()
     serializer_class = LeadSerializer
     permission_classes = [permissions.IsAuthenticated, HasOrganizationAccess]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [FullTextSearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'email', 'company', 'phone']
+    query_budgets = {'list': 4, 'retrieve': 3, 'export': 2}
+    pagination_class = PageNumberOrKeysetPagination
+    keyset_ordering = ('-created_at', '-id')
+    bulk_update_fields = ('status', 'assigned_to')
+    bulk_filter_params = ('status', 'search')
+    bulk_select_related = ('assigned_to__organization',)
+    response_cache_models = (Lead, User)
 
     def get_queryset(self):
         # Return empty queryset for unauthenticated users
@@ -471,6 +615,48 @@ class LeadViewSet(viewsets.ModelViewSet):
         # Automatically set organization for new leads
         serializer.save(organization=self.request.user.organization)
 
+    def build_bulk_logs(self, lead, old_values):
+        # Same log log_lead_status_change_post_save writes for a single save
+        if 'status' not in old_values or old_values['status'] == lead.status:
+            return []
+        log = build_lead_status_change_log(lead)
+        return [log] if log else []
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_leads(self, request):
+        """Import leads from an uploaded CSV or JSONL file; large files are queued as a job"""
+        if not request.user.organization:
+            return Response(
+                {'error': 'User must belong to an organization to import leads'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'file is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        file_format = request.data.get('file_format') or guess_import_format(upload.name)
+        if file_format not in IMPORT_FORMATS:
+            return Response(
+                {'error': f"file_format must be one of: {', '.join(IMPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if upload.size > settings.LEAD_IMPORT_SYNC_MAX_BYTES:
+            job = queue_import(upload, request.user.organization, request.user, file_format)
+            return Response(LeadImportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+        importer = LeadImport(request.user.organization, request.user)
+        try:
+            result = importer.run(iter_import_rows(upload, file_format))
+        except ImportFileError as exc:
+            # Batches before the bad line are already imported
+            return Response(
+                {**importer.result, 'error': exc.message, 'line': exc.line_number},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(result)
+
     @action(detail=True, methods=['post'])
     def convert_to_opportunity(self, request, pk=None):
         """Convert a lead to an opportunity"""
@@ -544,12 +730,29 @@ class LeadViewSet(viewsets.ModelViewSet):
         return Response({'status': 'Interaction logged successfully'})
 
 
-class OpportunityViewSet(viewsets.ModelViewSet):
+class LeadImportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Status and results of the lead imports queued by ``leads/import/``"""
+    queryset = LeadImportJob.objects.all()
+    serializer_class = LeadImportJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    query_budgets = {'list': 2, 'retrieve': 1}
+
+    def get_queryset(self):
+        return self.queryset.filter(user=self.request.user).order_by('-created_at', '-pk')
+
+
+class OpportunityViewSet(EagerLoadingMixin, ExportMixin, BulkUpdateMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Opportunity.objects.all()
     serializer_class = OpportunitySerializer
     permission_classes = [permissions.IsAuthenticated, HasOrganizationAccess]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [FullTextSearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'account__name', 'contact__name']
+    query_budgets = {'list': 4, 'retrieve': 3, 'pipeline_value': 2, 'quotes': 4, 'export': 2}
+    pagination_class = PageNumberOrKeysetPagination
+    keyset_ordering = ('-created_at', '-id')
+    bulk_update_fields = ('stage', 'owner', 'close_date')
+    bulk_filter_params = ('stage', 'search')
+    bulk_select_related = ('owner__organization',)
 
     def get_queryset(self):
         # Return empty queryset for unauthenticated users
@@ -581,18 +784,30 @@ class OpportunityViewSet(viewsets.ModelViewSet):
         # Automatically set organization for new opportunities
         serializer.save(organization=self.request.user.organization)
 
+    def build_bulk_logs(self, opportunity, old_values):
+        # Same log log_opportunity_stage_change_post_save writes for a single save
+        if 'stage' not in old_values or old_values['stage'] == opportunity.stage:
+            return []
+        log = build_opportunity_stage_change_log(opportunity)
+        return [log] if log else []
+
     @action(detail=False, methods=['get'])
     def pipeline_value(self, request):
-        """Get total pipeline value"""
-        queryset = self.get_queryset().exclude(stage__in=['won', 'lost'])
-        total_value = sum(opp.amount for opp in queryset)
-        return Response({'total_pipeline_value': total_value})
+        """Get total pipeline value with per-stage, per-owner and per-month breakdowns"""
+        stage = request.query_params.get('stage') or ''
+        return Response(get_aggregate_cache().get_or_compute(
+            request.user.organization_id, 'pipeline', pipeline_cache_variant(stage),
+            lambda: get_pipeline_summary(self.get_queryset())
+        ))
 
     @action(detail=True, methods=['get'])
     def quotes(self, request, pk=None):
         """Get all quotes for this opportunity"""
         opportunity = self.get_object()
-        quotes = Quote.objects.filter(opportunity=opportunity, organization=self.request.user.organization)
+        quotes = eager_load(
+            Quote.objects.filter(opportunity=opportunity, organization=self.request.user.organization),
+            QuoteSerializer,
+        )
         serializer = QuoteSerializer(quotes, many=True)
         return Response(serializer.data)
 
@@ -621,12 +836,16 @@ class OpportunityViewSet(viewsets.ModelViewSet):
         return Response({'status': 'Interaction logged successfully'})
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(EagerLoadingMixin, ExportMixin, BulkUpdateMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated, HasOrganizationAccess]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'description', 'owner__email']
+    filter_backends = [FullTextSearchFilter, filters.OrderingFilter]
+    search_fields = ['title', 'notes', 'owner__email']
+    query_budgets = {'list': 4, 'retrieve': 3, 'overdue': 2, 'export': 2}
+    bulk_update_fields = ('status', 'owner', 'due_date')
+    bulk_filter_params = ('status', 'search')
+    bulk_select_related = ('related_lead', 'related_opportunity__contact')
 
     def get_queryset(self):
         # Return empty queryset for unauthenticated users
@@ -650,12 +869,18 @@ class TaskViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user, organization=self.request.user.organization)
 
+    def build_bulk_logs(self, task, old_values):
+        # Same log mark_completed writes for a single task
+        if old_values.get('status', 'completed') == 'completed' or task.status != 'completed':
+            return []
+        return [build_task_completion_log(task, self.request.user)]
+
     @action(detail=False, methods=['get'])
     def overdue(self, request):
         """Get overdue tasks"""
-        queryset = self.get_queryset().filter(
-            due_date__lt=date.today(),
-            status='pending'
+        queryset = eager_load(
+            self.get_queryset().filter(due_date__lt=date.today(), status='pending'),
+            TaskSerializer,
         )
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
@@ -673,12 +898,15 @@ class TaskViewSet(viewsets.ModelViewSet):
         return Response({'status': 'Task marked as completed'})
 
 
-class InteractionLogViewSet(viewsets.ModelViewSet):
+class InteractionLogViewSet(EagerLoadingMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = InteractionLog.objects.all()
     serializer_class = InteractionLogSerializer
     permission_classes = [permissions.IsAuthenticated, HasOrganizationAccess]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [FullTextSearchFilter, filters.OrderingFilter]
     search_fields = ['summary', 'lead__name', 'contact__name', 'opportunity__name']
+    query_budgets = {'list': 3, 'retrieve': 2, 'export': 2, 'archived': 1}
+    pagination_class = PageNumberOrKeysetPagination
+    keyset_ordering = ('-timestamp', '-id')
 
     def get_queryset(self):
         # Return empty queryset for unauthenticated users
@@ -710,13 +938,30 @@ class InteractionLogViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user, organization=self.request.user.organization)
 
-
-class ProductViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'])
+    def archived(self, request):
+        """Page through archived interaction logs, newest first, with the list's lead/contact/opportunity filters"""
+        archive_filters = {
+            field: request.query_params[field]
+            for field in ARCHIVE_FILTER_FIELDS
+            if request.query_params.get(field)
+        }
+        rows = ArchivedInteractions(request.user.organization_id, archive_filters) if request.user.organization_id else []
+        # Archives are not a queryset, so the cursor mode of pagination_class does not apply
+        paginator = PageNumberPagination()
+        page = paginator.paginate_queryset(rows, request, view=self)
+        return paginator.get_paginated_response(page)
+
+
+class ProductViewSet(EagerLoadingMixin, TypeaheadMixin, ExportMixin, ConditionalGetMixin, ResponseCacheMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [permissions.IsAuthenticated, HasOrganizationAccess]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [FullTextSearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description']
+    typeahead_fields = ('name',)
+    typeahead_values = ('id', 'name', 'price', 'currency')
+    query_budgets = {'list': 4, 'retrieve': 3, 'available_for_quotes': 2, 'typeahead': 2, 'export': 2}
 
     def get_queryset(self):
         # Return empty queryset for unauthenticated users
@@ -737,6 +982,9 @@ class ProductViewSet(viewsets.ModelViewSet):
             
         return queryset
 
+    def get_typeahead_queryset(self):
+        return self.get_queryset().filter(is_active=True)
+
     def perform_create(self, serializer):
         # Automatically set organization for new products
         serializer.save(organization=self.request.user.organization)
@@ -753,14 +1001,17 @@ class ProductViewSet(viewsets.ModelViewSet):
             is_active=True
         )
             
-        # Apply search if provided
-        search = request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) | 
-                Q(description__icontains=search)
+        # Apply search if provided: names by similarity, descriptions by full-text match
+        search = request.query_params.get('search', '')
+        if search.strip():
+            query = build_search_query([search])
+            queryset = typeahead(
+                queryset, ('name',), search, also=Q(search_vector=query) if query is not None else None
             )
-            
+
+        if 'limit' in request.query_params:
+            queryset = queryset[:get_typeahead_limit(request)]
+
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
@@ -800,12 +1051,15 @@ class ProductViewSet(viewsets.ModelViewSet):
         return super().destroy(request, *args, **kwargs)
 
 
-class QuoteViewSet(viewsets.ModelViewSet):
+class QuoteViewSet(EagerLoadingMixin, ExportMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Quote.objects.all()
     serializer_class = QuoteSerializer
     permission_classes = [permissions.IsAuthenticated, HasOrganizationAccess]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [FullTextSearchFilter, filters.OrderingFilter]
     search_fields = ['opportunity__name', 'created_by__email']
+    query_budgets = {'list': 5, 'retrieve': 4, 'export': 3}
+    pagination_class = PageNumberOrKeysetPagination
+    keyset_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
         # Return empty queryset for unauthenticated users
@@ -854,33 +1108,38 @@ class QuoteViewSet(viewsets.ModelViewSet):
         # Use product price if unit_price not provided
         if not unit_price:
             unit_price = product.price
+
+        try:
+            quantity = int(quantity)
+            unit_price = Decimal(str(unit_price))
+        except (TypeError, ValueError, InvalidOperation):
+            return Response(
+                {'error': 'quantity and unit_price must be numeric'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        line_item = QuoteLineItem.objects.create(
-            quote=quote,
-            product=product,
-            quantity=quantity,
-            unit_price=unit_price,
-            organization=request.user.organization
-        )
-        
-        # Update quote total
-        self._update_quote_total(quote)
+        with transaction.atomic():
+            line_item = QuoteLineItem.objects.create(
+                quote=quote,
+                product=product,
+                quantity=quantity,
+                unit_price=unit_price,
+                organization=request.user.organization
+            )
+            
+            # Update quote total by this item's amount only
+            Quote.adjust_total_price(quote.pk, line_item.total_price)
         
         return Response(QuoteLineItemSerializer(line_item).data)
 
-    def _update_quote_total(self, quote):
-        """Update the quote's total price based on line items"""
-        total = sum(item.total_price for item in quote.line_items.all())
-        quote.total_price = total
-        quote.save()
-
 
-class QuoteLineItemViewSet(viewsets.ModelViewSet):
+class QuoteLineItemViewSet(EagerLoadingMixin, ExportMixin, viewsets.ModelViewSet):
     queryset = QuoteLineItem.objects.all()
     serializer_class = QuoteLineItemSerializer
     permission_classes = [permissions.IsAuthenticated, HasOrganizationAccess]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [FullTextSearchFilter, filters.OrderingFilter]
     search_fields = ['product__name', 'quote__id']
+    query_budgets = {'list': 3, 'retrieve': 2, 'export': 2}
 
     def get_queryset(self):
         # Return empty queryset for unauthenticated users
@@ -901,24 +1160,35 @@ class QuoteLineItemViewSet(viewsets.ModelViewSet):
             
         return queryset
 
+    # Quote totals are maintained by deltas in the same transaction as the
+    # line-item write; see Quote.adjust_total_price.
+
+    @transaction.atomic
     def perform_create(self, serializer):
         line_item = serializer.save(organization=self.request.user.organization)
-        # Update quote total after adding line item
-        self._update_quote_total(line_item.quote)
+        Quote.adjust_total_price(line_item.quote_id, line_item.total_price)
 
+    @transaction.atomic
     def perform_update(self, serializer):
+        # Lock the row and read the stored values so concurrent edits of the
+        # same item apply their deltas one after another
+        previous = QuoteLineItem.objects.select_for_update().only(
+            'quote_id', 'quantity', 'unit_price'
+        ).get(pk=serializer.instance.pk)
         line_item = serializer.save()
-        # Update quote total after updating line item
-        self._update_quote_total(line_item.quote)
 
+        if line_item.quote_id == previous.quote_id:
+            Quote.adjust_total_price(line_item.quote_id, line_item.total_price - previous.total_price)
+        else:
+            Quote.adjust_total_price(previous.quote_id, -previous.total_price)
+            Quote.adjust_total_price(line_item.quote_id, line_item.total_price)
+
+    @transaction.atomic
     def perform_destroy(self, instance):
-        quote = instance.quote
+        previous = QuoteLineItem.objects.select_for_update().only(
+            'quote_id', 'quantity', 'unit_price'
+        ).filter(pk=instance.pk).first()
+        if previous is None:
+            return
         instance.delete()
-        # Update quote total after removing line item
-        self._update_quote_total(quote)
-
-    def _update_quote_total(self, quote):
-        """Update the quote's total price based on line items"""
-        total = sum(item.total_price for item in quote.line_items.all())
-        quote.total_price = total
-        quote.save()
+        Quote.adjust_total_price(previous.quote_id, -previous.total_price)
@@ -6,5 +6,11 @@ echo "⏳ Waiting for PostgreSQL to be ready..."
 echo "📦 Collecting static files..."
 uv run manage.py collectstatic --noinput
 
-echo "🌐 Starting Django server..."
-uv run manage.py runserver 0.0.0.0:8000
\ No newline at end of file
+# gunicorn (configured from env in gunicorn.conf.py) unless DJANGO_SERVER=runserver
+if [ "${DJANGO_SERVER:-gunicorn}" = "runserver" ]; then
+    echo "🌐 Starting Django development server..."
+    exec uv run manage.py runserver 0.0.0.0:8000
+fi
+
+echo "🌐 Starting gunicorn..."
+exec gunicorn --config gunicorn.conf.py
\ No newline at end of file
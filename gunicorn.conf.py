@@ -0,0 +1,94 @@
+"""
+Gunicorn settings for the production image (see entrypoint.sh).
+
+Every value comes from the environment so the same image can be sized per
+host. By default gthread workers serve app.wsgi: each worker runs the sync
+DRF views on GUNICORN_THREADS threads.
+
+The async endpoints (/api/v1/async/ and the /api/v1/activity/stream/ SSE
+stream) need ASGI. Run them as a separate process group from the same image
+with GUNICORN_WORKER_CLASS=uvicorn_worker.UvicornWorker (which serves
+app.asgi, ignores GUNICORN_THREADS and keeps each stream as a coroutine
+rather than a thread), and have the proxy route those paths to it, as
+nginx.conf does with the backend-async service.
+
+Send HUP to the master for a graceful reload: new workers start, old ones
+finish their in-flight requests (up to GUNICORN_GRACEFUL_TIMEOUT) and exit.
+
+With DATABASE_POOL=true every worker keeps its own connection pool of up to
+DATABASE_POOL_MAX_SIZE connections (see app/settings/base.py).
+"""
+
+import logging
+import multiprocessing
+import os
+import re
+
+from gunicorn.glogging import Logger
+
+
+def _bool(name, default):
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", str(min(multiprocessing.cpu_count() * 2 + 1, 8))))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+# Only used by the gthread worker class
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+
+# Import Django once in the master and fork it into the workers. Saves memory
+# and start-up time, but code changes then need a full restart, not HUP.
+preload_app = _bool("GUNICORN_PRELOAD", "true")
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Recycle workers now and then to bound slow memory growth; the jitter keeps
+# them from all restarting at once
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None
+# Activity stream tickets travel in the query string (EventSource cannot send
+# headers); keep them out of the access log of either worker class
+_STREAM_TICKET = re.compile(r"((?:^|[?&])ticket=)[^&\s]*")
+
+
+def _redact(value):
+    return _STREAM_TICKET.sub(r"\1[redacted]", value)
+
+
+class AccessLogger(Logger):
+    def atoms(self, resp, req, environ, request_time):
+        atoms = super().atoms(resp, req, environ, request_time)
+        atoms["r"] = _redact(atoms["r"])
+        atoms["q"] = _redact(atoms["q"] or "")
+        return atoms
+
+
+class _RedactUvicornAccess(logging.Filter):
+    # uvicorn.access records carry (client, method, path?query, version, status)
+    def filter(self, record):
+        if isinstance(record.args, tuple) and len(record.args) > 2:
+            record.args = (*record.args[:2], _redact(str(record.args[2])), *record.args[3:])
+        return True
+
+
+logger_class = AccessLogger
+logging.getLogger("uvicorn.access").addFilter(_RedactUvicornAccess())
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+wsgi_app = "app.wsgi:application" if worker_class in ("sync", "gthread") else "app.asgi:application"
+
+
+def pre_fork(server, worker):
+    # A pool opened in the master (a preload-time query) would hand the same
+    # sockets to every worker; close it so each worker opens its own lazily
+    if server.cfg.preload_app:
+        from core.db_pool import close_pools
+
+        close_pools()
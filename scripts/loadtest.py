@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+Closed-loop HTTP load generator for comparing serving modes.
+
+Each of ``--concurrency`` threads keeps one keep-alive connection open and
+sends GETs round-robin over the given API paths for ``--duration`` seconds.
+Prints requests/s, latency percentiles and non-200 responses per run.
+
+Usage:
+    python scripts/loadtest.py --url http://127.0.0.1:8000 --token <JWT access token> \\
+        --concurrency 1,8,32 --duration 20 /api/v1/leads/ /api/v1/dashboard/activity/
+"""
+import argparse
+import http.client
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def worker(url, headers, paths, deadline, results, offset):
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    latencies, errors, index = [], 0, offset
+    while time.perf_counter() < deadline:
+        path = paths[index % len(paths)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - started)
+    connection.close()
+    results.append((latencies, errors))
+
+
+def run(url, token, paths, concurrency, duration):
+    headers = {'Authorization': f'Bearer {token}', 'Accept': 'application/json'}
+    results = []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=worker, args=(url, headers, paths, deadline, results, i))
+        for i in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for batch, _ in results for latency in batch)
+    errors = sum(count for _, count in results)
+    if not latencies:
+        return {'requests': 0, 'errors': errors}
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / elapsed,
+        'p50_ms': quantiles[49] * 1000,
+        'p95_ms': quantiles[94] * 1000,
+        'p99_ms': quantiles[98] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('paths', nargs='+', help='API paths to request round-robin')
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--token', required=True, help='JWT access token')
+    parser.add_argument('--concurrency', default='1,8,32', help='Comma-separated client counts to run')
+    parser.add_argument('--duration', type=float, default=15)
+    args = parser.parse_args()
+
+    print(f"{'clients':>8} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for concurrency in map(int, args.concurrency.split(',')):
+        result = run(args.url, args.token, args.paths, concurrency, args.duration)
+        if not result['requests']:
+            print(f"{concurrency:>8} {'-':>9} {'-':>8} {'-':>8} {'-':>8} {result['errors']:>7}")
+            continue
+        print(
+            f"{concurrency:>8} {result['rps']:>9.1f} {result['p50_ms']:>8.1f} "
+            f"{result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['errors']:>7}"
+        )
+
+
+if __name__ == '__main__':
+    main()